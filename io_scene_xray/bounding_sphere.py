@@ -0,0 +1,169 @@
+# blender modules
+import numpy
+
+
+# directions of the extreme points of the initial support candidates
+DIRECTIONS = numpy.array((
+    (1, 0, 0), (0, 1, 0), (0, 0, 1),
+    (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),
+    (1, 1, 0), (1, -1, 0), (1, 0, 1), (1, 0, -1), (0, 1, 1), (0, 1, -1)
+), dtype=numpy.float64)
+# maximum number of the outside points added to the candidates per pass
+MAX_VIOLATORS = 64
+# relative tolerance of the sphere containment tests
+EPSILON = 1e-7
+MAX_ITERATIONS = 1000
+
+
+def get_distances(points, center):
+    offsets = points - center
+    return numpy.sqrt((offsets * offsets).sum(axis=1))
+
+
+def ritter(points):
+    # Jack Ritter's approximate bounding sphere, the sphere
+    # grows to the farthest outside point until all points are inside
+    first = points[0]
+    point_1 = points[numpy.argmax(get_distances(points, first))]
+    point_2 = points[numpy.argmax(get_distances(points, point_1))]
+    center = (point_1 + point_2) / 2
+    radius = numpy.linalg.norm(point_2 - point_1) / 2
+    for _ in range(MAX_ITERATIONS):
+        distances = get_distances(points, center)
+        index = numpy.argmax(distances)
+        distance = distances[index]
+        if distance <= radius * (1 + EPSILON):
+            break
+        new_radius = (radius + distance) / 2
+        center = center + (points[index] - center) * ((new_radius - radius) / distance)
+        radius = new_radius
+    radius = max(radius, get_distances(points, center).max())
+    return center, float(radius)
+
+
+def get_circumsphere(points):
+    # sphere of the 1-4 points on its surface or None for degenerate points
+    point_1 = points[0]
+    if len(points) == 1:
+        return point_1, 0.0
+    edges = numpy.array([point - point_1 for point in points[1 : ]])
+    if len(points) == 2:
+        return point_1 + edges[0] / 2, float(numpy.linalg.norm(edges[0])) / 2
+    if len(points) == 3:
+        # center lies in the plane of the triangle
+        normal = numpy.cross(edges[0], edges[1])
+        normal_length = numpy.linalg.norm(normal)
+        if not normal_length:
+            return None
+        normal *= numpy.abs(edges).max() / normal_length
+        edges = numpy.vstack((edges, normal))
+        values = numpy.array((
+            (edges[0] * edges[0]).sum() / 2,
+            (edges[1] * edges[1]).sum() / 2,
+            0.0
+        ))
+    else:
+        values = (edges * edges).sum(axis=1) / 2
+    if numpy.linalg.cond(edges) > 1 / EPSILON:
+        return None
+    offset = numpy.linalg.solve(edges, values)
+    return point_1 + offset, float(numpy.linalg.norm(offset))
+
+
+def get_boundary_sphere(boundary):
+    # smallest sphere with all boundary points on the surface,
+    # degenerate boundary is replaced by its smaller subsets
+    sphere = get_circumsphere(boundary)
+    if sphere:
+        return sphere
+    best = None
+    for skip_index in range(len(boundary)):
+        subset = boundary[ : skip_index] + boundary[skip_index + 1 : ]
+        sphere = get_boundary_sphere(subset)
+        if not is_inside(sphere, boundary):
+            continue
+        if best is None or sphere[1] < best[1]:
+            best = sphere
+    return best
+
+
+def is_inside(sphere, points):
+    center, radius = sphere
+    tolerance = EPSILON * max(radius, 1.0)
+    for point in points:
+        if numpy.linalg.norm(point - center) > radius + tolerance:
+            return False
+    return True
+
+
+def welzl(points, boundary=()):
+    # exact minimum sphere, iterative form of Emo Welzl's algorithm,
+    # points must be shuffled for the expected linear time
+    boundary = list(boundary)
+    sphere = get_boundary_sphere(boundary) if boundary else None
+    if len(boundary) == 4:
+        return sphere
+    for index, point in enumerate(points):
+        if sphere and is_inside(sphere, (point, )):
+            continue
+        sphere = welzl(points[ : index], boundary + [point])
+    return sphere
+
+
+def calculate(points, exact=True):
+    # returns the center and the radius of the bounding sphere
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    if not len(points):
+        return numpy.zeros(3), 0.0
+    center, radius = ritter(points)
+    if not exact:
+        return center, radius
+
+    # the exact sphere of the candidate points is refined by adding
+    # the points outside of it, until all points are inside
+    projections = points.dot(DIRECTIONS.T)
+    candidates = set(numpy.argmin(projections, axis=0).tolist())
+    candidates.update(numpy.argmax(projections, axis=0).tolist())
+    random = numpy.random.RandomState(0)
+    for _ in range(MAX_ITERATIONS):
+        indices = sorted(candidates)
+        subset = [points[index] for index in random.permutation(indices)]
+        exact_center, exact_radius = welzl(subset)
+        distances = get_distances(points, exact_center)
+        tolerance = EPSILON * max(exact_radius, 1.0)
+        outside = numpy.flatnonzero(distances > exact_radius + tolerance)
+        if not len(outside):
+            break
+        farthest = outside[numpy.argsort(distances[outside])[-MAX_VIOLATORS : ]]
+        candidates.update(farthest.tolist())
+    exact_radius = max(exact_radius, float(distances.max()))
+    if exact_radius < radius:
+        return exact_center, exact_radius
+    return center, radius
+
+
+def merge(spheres):
+    # bounding sphere of the spheres, grows like the ritter's sphere
+    centers = numpy.array([center for center, _ in spheres], dtype=numpy.float64)
+    radii = numpy.array([radius for _, radius in spheres], dtype=numpy.float64)
+    if not len(spheres):
+        return numpy.zeros(3), 0.0
+    largest = numpy.argmax(radii)
+    center = centers[largest]
+    radius = radii[largest]
+    for _ in range(MAX_ITERATIONS):
+        offsets = get_distances(centers, center)
+        extents = offsets + radii
+        index = numpy.argmax(extents)
+        extent = extents[index]
+        if extent <= radius * (1 + EPSILON):
+            break
+        if not offsets[index]:
+            # concentric sphere
+            radius = extent
+            continue
+        new_radius = (radius + extent) / 2
+        center = center + (centers[index] - center) * ((new_radius - radius) / offsets[index])
+        radius = new_radius
+    radius = max(radius, (get_distances(centers, center) + radii).max())
+    return center, float(radius)
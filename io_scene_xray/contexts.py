@@ -81,6 +81,8 @@ class ImportAnimationOnlyContext(ImportAnimationBaseContext):
 class ExportContext(Context):
     def __init__(self):
         super().__init__()
+        self.compress_chunks = False
+        self.optimize_vertex_cache = False
 
 
 class ExportMeshContext(ExportContext):
@@ -256,24 +256,19 @@ def reconstruct_mesh(vertices, uvs, triangles):
 
 def read_mesh_data(packed_reader, det_model):
     # read vertices coordinates and uvs
-    S_FFFFF = xray_io.PackedReader.prep('5f')
-    vertices = []
-    uvs = []
-    for _ in range(det_model.mesh.vertices_count):
-        vertex = packed_reader.getp(S_FFFFF)    # x, y, z, u, v
-        vertices.append((vertex[0], vertex[2], vertex[1]))
-        uvs.append((vertex[3], 1 - vertex[4]))
+    records = packed_reader.get_records(
+        xray_io.RECORD_VERTEX_UV,
+        det_model.mesh.vertices_count
+    )
+    coords = records['co'][:, (0, 2, 1)]    # x, z, y
+    uv_coords = records['uv'].astype('f8')
+    uv_coords[:, 1] = 1 - uv_coords[:, 1]
+    vertices = list(map(tuple, coords.tolist()))
+    uvs = list(map(tuple, uv_coords.tolist()))
 
     # read triangles indices
-    S_HHH = xray_io.PackedReader.prep('3H')
-    triangles = []
-    for _ in range(det_model.mesh.indices_count // 3):
-        face_indices = packed_reader.getp(S_HHH)
-        triangles.append((
-            face_indices[0],
-            face_indices[2],
-            face_indices[1]
-        ))
+    faces = packed_reader.get_faces(det_model.mesh.indices_count // 3)
+    triangles = list(map(tuple, faces[:, (0, 2, 1)].tolist()))
 
     return vertices, uvs, triangles
 
@@ -10,6 +10,7 @@ from .. import utils
 from .. import log
 from .. import text
 from .. import xray_io
+from .. import vertex_cache
 
 
 def export(bpy_obj, packed_writer, context, file_path, mode='DM'):
@@ -59,6 +60,15 @@ def export(bpy_obj, packed_writer, context, file_path, mode='DM'):
             _.append(vi)
         indices.append(_)
 
+    if context.optimize_vertex_cache:
+        stats = vertex_cache.CacheStats()
+        indices, vertices_order = vertex_cache.optimize_with_stats(
+            indices, len(vertices), stats
+        )
+        indices = indices.tolist()
+        vertices = [vertices[index] for index in vertices_order.tolist()]
+        vertex_cache.report(context, stats)
+
     vertices_count = len(vertices)
     if vertices_count > fmt.VERTICES_COUNT_LIMIT:
         raise utils.AppError(
@@ -97,7 +97,8 @@ class XRAY_OT_import_dm(
 export_props = {
     'detail_models': bpy.props.StringProperty(options={'HIDDEN'}),
     'directory': bpy.props.StringProperty(subtype="FILE_PATH"),
-    'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath()
+    'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath(),
+    'optimize_vertex_cache': ie_props.prop_optimize_vertex_cache()
 }
 
 
@@ -117,6 +118,7 @@ class XRAY_OT_export_dm(ie_props.BaseOperator):
 
     def draw(self, context):
         self.layout.prop(self, 'texture_name_from_image_path')
+        self.layout.prop(self, 'optimize_vertex_cache')
 
     @utils.execute_with_logger
     @utils.set_cursor_state
@@ -125,6 +127,8 @@ class XRAY_OT_export_dm(ie_props.BaseOperator):
         export_context = ExportDmContext()
         export_context.texname_from_path = self.texture_name_from_image_path
         export_context.unique_errors = set()
+        export_context.optimize_vertex_cache = self.optimize_vertex_cache
+        export_context.operator = self
         for name in self.detail_models.split(','):
             detail_model = context.scene.objects[name]
             if not name.lower().endswith(filename_ext):
@@ -171,7 +175,8 @@ export_props = {
     'filter_glob': bpy.props.StringProperty(
         default='*'+filename_ext, options={'HIDDEN'}
     ),
-    'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath()
+    'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath(),
+    'optimize_vertex_cache': ie_props.prop_optimize_vertex_cache()
 }
 
 
@@ -201,12 +206,15 @@ class XRAY_OT_export_dm_file(
 
     def draw(self, context):
         self.layout.prop(self, 'texture_name_from_image_path')
+        self.layout.prop(self, 'optimize_vertex_cache')
 
     def exp(self, bpy_obj, context):
         active_object, selected_objects = utils.get_selection_state(context)
         export_context = ExportDmContext()
         export_context.texname_from_path = self.texture_name_from_image_path
         export_context.unique_errors = set()
+        export_context.optimize_vertex_cache = self.optimize_vertex_cache
+        export_context.operator = self
         exp.export_file(bpy_obj, self.filepath, export_context)
         utils.set_selection_state(active_object, selected_objects)
 
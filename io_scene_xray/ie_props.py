@@ -41,6 +41,34 @@ def PropObjectMotionsExport():
     )
 
 
+def prop_compress_chunks():
+    return bpy.props.BoolProperty(
+        name='Compress Chunks',
+        description='Compress the file chunks with the LZHUF algorithm',
+        default=False
+    )
+
+
+def prop_optimize_vertex_cache():
+    return bpy.props.BoolProperty(
+        name='Optimize Vertex Cache',
+        description='Reorder triangles and vertices for the ' \
+        + 'post-transform vertex cache of the GPU',
+        default=False
+    )
+
+
+def prop_progressive_meshes():
+    return bpy.props.BoolProperty(
+        name='Progressive Meshes',
+        description='Generate the continuous levels of detail ' \
+        + 'of the progressive visuals. Slow: the simplification is ' \
+        + 'written in Python (about 5 seconds per 44k triangles) and ' \
+        + 'the index buffers grow about 2.7 times',
+        default=False
+    )
+
+
 def PropUseExportPaths():
     return bpy.props.BoolProperty(
         name='Use Export Paths',
@@ -3,11 +3,12 @@ import os
 
 # blender modules
 import bpy
-import bmesh
+import numpy
 
 # addon modules
 from . import fmt
 from . import create
+from .. import ogf
 from .. import utils
 from .. import log
 from .. import text
@@ -15,24 +16,36 @@ from .. import version_utils
 from .. import xray_io
 
 
-def import_main(context, level, data=None):
-    preferences = version_utils.get_preferences()
+class CollisionForm(object):
+    def __init__(self):
+        self.version = None
+        self.verts = None
+        self.tris = None
+
 
-    # read level.cform file
+def read_file(level, data=None):
+    # read level.cform file, old levels store cform in the level file
     if level.xrlc_version >= fmt.VERSION_10:
         cform_path = os.path.join(level.path, 'level.cform')
-        data = utils.read_file(cform_path)
+        file_data = utils.read_file(cform_path, use_mmap=True)
+        level.mapped_files.append(file_data)
+        data = file_data.data
     else:
         cform_path = level.file
+    return data, cform_path
 
+
+def read_main(data, cform_path):
+    # decode cform data, bpy is not used here
     packed_reader = xray_io.PackedReader(data)
+    cform = CollisionForm()
 
     # read header
-    version = packed_reader.getf('<I')[0]
-    if not version in fmt.CFORM_SUPPORT_VERSIONS:
+    cform.version = packed_reader.getf('<I')[0]
+    if not cform.version in fmt.CFORM_SUPPORT_VERSIONS:
         raise utils.AppError(
             text.error.cform_unsupport_ver,
-            log.props(version=version, file=cform_path)
+            log.props(version=cform.version, file=cform_path)
         )
     verts_count = packed_reader.getf('<I')[0]
     tris_count = packed_reader.getf('<I')[0]
@@ -40,8 +53,71 @@ def import_main(context, level, data=None):
     bbox_max = packed_reader.getf('<3f')
 
     # read verts
-    verts = packed_reader.get_array('f', verts_count * 3)
-    verts.shape = (verts.shape[0] // 3, 3)
+    cform.verts = packed_reader.get_array('f', verts_count * 3)
+    cform.verts.shape = (verts_count, 3)
+
+    # read tris
+    if cform.version == fmt.CFORM_VERSION_4:
+        tris_format = xray_io.RECORD_CFORM_FACE_V4
+    else:
+        tris_format = xray_io.RECORD_CFORM_FACE_V2
+    cform.tris = packed_reader.get_records(tris_format, tris_count)
+
+    return cform
+
+
+def get_material_keys(cform):
+    # material key is material id with suppress shadows and
+    # suppress wallmarks bits: (id << 2) | (shadows << 1) | wallmarks
+    if cform.version == fmt.CFORM_VERSION_4:
+        material = cform.tris['material'].astype(numpy.int64)
+        # 14 bit material id
+        mat_ids = material & 0x3fff
+        # 15 bit suppress shadows
+        shadows = (material >> 14) & 1
+        # 16 bit suppress wallmarks
+        wallmarks = (material >> 15) & 1
+        return (mat_ids << 2) | (shadows << 1) | wallmarks
+    # faces in version 2 or 3 do not have flags
+    return cform.tris['material'].astype(numpy.int64) << 2
+
+
+def get_sectors_tris(sectors):
+    # triangles indices of the every sector in the file order
+    order = numpy.argsort(sectors, kind='mergesort')
+    sorted_sectors = sectors[order]
+    unique_sectors, starts = numpy.unique(sorted_sectors, return_index=True)
+    ends = list(starts[1 : ]) + [len(order)]
+    sectors_tris = {}
+    for sector, start, end in zip(unique_sectors.tolist(), starts, ends):
+        sectors_tris[sector] = order[start : end]
+    return sectors_tris
+
+
+def get_sector_geometry(verts, tris):
+    # faces that are not created (repeated faces or repeated vertices)
+    # are created from the duplicated vertices (two sided faces)
+    verts_ids, faces = numpy.unique(tris, return_inverse=True)
+    faces = faces.reshape(-1, 3).astype(numpy.int32)
+    created = ogf.imp.get_created_faces(faces)
+
+    tris_2 = tris[~created]
+    verts_2_ids, faces_2 = numpy.unique(tris_2, return_inverse=True)
+    faces_2 = faces_2.reshape(-1, 3).astype(numpy.int32) + len(verts_ids)
+    created_2 = ogf.imp.get_created_faces(faces_2)
+
+    verts_ids = numpy.concatenate((verts_ids, verts_2_ids))
+    sector_verts = verts[verts_ids][:, (0, 2, 1)]
+    sector_faces = numpy.concatenate((faces[created], faces_2[created_2]))
+    faces_ids = numpy.concatenate((
+        numpy.flatnonzero(created),
+        numpy.flatnonzero(~created)[created_2]
+    ))
+    return sector_verts, sector_faces, faces_ids
+
+
+def import_main(context, level, cform):
+    preferences = version_utils.get_preferences()
 
     # read game materials
     gamemtl_file_path = preferences.gamemtl_file_auto
@@ -51,65 +127,15 @@ def import_main(context, level, data=None):
         for gmtl_name, _, gmtl_id in utils.parse_gamemtl(gmtl_data):
             game_mtl_names[gmtl_id] = gmtl_name
 
-    # read tris
-    sectors_tris = {}
-    sectors_verts = {}
-    sectors_mats = {}    # unique sectors materials
-    for sector_index in level.sectors_objects.keys():
-        sectors_tris[sector_index] = []
-        sectors_verts[sector_index] = set()
-        sectors_mats[sector_index] = set()
-    tris = [None, ] * tris_count
-    unique_materials = set()
-
-    # faces in version 4
-    if version == fmt.CFORM_VERSION_4:
-        prep = packed_reader.prep('3I2H')
-        for tris_index in range(tris_count):
-            vert_1, vert_2, vert_3, mat, sector = packed_reader.getp(prep)
-            # 14 bit material id
-            mat_id = mat & 0x3fff
-            # 15 bit suppress shadows
-            shadows = bool(mat & 0x4000)
-            # 16 bit suppress wallmarks
-            wallmarks = bool(mat & 0x8000)
-            tris[tris_index] = (
-                vert_1, vert_2, vert_3,
-                mat_id, shadows, wallmarks
-            )
-            unique_materials.add((mat_id, shadows, wallmarks))
-            sectors_tris[sector].append(tris_index)
-            sectors_verts[sector].update((vert_1, vert_2, vert_3))
-            sectors_mats[sector].add((mat_id, shadows, wallmarks))
-
-    # faces in version 2 or 3
-    elif version in (fmt.CFORM_VERSION_2, fmt.CFORM_VERSION_3):
-        prep = packed_reader.prep('6I2HI')
-        for tris_index in range(tris_count):
-            (
-                vert_1, vert_2, vert_3,
-                _, _, _, _,
-                sector, mat_id
-            ) = packed_reader.getp(prep)
-            shadows = False
-            wallmarks = False
-            tris[tris_index] = (
-                vert_1, vert_2, vert_3,
-                mat_id, shadows, wallmarks
-            )
-            unique_materials.add((mat_id, shadows, wallmarks))
-            sectors_tris[sector].append(tris_index)
-            sectors_verts[sector].update((vert_1, vert_2, vert_3))
-            sectors_mats[sector].add((mat_id, shadows, wallmarks))
-
-    # sector sets to lists
-    for sector_index in sectors_tris.keys():
-        sectors_mats[sector_index] = list(sectors_mats[sector_index])
-        sectors_verts[sector_index] = list(sectors_verts[sector_index])
+    mat_keys = get_material_keys(cform)
+    unique_materials = numpy.unique(mat_keys).tolist()
 
     # create bpy materials
     bpy_materials = {}
-    for mat_id, shadows, wallmarks in unique_materials:
+    for mat_key in unique_materials:
+        mat_id = mat_key >> 2
+        shadows = bool(mat_key & 0b10)
+        wallmarks = bool(mat_key & 0b01)
         gmtl = game_mtl_names.get(mat_id, str(mat_id))
         mat_name = '{0}_{1}_{2}'.format(gmtl, int(shadows), int(wallmarks))
 
@@ -119,7 +145,7 @@ def import_main(context, level, data=None):
             if not bpy_mat.name.startswith(mat_name):
                 continue
             xray = bpy_mat.xray
-            if not xray.gamemtl == gamemtl_name:
+            if not xray.gamemtl == gmtl:
                 continue
             if not xray.suppress_shadows == shadows:
                 continue
@@ -140,80 +166,41 @@ def import_main(context, level, data=None):
         bpy_materials[mat_id] = material
 
     # create geometry
-    for sector, triangles in sectors_tris.items():
-        # create verts
-        sector_verts = sectors_verts[sector]
-        bm = bmesh.new()
-        remap_verts = {}
-        for remap_vertex_index, vert_index in enumerate(sector_verts):
-            vert_co = verts[vert_index]
-            bm.verts.new((vert_co[0], vert_co[2], vert_co[1]))
-            remap_verts[vert_index] = remap_vertex_index
-        verts_count = remap_vertex_index + 1
-        bm.verts.ensure_lookup_table()
-        bm.verts.index_update()
-
-        # create tris
-        tris_2 = []    # two sided tris
-        verts_2 = set()    # two sided verts
-        for tris_index in triangles:
-            vert_1, vert_2, vert_3, mat_id, shadow, wm = tris[tris_index]
-            try:
-                face = bm.faces.new((
-                    bm.verts[remap_verts[vert_1]],
-                    bm.verts[remap_verts[vert_3]],
-                    bm.verts[remap_verts[vert_2]]
-                ))
-                material = sectors_mats[sector].index((mat_id, shadow, wm))
-                face.material_index = material
-                face.smooth = True
-            except ValueError:
-                face = None
-                tris_2.append((vert_1, vert_2, vert_3, mat_id, shadow, wm))
-                verts_2.update((vert_1, vert_2, vert_3))
-
-        # create two sided verts
-        remap_vertices = {}
-        for remap_vert_index, vertex_index in enumerate(verts_2):
-            vert_co = verts[vertex_index]
-            bm.verts.new((vert_co[0], vert_co[2], vert_co[1]))
-            remap_vertices[vertex_index] = remap_vert_index + verts_count
-        bm.verts.ensure_lookup_table()
-        bm.verts.index_update()
-
-        # create two sided tris
-        for vert_1, vert_2, vert_3, mat_id, shadow, wm in tris_2:
-            try:
-                face = bm.faces.new((
-                    bm.verts[remap_vertices[vert_1]],
-                    bm.verts[remap_vertices[vert_3]],
-                    bm.verts[remap_vertices[vert_2]]
-                ))
-                mat = sectors_mats[sector].index((mat_id, shadow, wm))
-                face.material_index = mat
-                face.smooth = True
-            except ValueError:    # face already exists
-                pass
-        bm.faces.ensure_lookup_table()
-        bm.faces.index_update()
-        bm.normal_update()
+    tris_verts = cform.tris['verts'][:, (0, 2, 1)]
+    sectors_tris = get_sectors_tris(cform.tris['sector'])
+    empty_tris = numpy.zeros(0, dtype=numpy.int64)
+    collection = level.collections[create.LEVEL_CFORM_COLLECTION_NAME]
+    for sector, sector_object in level.sectors_objects.items():
+        sector_tris = sectors_tris.get(sector, empty_tris)
+        verts, faces, faces_ids = get_sector_geometry(
+            cform.verts,
+            tris_verts[sector_tris]
+        )
+        faces_mats = mat_keys[sector_tris][faces_ids]
+        sector_mats, material_indices = numpy.unique(
+            faces_mats,
+            return_inverse=True
+        )
 
         # create mesh
         obj_name = 'cform_{:0>3}'.format(sector)
-        bpy_mesh = bpy.data.meshes.new(obj_name)
+        bpy_mesh = ogf.imp.create_mesh(obj_name, verts, faces)
+        bpy_mesh.polygons.foreach_set(
+            'material_index',
+            material_indices.astype(numpy.int32)
+        )
+        bpy_mesh.update(calc_edges=True)
 
         # append materials
-        for mat_id, _, _ in sectors_mats[sector]:
-            bpy_material = bpy_materials[mat_id]
+        for mat_key in sector_mats.tolist():
+            bpy_material = bpy_materials[mat_key >> 2]
             bpy_mesh.materials.append(bpy_material)
 
         # create object
-        bm.to_mesh(bpy_mesh)
         bpy_obj = bpy.data.objects.new(obj_name, bpy_mesh)
-        bpy_obj.parent = level.sectors_objects[sector]
+        bpy_obj.parent = sector_object
         bpy_obj.xray.is_level = True
         bpy_obj.xray.level.object_type = 'CFORM'
-        collection = level.collections[create.LEVEL_CFORM_COLLECTION_NAME]
         collection.objects.link(bpy_obj)
         if not version_utils.IS_28:
             version_utils.link_object(bpy_obj)
@@ -1,15 +1,21 @@
 # standart modules
 import os
 import math
+import bisect
 import struct
+import concurrent.futures
 
 # blender modules
 import bpy
 import bmesh
 import mathutils
+import numpy
 
 # addon modules
 from . import fmt
+from . import profiler
+from . import swi
+from . import export_cache
 from .. import text
 from .. import utils
 from .. import log
@@ -17,26 +23,81 @@ from .. import data_blocks
 from .. import version_utils
 from .. import xray_io
 from .. import ogf
+from .. import vertex_cache
+from .. import progressive
 
 
 class VertexBuffer(object):
     def __init__(self):
         self.vertex_count = 0
-        self.position = bytearray()
-        self.normal = bytearray()
-        self.tangent = bytearray()
-        self.binormal = bytearray()
-        self.color_hemi = bytearray()
-        self.color_light = bytearray()
-        self.color_sun = bytearray()
-        self.uv = bytearray()
-        self.uv_fix = bytearray()
-        self.uv_lmap = bytearray()
-        self.shader_data = bytearray()
+        # attribute name -> list of the numpy arrays of the visuals
+        self.columns = {}
         self.vertex_format = None
 
+    def add(self, name, values):
+        self.columns.setdefault(name, []).append(values)
+
+    def get(self, name):
+        return numpy.concatenate(self.columns[name])
+
+
+# vertex buffer format -> interleaved vertex records
+VERTEX_RECORDS = {
+    'NORMAL': numpy.dtype({
+        'names': (
+            'position', 'normal', 'color_hemi', 'tangent', 'uv_fix_u',
+            'binormal', 'uv_fix_v', 'uv', 'uv_lmap'
+        ),
+        'formats': (
+            ('<f4', 3), ('u1', 3), 'u1', ('u1', 3), 'u1',
+            ('u1', 3), 'u1', ('<i2', 2), ('<i2', 2)
+        ),
+        'offsets': (0, 12, 15, 16, 19, 20, 23, 24, 28),
+        'itemsize': 32
+    }),
+    'TREE': numpy.dtype({
+        'names': (
+            'position', 'normal', 'color_hemi', 'tangent', 'uv_fix_u',
+            'binormal', 'uv_fix_v', 'uv', 'shader_data'
+        ),
+        'formats': (
+            ('<f4', 3), ('u1', 3), 'u1', ('u1', 3), 'u1',
+            ('u1', 3), 'u1', ('<i2', 2), '<u2'
+        ),
+        'offsets': (0, 12, 15, 16, 19, 20, 23, 24, 28),
+        'itemsize': 32    # 2 unused bytes at the end
+    }),
+    'COLOR': numpy.dtype({
+        'names': (
+            'position', 'normal', 'color_hemi', 'tangent', 'uv_fix_u',
+            'binormal', 'uv_fix_v', 'color_light', 'color_sun', 'uv'
+        ),
+        'formats': (
+            ('<f4', 3), ('u1', 3), 'u1', ('u1', 3), 'u1',
+            ('u1', 3), 'u1', ('u1', 3), 'u1', ('<i2', 2)
+        ),
+        'offsets': (0, 12, 15, 16, 19, 20, 23, 24, 27, 28),
+        'itemsize': 32
+    }),
+    'FASTPATH': numpy.dtype([('position', '<f4', (3, ))])
+}
+
+
+def get_vertex_records(vb):
+    records = numpy.zeros(vb.vertex_count, dtype=VERTEX_RECORDS[vb.vertex_format])
+    for name in records.dtype.names:
+        if name in vb.columns:
+            records[name] = vb.get(name)
+    if 'uv_fix_u' in records.dtype.names:
+        uv_fix = vb.get('uv_fix')
+        records['uv_fix_u'] = uv_fix[:, 0]
+        records['uv_fix_v'] = uv_fix[:, 1]
+    return records
+
 
 TWO_MEGABYTES = 1024 * 1024 * 2
+VERTEX_SIZE = 32
+INDEX_SIZE = 2
 
 
 class Visual(object):
@@ -64,8 +125,6 @@ class Level(object):
         self.materials = {}
         self.visuals = []
         self.active_material_index = 0
-        self.vbs_offsets = []
-        self.ibs_offsets = []
         self.fp_vbs_offsets = []
         self.fp_ibs_offsets = []
         self.saved_visuals = {}
@@ -75,37 +134,46 @@ class Level(object):
         self.visuals_radius = {}
         self.visuals_cache = VisualsCache()
         self.cform_objects = {}
+        self.profiler = None
+        self.workers_count = 1
+        self.optimize_vertex_cache = False
+        self.vertex_cache_stats = vertex_cache.CacheStats()
+        self.progressive_meshes = False
+        self.slide_windows = {}    # mesh name -> slide windows
+        self.swis = []    # slide windows of the tree progressive visuals
+        self.swis_indices = {}
+        self.export_cache = None
 
 
-def write_level_geom_swis():
-    packed_writer = xray_io.PackedWriter()
-    # TODO: export swis data
-    packed_writer.putf('<I', 0)    # swis count
-    return packed_writer
+def write_level_geom_swis(swis):
+    return swi.write_slide_window_items(swis)
 
 
-def write_level_geom_ib(ibs):
+def write_level_geom_ib(chunked_writer, ibs):
     packed_writer = xray_io.PackedWriter()
     packed_writer.putf('<I', len(ibs))    # indices buffers count
+    chunked_writer.putp(packed_writer)
 
+    # buffers are written one at a time to the opened chunk
     for ib in ibs:
+        packed_writer = xray_io.PackedWriter()
         indices_count = len(ib) // 2    # index size = 2 byte
         packed_writer.putf('<I', indices_count)    # indices count
 
-        for index in range(0, indices_count, 3):
-            packed_writer.data.extend(ib[index * 2 : index * 2 + 2])
-            packed_writer.data.extend(ib[index * 2 + 4 : index * 2 + 6])
-            packed_writer.data.extend(ib[index * 2 + 2 : index * 2 + 4])
-
-    return packed_writer
+        # swap the second and third indices of the triangles
+        indices = numpy.frombuffer(ib, dtype='<u2')
+        packed_writer.put_array(indices.reshape(-1, 3)[:, (0, 2, 1)])
+        chunked_writer.putp(packed_writer)
 
 
-def write_level_geom_vb(vbs):
+def write_level_geom_vb(chunked_writer, vbs):
     packed_writer = xray_io.PackedWriter()
-
     packed_writer.putf('<I', len(vbs))    # vertex buffers count
+    chunked_writer.putp(packed_writer)
 
+    # buffers are written one at a time to the opened chunk
     for vb in vbs:
+        packed_writer = xray_io.PackedWriter()
         if vb.vertex_format == 'NORMAL':
             offsets = (0, 12, 16, 20, 24, 28)    # normal visual vertex buffer offsets
             usage_indices = (0, 0, 0, 0, 0, 1)
@@ -142,135 +210,25 @@ def write_level_geom_vb(vbs):
 
         packed_writer.putf('<I', vb.vertex_count)    # vertices count
 
-        if vb.vertex_format == 'NORMAL':
-            for vertex_index in range(vb.vertex_count):
-                vertex_pos = vb.position[vertex_index * 12 : vertex_index * 12 + 12]
-                packed_writer.data.extend(vertex_pos)
-                packed_writer.putf(
-                    '<4B',
-                    vb.normal[vertex_index * 3],
-                    vb.normal[vertex_index * 3 + 1],
-                    vb.normal[vertex_index * 3 + 2],
-                    vb.color_hemi[vertex_index]
-                )    # normal, hemi
-                uv_fix = vb.uv_fix[vertex_index * 2 : vertex_index * 2 + 2]
-                # tangent
-                packed_writer.putf(
-                    '<4B',
-                    vb.tangent[vertex_index * 3],
-                    vb.tangent[vertex_index * 3 + 1],
-                    vb.tangent[vertex_index * 3 + 2],
-                    uv_fix[0]
-                )
-                # binormal
-                packed_writer.putf(
-                    '<4B',
-                    vb.binormal[vertex_index * 3],
-                    vb.binormal[vertex_index * 3 + 1],
-                    vb.binormal[vertex_index * 3 + 2],
-                    uv_fix[1]
-                )
-                # texture coordinate
-                packed_writer.data.extend(vb.uv[vertex_index * 4 : vertex_index * 4 + 4])
-                # light map texture coordinate
-                packed_writer.data.extend(vb.uv_lmap[vertex_index * 4 : vertex_index * 4 + 4])
-
-        elif vb.vertex_format == 'TREE':
-            for vertex_index in range(vb.vertex_count):
-                vertex_pos = vb.position[vertex_index * 12 : vertex_index * 12 + 12]
-                packed_writer.data.extend(vertex_pos)
-                packed_writer.putf(
-                    '<4B',
-                    vb.normal[vertex_index * 3],
-                    vb.normal[vertex_index * 3 + 1],
-                    vb.normal[vertex_index * 3 + 2],
-                    vb.color_hemi[vertex_index]
-                )    # normal, hemi
-                uv_fix = vb.uv_fix[vertex_index * 2 : vertex_index * 2 + 2]
-                # tangent
-                packed_writer.putf(
-                    '<4B',
-                    vb.tangent[vertex_index * 3],
-                    vb.tangent[vertex_index * 3 + 1],
-                    vb.tangent[vertex_index * 3 + 2],
-                    uv_fix[0]
-                )
-                # binormal
-                packed_writer.putf(
-                    '<4B',
-                    vb.binormal[vertex_index * 3],
-                    vb.binormal[vertex_index * 3 + 1],
-                    vb.binormal[vertex_index * 3 + 2],
-                    uv_fix[1]
-                )
-                # texture coordinate
-                packed_writer.data.extend(vb.uv[vertex_index * 4 : vertex_index * 4 + 4])
-                # tree shader data (wind coefficient and unused 2 bytes)
-                frac = vb.shader_data[vertex_index * 2 : vertex_index * 2 + 2]
-                frac.extend((0, 0))
-                packed_writer.data.extend(frac)
-
-        elif vb.vertex_format == 'COLOR':
-            for vertex_index in range(vb.vertex_count):
-                vertex_pos = vb.position[vertex_index * 12 : vertex_index * 12 + 12]
-                packed_writer.data.extend(vertex_pos)
-                packed_writer.putf(
-                    '<4B',
-                    vb.normal[vertex_index * 3],
-                    vb.normal[vertex_index * 3 + 1],
-                    vb.normal[vertex_index * 3 + 2],
-                    vb.color_hemi[vertex_index]
-                )    # normal, hemi
-                uv_fix = vb.uv_fix[vertex_index * 2 : vertex_index * 2 + 2]
-                # tangent
-                packed_writer.putf(
-                    '<4B',
-                    vb.tangent[vertex_index * 3],
-                    vb.tangent[vertex_index * 3 + 1],
-                    vb.tangent[vertex_index * 3 + 2],
-                    uv_fix[0]
-                )
-                # binormal
-                packed_writer.putf(
-                    '<4B',
-                    vb.binormal[vertex_index * 3],
-                    vb.binormal[vertex_index * 3 + 1],
-                    vb.binormal[vertex_index * 3 + 2],
-                    uv_fix[1]
-                )
-                # vertex color
-                packed_writer.putf(
-                    '<4B',
-                    vb.color_light[vertex_index * 3],
-                    vb.color_light[vertex_index * 3 + 1],
-                    vb.color_light[vertex_index * 3 + 2],
-                    vb.color_sun[vertex_index]
-                )
-                # texture coordinate
-                packed_writer.data.extend(vb.uv[vertex_index * 4 : vertex_index * 4 + 4])
+        # vertex attributes interleaved by rows
+        if vb.vertex_count:
+            packed_writer.put_array(get_vertex_records(vb))
 
-        elif vb.vertex_format == 'FASTPATH':
-            for vertex_index in range(vb.vertex_count):
-                vertex_pos = vb.position[vertex_index * 12 : vertex_index * 12 + 12]
-                packed_writer.data.extend(vertex_pos)
+        chunked_writer.putp(packed_writer)
 
-    return packed_writer
 
-
-def write_level_geom(chunked_writer, vbs, ibs):
+def write_level_geom(chunked_writer, vbs, ibs, swis=()):
     header_packed_writer = write_header()
     chunked_writer.put(fmt.HEADER, header_packed_writer)
     del header_packed_writer
 
-    vb_packed_writer = write_level_geom_vb(vbs)
-    chunked_writer.put(fmt.Chunks13.VB, vb_packed_writer)
-    del vb_packed_writer
+    with chunked_writer.chunk(fmt.Chunks13.VB):
+        write_level_geom_vb(chunked_writer, vbs)
 
-    ib_packed_writer = write_level_geom_ib(ibs)
-    chunked_writer.put(fmt.Chunks13.IB, ib_packed_writer)
-    del ib_packed_writer
+    with chunked_writer.chunk(fmt.Chunks13.IB):
+        write_level_geom_ib(chunked_writer, ibs)
 
-    swis_packed_writer = write_level_geom_swis()
+    swis_packed_writer = write_level_geom_swis(swis)
     chunked_writer.put(fmt.Chunks13.SWIS, swis_packed_writer)
     del swis_packed_writer
 
@@ -426,71 +384,117 @@ def get_bbox_center(bbox):
     return bbox_center
 
 
-def find_distance(vertex_1, vertex_2):
-    distance = (
-        (vertex_2[0] - vertex_1[0]) ** 2 + \
-        (vertex_2[1] - vertex_1[1]) ** 2 + \
-        (vertex_2[2] - vertex_1[2]) ** 2
-    ) ** (1 / 2)
-    return distance
+def find_distance(vertices, vertex):
+    # distance from the every vertex to the vertex
+    offsets = vertices - numpy.asarray(vertex, dtype=numpy.float64)
+    return numpy.sqrt((offsets * offsets).sum(axis=1))
 
 
 MAX_TILE = 16
 QUANT = 32768 / MAX_TILE
 
 
-def clamp(value, min_value, max_value):
-    if value > max_value:
-        value = max_value
-    elif value < min_value:
-        value = min_value
-    return value
-
-
-def quant_value(float_value):
-    return clamp(
-        int(float_value * QUANT),
+def quant_value(float_values):
+    return numpy.clip(
+        numpy.trunc(float_values * QUANT),
         -32768,
         32767
-    )
+    ).astype(numpy.int64)
 
 
 def get_tex_coord_correct(tex_coord_f, tex_coord_h, uv_coeff):
-    if tex_coord_f > 0:
-        tex_coord_diff = tex_coord_f - (tex_coord_h / uv_coeff)
-    else:
-        tex_coord_diff = (1 + (tex_coord_f * uv_coeff - tex_coord_h)) / uv_coeff
-        tex_coord_h -= 1
+    positive = tex_coord_f > 0
+    tex_coord_diff = numpy.where(
+        positive,
+        tex_coord_f - (tex_coord_h / uv_coeff),
+        (1 + (tex_coord_f * uv_coeff - tex_coord_h)) / uv_coeff
+    )
+    tex_coord_h = numpy.where(positive, tex_coord_h, tex_coord_h - 1)
 
     tex_correct = (255 * 0x8000 * tex_coord_diff) / 32
-    return int(round(tex_correct, 0)), tex_coord_h
+    return numpy.round(tex_correct).astype(numpy.int64), tex_coord_h
 
 
-def write_gcontainer(bpy_obj, vbs, ibs, level):
-    visual = Visual()
-    material = bpy_obj.data.materials[0]
-    if level.materials.get(material, None) is None:
-        level.materials[material] = level.active_material_index
-        visual.shader_index = level.active_material_index
-        level.active_material_index += 1
-    else:
-        visual.shader_index = level.materials[material]
+def quant_unit_vectors(vectors):
+    # unit vectors to unsigned bytes in x-ray axes order
+    vectors = vectors.astype(numpy.float64)[:, (1, 2, 0)]
+    return numpy.round(((vectors + 1.0) / 2) * 255).astype(numpy.uint8)
 
-    packed_writer = xray_io.PackedWriter()
 
-    # multiple usage visuals
-    gcontainer = level.saved_visuals.get(bpy_obj.data.name, None)
-    if gcontainer:
-        packed_writer.putf('<I', gcontainer[0])    # vb_index
-        packed_writer.putf('<I', gcontainer[1])    # vb_offset
-        packed_writer.putf('<I', gcontainer[2])    # vb_size
+def quant_colors(colors):
+    return numpy.round(colors.astype(numpy.float64) * 255).astype(numpy.uint8)
 
-        packed_writer.putf('<I', gcontainer[3])    # ib_index
-        packed_writer.putf('<I', gcontainer[4])    # ib_offset
-        packed_writer.putf('<I', gcontainer[5])    # ib_size
 
-        return packed_writer, visual
+def get_binormals(normals, tangents):
+    # normal.cross(tangent).normalized() with the float
+    # arithmetic of mathutils vectors
+    normals = normals.astype(numpy.float32)
+    tangents = tangents.astype(numpy.float32)
+    binormals = numpy.empty(normals.shape, dtype=numpy.float32)
+    for axis in range(3):
+        axis_1 = (axis + 1) % 3
+        axis_2 = (axis + 2) % 3
+        binormals[:, axis] = (
+            normals[:, axis_1] * tangents[:, axis_2] -
+            normals[:, axis_2] * tangents[:, axis_1]
+        )
+    squares = (binormals * binormals).astype(numpy.float64)
+    lengths = (squares[:, 2] + squares[:, 1] + squares[:, 0]).astype(numpy.float32)
+    nonzero = lengths > 1.0e-35
+    lengths = numpy.sqrt(lengths)
+    lengths[~nonzero] = 1.0
+    binormals *= (numpy.float32(1.0) / lengths)[:, None]
+    binormals[~nonzero] = 0.0
+    return binormals
+
+
+def get_loops_values(collection, prop_name, loops_count, size):
+    values = numpy.empty(loops_count * size, dtype=numpy.float32)
+    collection.foreach_get(prop_name, values)
+    return values.reshape(loops_count, size)
+
 
+def get_color_size():
+    if version_utils.IS_28:
+        return 4    # rgba
+    return 3    # rgb
+
+
+class VisualGeometry(object):
+    # loops attributes of the triangulated visual mesh
+    def __init__(self):
+        self.name = None
+        self.vertex_format = None
+        self.coords = None
+        self.normals = None
+        self.tangents = None
+        self.uvs = None
+        self.uvs_lmap = None
+        self.hemi = None
+        self.sun = None
+        self.light = None
+        self.has_lmap = False
+        self.has_sun = False
+        self.has_light = False
+        self.frac_low = None
+        self.frac_y_size = None
+
+
+PROGRESSIVE_VISUALS = ('PROGRESSIVE', 'TREE_PM')
+
+
+class EncodedVisual(object):
+    # vertex buffer columns and indices of the visual
+    def __init__(self, vertex_format):
+        self.vertex_format = vertex_format
+        self.vertices_count = 0
+        self.indices = None
+        self.columns = {}
+        self.cache_stats = None
+        self.slide_windows = None
+
+
+def get_visual_geometry(bpy_obj, material):
     bm = bmesh.new()
     bm.from_mesh(bpy_obj.data)
     bmesh.ops.triangulate(bm, faces=bm.faces)
@@ -498,258 +502,387 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
     export_mesh.use_auto_smooth = True
     export_mesh.auto_smooth_angle = math.pi
     bm.to_mesh(export_mesh)
+    bm.free()
     export_mesh.calc_normals_split()
 
-    uv_layer = bm.loops.layers.uv[material.xray.uv_texture]
-    uv_layer_lmap = bm.loops.layers.uv.get(material.xray.uv_light_map, None)
-    vertex_color_sun = bm.loops.layers.color.get(
+    uv_layer = export_mesh.uv_layers[material.xray.uv_texture]
+    uv_layer_lmap = export_mesh.uv_layers.get(material.xray.uv_light_map, None)
+    vertex_color_sun = export_mesh.vertex_colors.get(
         material.xray.sun_vert_color, None
     )
-    vertex_color_hemi = bm.loops.layers.color.get(
+    vertex_color_hemi = export_mesh.vertex_colors.get(
         material.xray.hemi_vert_color, None
     )
-    vertex_color_light = bm.loops.layers.color.get(
+    vertex_color_light = export_mesh.vertex_colors.get(
         material.xray.light_vert_color, None
     )
     export_mesh.calc_tangents(uvmap=uv_layer.name)
 
-    vertex_size = 32
+    geometry = VisualGeometry()
+    geometry.name = bpy_obj.name
+    geometry.has_lmap = bool(uv_layer_lmap)
+    geometry.has_sun = bool(vertex_color_sun)
+    geometry.has_light = bool(vertex_color_light)
     if vertex_color_sun:
-        vertex_format = 'COLOR'
+        geometry.vertex_format = 'COLOR'
     elif uv_layer_lmap:
-        vertex_format = 'NORMAL'
+        geometry.vertex_format = 'NORMAL'
     else:
-        vertex_format = 'TREE'
-
-    # find vertex buffer
-    if vbs:
-        vb = None
-        for vertex_buffer in vbs:
-            if vertex_buffer.vertex_format == vertex_format:
-                if vertex_buffer.vertex_count * vertex_size > TWO_MEGABYTES:    # vb size 2 MB
-                    continue
-                else:
-                    vb = vertex_buffer
-                    break
-        if vb is None:
-            vb = VertexBuffer()
-            vb.vertex_format = vertex_format
-            vbs.append(vb)
-            level.vbs_offsets.append(0)
+        geometry.vertex_format = 'TREE'
+
+    # loops attributes
+    loops = export_mesh.loops
+    loops_count = len(loops)
+    loops_vertices = numpy.empty(loops_count, dtype=numpy.int32)
+    loops.foreach_get('vertex_index', loops_vertices)
+    coords = numpy.empty(len(export_mesh.vertices) * 3, dtype=numpy.float32)
+    export_mesh.vertices.foreach_get('co', coords)
+    geometry.coords = coords.reshape(-1, 3)[loops_vertices]
+    geometry.normals = get_loops_values(loops, 'normal', loops_count, 3)
+    geometry.tangents = get_loops_values(loops, 'tangent', loops_count, 3)
+    geometry.uvs = get_loops_values(uv_layer.data, 'uv', loops_count, 2)
+    # missing layers are zeros
+    zeros = numpy.zeros((loops_count, 1), dtype=numpy.float32)
+    if uv_layer_lmap:
+        geometry.uvs_lmap = get_loops_values(
+            uv_layer_lmap.data, 'uv', loops_count, 2
+        )
     else:
-        vb = VertexBuffer()
-        vb.vertex_format = vertex_format
-        vbs.append(vb)
-        level.vbs_offsets.append(0)
-
-    # find indices buffer
-    if ibs:
-        ib = ibs[-1]
-        ib_offset = level.ibs_offsets[-1]
-        indices_buffer_index = ibs.index(ib)
-        if len(ib) > TWO_MEGABYTES:
-            ib = bytearray()
-            ibs.append(ib)
-            ib_offset = 0
-            indices_buffer_index += 1
-            level.ibs_offsets.append(ib_offset)
+        geometry.uvs_lmap = numpy.hstack((zeros, zeros))
+    color_size = get_color_size()
+    if vertex_color_hemi:
+        geometry.hemi = get_loops_values(
+            vertex_color_hemi.data, 'color', loops_count, color_size
+        )[:, 0 : 1]
     else:
-        ib = bytearray()
-        ibs.append(ib)
-        ib_offset = 0
-        level.ibs_offsets.append(ib_offset)
-        indices_buffer_index = 0
+        geometry.hemi = zeros
+    if vertex_color_sun:
+        geometry.sun = get_loops_values(
+            vertex_color_sun.data, 'color', loops_count, color_size
+        )[:, 0 : 1]
+    else:
+        geometry.sun = zeros
+    if vertex_color_light:
+        geometry.light = get_loops_values(
+            vertex_color_light.data, 'color', loops_count, color_size
+        )
+    else:
+        geometry.light = numpy.hstack((zeros, zeros, zeros))
 
-    vertices_count = 0
-    indices_count = 0
-    vertex_index = 0
+    # tree shader params
+    frac_low = get_bbox_center(bpy_obj.bound_box)
+    frac_low[2] = bpy_obj.bound_box[0][2]
+    geometry.frac_low = frac_low
+    geometry.frac_y_size = bpy_obj.bound_box[6][2] - bpy_obj.bound_box[0][2]
 
-    unique_verts = {}
-    verts_indices = {}
-    for face in bm.faces:
-        for loop in face.loops:
-            vert = loop.vert
-            vert_co = (vert.co[0], vert.co[1], vert.co[2])
-            split_normal = export_mesh.loops[loop.index].normal
-            normal = (split_normal[0], split_normal[1], split_normal[2])
-            uv = loop[uv_layer].uv[0], loop[uv_layer].uv[1]
-            # UV-LightMaps
-            if uv_layer_lmap:
-                uv_lmap = loop[uv_layer_lmap].uv[0], loop[uv_layer_lmap].uv[1]
-            else:
-                uv_lmap = (0.0, 0.0)
-            # Vertex Color Hemi
-            if vertex_color_hemi:
-                hemi = loop[vertex_color_hemi][0]
-            else:
-                hemi = 0
-            # Vertex Color Sun
-            if vertex_color_sun:
-                sun = loop[vertex_color_sun][0]
-            else:
-                sun = 0
-            # Vertex Color Light
-            if vertex_color_light:
-                light = loop[vertex_color_light]
-            else:
-                light = (0, 0, 0)
-            if unique_verts.get(vert_co, None):
-                if not (uv, uv_lmap, normal, hemi, sun, light) in unique_verts[vert_co]:
-                    unique_verts[vert_co].append((uv, uv_lmap, normal, hemi, sun, light))
-                    verts_indices[vert_co].append(vertex_index)
-                    vertex_index += 1
-            else:
-                unique_verts[vert_co] = [(uv, uv_lmap, normal, hemi, sun, light), ]
-                verts_indices[vert_co] = [vertex_index, ]
-                vertex_index += 1
+    bpy.data.meshes.remove(export_mesh)
 
-    vertex_index = 0
-    saved_verts = set()
-    if uv_layer_lmap or vertex_color_sun:
+    return geometry
+
+
+def encode_visual(geometry, optimize_vertex_cache=False, use_progressive=False):
+    # does not use bpy, so it can be called from the worker threads,
+    # export_cache.ENCODER_VERSION must be bumped when the result changes
+    encoded = EncodedVisual(geometry.vertex_format)
+    columns = encoded.columns
+    coords = geometry.coords
+    loops_count = len(coords)
+
+    # unique vertices in the order of the first use,
+    # + 0.0 makes -0.0 and 0.0 the same key
+    vertices_keys = numpy.hstack((
+        coords, geometry.uvs, geometry.uvs_lmap, geometry.normals,
+        geometry.hemi, geometry.sun, geometry.light
+    )) + numpy.float32(0.0)
+    indices = ogf.imp.get_group_ids(vertices_keys)
+    vertices_count = int(indices.max()) + 1 if loops_count else 0
+    if vertices_count > fmt.VERTICES_COUNT_LIMIT:
+        raise utils.AppError(
+            text.error.level_many_verts,
+            log.props(
+                object=geometry.name,
+                vertices_count=vertices_count,
+                must_be_no_more_than=fmt.VERTICES_COUNT_LIMIT
+            )
+        )
+    first_loops = numpy.zeros(vertices_count, dtype=numpy.int64)
+    first_loops[indices[::-1]] = numpy.arange(loops_count)[::-1]
+    progressive_mesh = None
+    if use_progressive:
+        progressive_mesh = progressive.generate(
+            coords[first_loops],
+            indices.reshape(-1, 3)
+        )
+    if progressive_mesh:
+        # slide windows define the index order, the cache
+        # optimization is not used for the progressive visuals
+        vertices_order, indices, encoded.slide_windows = progressive_mesh
+        first_loops = first_loops[vertices_order]
+    elif optimize_vertex_cache:
+        encoded.cache_stats = vertex_cache.CacheStats()
+        triangles, vertices_order = vertex_cache.optimize_with_stats(
+            indices, vertices_count, encoded.cache_stats
+        )
+        indices = triangles.ravel()
+        first_loops = first_loops[vertices_order]
+    encoded.vertices_count = vertices_count
+    encoded.indices = indices.astype('<u2')
+
+    # vertices attributes of the first loops
+    coords = coords[first_loops]
+    normals = geometry.normals[first_loops]
+    tangents = geometry.tangents[first_loops]
+    uvs = geometry.uvs[first_loops].astype(numpy.float64)
+
+    columns['position'] = coords[:, (0, 2, 1)]
+    columns['normal'] = quant_unit_vectors(normals)
+    columns['tangent'] = quant_unit_vectors(tangents)
+    binormals = get_binormals(normals, tangents)
+    columns['binormal'] = quant_unit_vectors(binormals)
+
+    # vertex color light
+    columns['color_hemi'] = quant_colors(geometry.hemi[first_loops, 0])
+    if geometry.has_sun:
+        columns['color_sun'] = quant_colors(geometry.sun[first_loops, 0])
+        light = geometry.light[first_loops]
+        columns['color_light'] = quant_colors(light[:, (2, 1, 0)])
+
+    # uv
+    if geometry.has_lmap or geometry.has_sun:
         uv_coeff = fmt.UV_COEFFICIENT
     else:
         uv_coeff = fmt.UV_COEFFICIENT_2
-    # tree shader params
-    frac_low = get_bbox_center(bpy_obj.bound_box)
-    frac_low[2] = bpy_obj.bound_box[0][2]
-    frac_y_size = bpy_obj.bound_box[6][2] - bpy_obj.bound_box[0][2]
-    for face in bm.faces:
-        for loop in face.loops:
-            vert = loop.vert
-            vert_co = (vert.co[0], vert.co[1], vert.co[2])
-            vert_data = unique_verts[vert_co]
-            uv = loop[uv_layer].uv
-            split_normal = export_mesh.loops[loop.index].normal
-            if uv_layer_lmap:
-                uv_lmap = loop[uv_layer_lmap].uv
-            else:
-                uv_lmap = (0.0, 0.0)
-            # Vertex Color Hemi
-            if vertex_color_hemi:
-                hemi = loop[vertex_color_hemi][0]
-            else:
-                hemi = 0
-            # Vertex Color Sun
-            if vertex_color_sun:
-                sun = loop[vertex_color_sun][0]
-            else:
-                sun = 0
-            # Vertex Color Light
-            if vertex_color_light:
-                light = loop[vertex_color_light]
-            else:
-                light = (0, 0, 0)
-            for index, data in enumerate(vert_data):
-                if data[0] == (uv[0], uv[1]) and \
-                        data[1] == (uv_lmap[0], uv_lmap[1]) and \
-                        data[2] == (split_normal[0], split_normal[1], split_normal[2]) and \
-                        data[3] == hemi and data[4] == sun and data[5] == light:
-                    tex_uv, tex_uv_lmap, normal, hemi, sun, light = data
-                    vert_index = verts_indices[vert_co][index]
-                    break
-            packed_vertex_index = struct.pack('<H', vert_index)
-            ib.extend(packed_vertex_index)
-            indices_count += 1
-            if not vert_index in saved_verts:
-                vb.vertex_count += 1
-                saved_verts.add(vert_index)
-                vertex_index += 1
-                vertices_count += 1
-                packed_co = struct.pack('<3f', vert.co[0], vert.co[2], vert.co[1])
-                vb.position.extend(packed_co)
-                vb.normal.extend((
-                    int(round(((normal[1] + 1.0) / 2) * 255, 0)),
-                    int(round(((normal[2] + 1.0) / 2) * 255, 0)),
-                    int(round(((normal[0] + 1.0) / 2) * 255, 0))
-                ))
-                tangent = export_mesh.loops[loop.index].tangent
-                vb.tangent.extend((
-                    int(round(((tangent[1] + 1.0) / 2) * 255, 0)),
-                    int(round(((tangent[2] + 1.0) / 2) * 255, 0)),
-                    int(round(((tangent[0] + 1.0) / 2) * 255, 0))
-                ))
-                normal = mathutils.Vector(normal)
-                binormal = normal.cross(tangent).normalized()
-                vb.binormal.extend((
-                    int(round(((binormal[1] + 1.0) / 2) * 255, 0)),
-                    int(round(((binormal[2] + 1.0) / 2) * 255, 0)),
-                    int(round(((binormal[0] + 1.0) / 2) * 255, 0))
-                ))
-                # vertex color light
-                vb.color_hemi.append(int(round(hemi * 255, 0)))
-                if vertex_color_sun:
-                    vb.color_sun.append(int(round(sun * 255, 0)))
-                    vb.color_light.extend((
-                        (int(round(light[2] * 255, 0))),
-                        (int(round(light[1] * 255, 0))),
-                        (int(round(light[0] * 255, 0)))
-                    ))
-                # uv
-                tex_coord_u = int(tex_uv[0] * uv_coeff)
-                tex_coord_v = int((1 - tex_uv[1]) * uv_coeff)
-                # uv correct
-                tex_coord_u_correct, tex_coord_u = get_tex_coord_correct(tex_uv[0], tex_coord_u, uv_coeff)
-                tex_coord_v_correct, tex_coord_v = get_tex_coord_correct(1 - tex_uv[1], tex_coord_v, uv_coeff)
-                pw = xray_io.PackedWriter()
-                pw.putf('<2B', tex_coord_u_correct, tex_coord_v_correct)
-
-                # set uv limits
-                if tex_coord_u > 0x7fff:
-                    tex_coord_u = 0x7fff
-                elif tex_coord_u < -0x8000:
-                    tex_coord_u = -0x8000
-
-                if tex_coord_v > 0x7fff:
-                    tex_coord_v = 0x7fff
-                elif tex_coord_v < -0x8000:
-                    tex_coord_v = -0x8000
-
-                packed_uv = struct.pack('<2h', tex_coord_u, tex_coord_v)
-                vb.uv.extend(packed_uv)
-                packed_uv_fix = struct.pack('<2B', tex_coord_u_correct, tex_coord_v_correct)
-                vb.uv_fix.extend(packed_uv_fix)
-                if uv_layer_lmap:
-                    lmap_u = int(round(tex_uv_lmap[0] * fmt.LIGHT_MAP_UV_COEFFICIENT, 0))
-                    lmap_v = int(round((1 - tex_uv_lmap[1]) * fmt.LIGHT_MAP_UV_COEFFICIENT, 0))
-                    packed_uv_lmap = struct.pack('<2h', lmap_u, lmap_v)
-                    vb.uv_lmap.extend(packed_uv_lmap)
-                # tree shader data (wind coefficient)
-                if not (uv_layer_lmap or vertex_color_sun or vertex_color_light):
-                    f1 = (vert.co[2] - frac_low[2]) / frac_y_size
-                    f2 = find_distance(vert.co, frac_low) / frac_y_size
-                    frac = quant_value((f1 + f2) / 2)
-                    packed_shader_data = struct.pack('<H', frac)
-                    vb.shader_data.extend(packed_shader_data)    # wind coefficient
-
-    vertex_buffer_index = vbs.index(vb)
-    packed_writer.putf('<I', vertex_buffer_index)    # vb_index
-    packed_writer.putf('<I', level.vbs_offsets[vertex_buffer_index])    # vb_offset
-    packed_writer.putf('<I', vertices_count)    # vb_size
+    tex_coord_f_u = uvs[:, 0]
+    tex_coord_f_v = 1 - uvs[:, 1]
+    tex_coord_u = numpy.trunc(tex_coord_f_u * uv_coeff)
+    tex_coord_v = numpy.trunc(tex_coord_f_v * uv_coeff)
+    # uv correct
+    tex_coord_u_correct, tex_coord_u = get_tex_coord_correct(
+        tex_coord_f_u, tex_coord_u, uv_coeff
+    )
+    tex_coord_v_correct, tex_coord_v = get_tex_coord_correct(
+        tex_coord_f_v, tex_coord_v, uv_coeff
+    )
+    # set uv limits
+    tex_coords = numpy.clip(
+        numpy.column_stack((tex_coord_u, tex_coord_v)),
+        -0x8000,
+        0x7fff
+    )
+    columns['uv'] = tex_coords.astype(numpy.int16)
+    uvs_fix = numpy.column_stack((tex_coord_u_correct, tex_coord_v_correct))
+    columns['uv_fix'] = uvs_fix.astype(numpy.uint8)
+
+    if geometry.has_lmap:
+        uvs_lmap = geometry.uvs_lmap[first_loops].astype(numpy.float64)
+        uvs_lmap[:, 1] = 1 - uvs_lmap[:, 1]
+        uvs_lmap = numpy.round(uvs_lmap * fmt.LIGHT_MAP_UV_COEFFICIENT)
+        columns['uv_lmap'] = uvs_lmap.astype(numpy.int16)
+
+    # tree shader data (wind coefficient), every vertex of the
+    # tree buffers has it, also the vertices with the light color
+    if geometry.vertex_format == 'TREE':
+        frac_low = geometry.frac_low
+        frac_y_size = geometry.frac_y_size
+        coords = coords.astype(numpy.float64)
+        f1 = (coords[:, 2] - frac_low[2]) / frac_y_size
+        f2 = find_distance(coords, frac_low) / frac_y_size
+        frac = quant_value((f1 + f2) / 2)
+        columns['shader_data'] = frac.astype(numpy.uint16)    # wind coefficient
+
+    return encoded
+
+
+def encode_visual_cached(
+        geometry,
+        optimize_vertex_cache=False,
+        use_progressive=False,
+        cache=None
+    ):
+    # unchanged visuals of the previous export are not encoded again
+    if not cache:
+        return encode_visual(geometry, optimize_vertex_cache, use_progressive)
+    key = export_cache.get_visual_key(
+        geometry,
+        optimize_vertex_cache,
+        use_progressive
+    )
+    encoded = EncodedVisual(geometry.vertex_format)
+    if cache.get(key, encoded):
+        return encoded
+    encoded = encode_visual(geometry, optimize_vertex_cache, use_progressive)
+    cache.put(key, encoded)
+    return encoded
 
-    packed_writer.putf('<I', indices_buffer_index)    # ib_index
-    packed_writer.putf('<I', ib_offset)    # ib_offset
-    packed_writer.putf('<I', indices_count)    # ib_size
 
-    level.saved_visuals[bpy_obj.data.name] = (
-        # vertices info
-        vertex_buffer_index,
-        level.vbs_offsets[vertex_buffer_index],
-        vertices_count,
+def get_visual_material(bpy_obj, visual, level):
+    material = bpy_obj.data.materials[0]
+    if level.materials.get(material, None) is None:
+        level.materials[material] = level.active_material_index
+        visual.shader_index = level.active_material_index
+        level.active_material_index += 1
+    else:
+        visual.shader_index = level.materials[material]
+    return material
+
+
+def get_best_fit_bins(sizes, capacity):
+    # best-fit decreasing bin packing, bins are numbered in the order
+    # of creation, items larger than the capacity get their own bins
+    items_order = sorted(range(len(sizes)), key=lambda index: -sizes[index])
+    free_spaces = []    # sorted (free space, bin index) pairs
+    bins = [None] * len(sizes)
+    bins_count = 0
+    for item_index in items_order:
+        size = sizes[item_index]
+        position = bisect.bisect_left(free_spaces, (size, -1))
+        if position < len(free_spaces):
+            free_space, bin_index = free_spaces.pop(position)
+        else:
+            free_space = max(capacity, size)
+            bin_index = bins_count
+            bins_count += 1
+        bins[item_index] = bin_index
+        bisect.insort(free_spaces, (free_space - size, bin_index))
+    return bins, bins_count
+
+
+def pack_visuals(level, encoded_visuals):
+    vbs = []
+
+    # vertex buffers are packed separately for the every format
+    vertex_formats = []
+    for _, encoded in encoded_visuals:
+        if encoded.vertex_format not in vertex_formats:
+            vertex_formats.append(encoded.vertex_format)
+    vbs_indices = [None] * len(encoded_visuals)
+    for vertex_format in vertex_formats:
+        visuals_indices = [
+            visual_index
+            for visual_index, (_, encoded) in enumerate(encoded_visuals)
+            if encoded.vertex_format == vertex_format
+        ]
+        sizes = [
+            encoded_visuals[visual_index][1].vertices_count * VERTEX_SIZE
+            for visual_index in visuals_indices
+        ]
+        bins, bins_count = get_best_fit_bins(sizes, TWO_MEGABYTES)
+        for visual_index, bin_index in zip(visuals_indices, bins):
+            vbs_indices[visual_index] = len(vbs) + bin_index
+        for _ in range(bins_count):
+            vb = VertexBuffer()
+            vb.vertex_format = vertex_format
+            vbs.append(vb)
+
+    # index buffers are common for all formats
+    sizes = [
+        len(encoded.indices) * INDEX_SIZE
+        for _, encoded in encoded_visuals
+    ]
+    ibs_indices, ibs_count = get_best_fit_bins(sizes, TWO_MEGABYTES)
+    ibs = [bytearray() for _ in range(ibs_count)]
+
+    # visuals are placed in the buffers in the order of the first use
+    for visual_index, (mesh_name, encoded) in enumerate(encoded_visuals):
+        vertex_buffer_index = vbs_indices[visual_index]
+        indices_buffer_index = ibs_indices[visual_index]
+        vb = vbs[vertex_buffer_index]
+        ib = ibs[indices_buffer_index]
+        vertices_count = encoded.vertices_count
+        indices_count = len(encoded.indices)
+
+        level.saved_visuals[mesh_name] = (
+            # vertices info
+            vertex_buffer_index,
+            vb.vertex_count,
+            vertices_count,
+
+            # indices info
+            indices_buffer_index,
+            len(ib) // INDEX_SIZE,
+            indices_count
+        )
 
-        # indices info
-        indices_buffer_index,
-        ib_offset,
-        indices_count
+        vb.vertex_count += vertices_count
+        for name, values in encoded.columns.items():
+            vb.add(name, values)
+        ib.extend(encoded.indices.tobytes())
+
+    return vbs, ibs
+
+
+def get_buffers_fill(sizes):
+    if not sizes:
+        return 0.0
+    capacity = sum(max(size, TWO_MEGABYTES) for size in sizes)
+    return sum(sizes) / capacity
+
+
+def report_buffers(context, level, vbs, ibs):
+    vbs_fill = get_buffers_fill([vb.vertex_count * VERTEX_SIZE for vb in vbs])
+    ibs_fill = get_buffers_fill([len(ib) for ib in ibs])
+    level.profiler.info['vertex_buffers'] = len(vbs)
+    level.profiler.info['vertex_buffers_fill'] = vbs_fill
+    level.profiler.info['index_buffers'] = len(ibs)
+    level.profiler.info['index_buffers_fill'] = ibs_fill
+    context.operator.report(
+        {'INFO'},
+        'Level buffers: {0} vertex ({1:.1%} filled), ' \
+        '{2} index ({3:.1%} filled)'.format(
+            len(vbs), vbs_fill, len(ibs), ibs_fill
+        )
     )
 
-    level.vbs_offsets[vertex_buffer_index] += vertices_count
-    level.ibs_offsets[-1] += indices_count
 
-    bpy.data.meshes.remove(export_mesh)
+def write_gcontainer(bpy_obj, level, is_progressive=False):
+    visual = Visual()
+    get_visual_material(bpy_obj, visual, level)
+
+    # visuals are packed to the buffers in advance,
+    # multiple usage visuals share the gcontainer
+    gcontainer = level.saved_visuals[bpy_obj.data.name]
+    ib_offset = gcontainer[4]
+    ib_size = gcontainer[5]
+
+    # not progressive visual of the progressive mesh
+    # uses the first slide window only
+    slide_windows = level.slide_windows.get(bpy_obj.data.name)
+    if slide_windows and not is_progressive:
+        offset, triangles_count, _ = slide_windows[0]
+        ib_offset += offset
+        ib_size = triangles_count * 3
+
+    packed_writer = xray_io.PackedWriter()
+    packed_writer.putf('<I', gcontainer[0])    # vb_index
+    packed_writer.putf('<I', gcontainer[1])    # vb_offset
+    packed_writer.putf('<I', gcontainer[2])    # vb_size
+
+    packed_writer.putf('<I', gcontainer[3])    # ib_index
+    packed_writer.putf('<I', ib_offset)    # ib_offset
+    packed_writer.putf('<I', ib_size)    # ib_size
 
     return packed_writer, visual
 
 
+def write_swidata(slide_windows):
+    packed_writer = xray_io.PackedWriter()
+    swi.write_slide_window_item(packed_writer, slide_windows)
+    return packed_writer
+
+
+def write_swicontainer(bpy_obj, level):
+    # tree visuals of the same mesh share the slide windows
+    mesh_name = bpy_obj.data.name
+    swi_index = level.swis_indices.get(mesh_name)
+    if swi_index is None:
+        swi_index = len(level.swis)
+        level.swis_indices[mesh_name] = swi_index
+        level.swis.append(level.slide_windows[mesh_name])
+    packed_writer = xray_io.PackedWriter()
+    packed_writer.putf('<I', swi_index)
+    return packed_writer
+
+
 def write_ogf_color(packed_writer, bpy_obj, mode='SCALE'):
     if mode == 'SCALE':
         rgb = bpy_obj.xray.level.color_scale_rgb
@@ -859,6 +992,7 @@ def write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level):
 
     unique_verts = {}
     verts_indices = {}
+    positions = []
     for face in bm.faces:
         for vert in face.verts:
             vert_co = (vert.co[0], vert.co[1], vert.co[2])
@@ -866,8 +1000,7 @@ def write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level):
             if not unique_verts.get(vert_co, None):
                 unique_verts[vert_co] = vertex_index
                 verts_indices[vert.index] = vertex_index
-                packed_co = struct.pack('<3f', vert_co[0], vert_co[2], vert_co[1])
-                vb.position.extend(packed_co)
+                positions.append((vert_co[0], vert_co[2], vert_co[1]))
                 vb.vertex_count += 1
                 vertices_count += 1
                 vertex_index += 1
@@ -875,6 +1008,8 @@ def write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level):
                 duplicate_vertex_index = unique_verts[vert_co]
                 verts_indices[vert.index] = duplicate_vertex_index
 
+    vb.add('position', numpy.array(positions, dtype=numpy.float32).reshape(-1, 3))
+
     for face in bm.faces:
         for vert in face.verts:
             vert_index = verts_indices[vert.index]
@@ -906,8 +1041,6 @@ def write_fastpath(fastpath_obj, fp_vbs, fp_ibs, level):
 
 def write_visual(
         bpy_obj,
-        vbs,
-        ibs,
         hierrarhy,
         visuals_ids,
         level,
@@ -926,19 +1059,49 @@ def write_visual(
         return chunked_writer
     else:
         chunked_writer = xray_io.ChunkedWriter()
+        visual_type = bpy_obj.xray.level.visual_type
+        # progressive visuals without the generated slide windows
+        # are exported as the static visuals
+        is_progressive = (
+            visual_type in PROGRESSIVE_VISUALS and
+            bpy_obj.data.name in level.slide_windows
+        )
         gcontainer_writer, visual = write_gcontainer(
-            bpy_obj, vbs, ibs, level
+            bpy_obj, level, is_progressive=is_progressive
         )
-        if bpy_obj.xray.level.visual_type in ('TREE_ST', 'TREE_PM'):
-            header_writer = write_visual_header(level, bpy_obj, visual=visual, visual_type=7)
+        if visual_type in ('TREE_ST', 'TREE_PM'):
+            if is_progressive:
+                model_type = ogf.fmt.ModelType_v4.TREE_PM
+            else:
+                model_type = ogf.fmt.ModelType_v4.TREE_ST
+            header_writer = write_visual_header(
+                level, bpy_obj, visual=visual, visual_type=model_type
+            )
             tree_def_2_writer = write_tree_def_2(bpy_obj, chunked_writer)
             chunked_writer.put(ogf.fmt.HEADER, header_writer)
             chunked_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, gcontainer_writer)
+            if is_progressive:
+                swicontainer_writer = write_swicontainer(bpy_obj, level)
+                chunked_writer.put(
+                    ogf.fmt.Chunks_v4.SWICONTAINER,
+                    swicontainer_writer
+                )
             chunked_writer.put(ogf.fmt.Chunks_v4.TREEDEF2, tree_def_2_writer)
         else:    # NORMAL or PROGRESSIVE visual
-            header_writer = write_visual_header(level, bpy_obj, visual=visual)
+            if is_progressive:
+                model_type = ogf.fmt.ModelType_v4.PROGRESSIVE
+            else:
+                model_type = ogf.fmt.ModelType_v4.NORMAL
+            header_writer = write_visual_header(
+                level, bpy_obj, visual=visual, visual_type=model_type
+            )
             chunked_writer.put(ogf.fmt.HEADER, header_writer)
             chunked_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, gcontainer_writer)
+            if is_progressive:
+                swidata_writer = write_swidata(
+                    level.slide_windows[bpy_obj.data.name]
+                )
+                chunked_writer.put(ogf.fmt.Chunks_v4.SWIDATA, swidata_writer)
             if len(level.visuals_cache.children[bpy_obj.name]):
                 raise utils.AppError(
                     text.error.level_has_children,
@@ -1049,14 +1212,14 @@ def write_lod_visual(bpy_obj, hierrarhy, visuals_ids, level):
 
 
 def write_visual_children(
-        chunked_writer, vbs, ibs,
+        chunked_writer,
         visual_index, hierrarhy,
         visuals_ids, visuals, level, fp_vbs, fp_ibs
     ):
 
     for visual_obj in visuals:
         visual_chunked_writer = write_visual(
-            visual_obj, vbs, ibs,
+            visual_obj,
             hierrarhy, visuals_ids, level, fp_vbs, fp_ibs
         )
         if visual_chunked_writer:
@@ -1065,6 +1228,71 @@ def write_visual_children(
     return visual_index
 
 
+def encode_visuals(visuals, level, executor=None):
+    # bpy data is read in the main thread, vertices are encoded
+    # by the worker threads if the executor is used. Only the numpy
+    # encoding runs in parallel: the vertex cache optimization and the
+    # progressive meshes are pure python and hold the GIL, they take
+    # 89-98% of the encoding time, so with them the threads give no speedup
+    encode = level.profiler.wrap('encode_visuals')(encode_visual_cached)
+    encoded_visuals = []
+    meshes = set()
+
+    # the mesh is progressive, if it is used by any progressive visual
+    progressive_meshes = set()
+    if level.progressive_meshes:
+        for visual_obj in visuals:
+            if visual_obj.xray.level.visual_type in PROGRESSIVE_VISUALS:
+                progressive_meshes.add(visual_obj.data.name)
+
+    with level.profiler.stage('extract_visuals'):
+        for visual_obj in visuals:
+            if visual_obj.xray.level.visual_type in ('HIERRARHY', 'LOD'):
+                continue
+            mesh_name = visual_obj.data.name
+            if mesh_name in meshes:
+                continue
+            meshes.add(mesh_name)
+            material = visual_obj.data.materials[0]
+            geometry = get_visual_geometry(visual_obj, material)
+            use_progressive = mesh_name in progressive_meshes
+            if executor:
+                encoded = executor.submit(
+                    encode,
+                    geometry,
+                    level.optimize_vertex_cache,
+                    use_progressive,
+                    level.export_cache
+                )
+            else:
+                encoded = encode(
+                    geometry,
+                    level.optimize_vertex_cache,
+                    use_progressive,
+                    level.export_cache
+                )
+            encoded_visuals.append((mesh_name, encoded))
+            del geometry
+
+    if executor:
+        encoded_visuals = [
+            (mesh_name, future.result())
+            for mesh_name, future in encoded_visuals
+        ]
+
+    for mesh_name, encoded in encoded_visuals:
+        if encoded.slide_windows:
+            level.slide_windows[mesh_name] = encoded.slide_windows
+        if encoded.cache_stats:
+            level.vertex_cache_stats.add(
+                encoded.cache_stats.triangles_count,
+                encoded.cache_stats.misses_before,
+                encoded.cache_stats.misses_after
+            )
+
+    return encoded_visuals
+
+
 def find_hierrarhy(level, visual_obj, visuals_hierrarhy, visual_index, visuals):
     visuals.append(visual_obj)
     visuals_hierrarhy[visual_obj.name] = []
@@ -1087,8 +1315,6 @@ def find_hierrarhy(level, visual_obj, visuals_hierrarhy, visual_index, visuals):
 def write_visuals(level_object, sectors_map, level):
     chunked_writer = xray_io.ChunkedWriter()
     sectors_chunked_writer = xray_io.ChunkedWriter()
-    vertex_buffers = []
-    indices_buffers = []
     fastpath_vertex_buffers = []
     fastpath_indices_buffers = []
     visual_index = 0
@@ -1131,8 +1357,17 @@ def write_visuals(level_object, sectors_map, level):
                         level.cform_objects[sector_id] = root_obj
                 sector_id += 1
 
+    if level.workers_count > 1:
+        with concurrent.futures.ThreadPoolExecutor(level.workers_count) as executor:
+            encoded_visuals = encode_visuals(visuals, level, executor)
+    else:
+        encoded_visuals = encode_visuals(visuals, level)
+    with level.profiler.stage('pack_visuals'):
+        vertex_buffers, indices_buffers = pack_visuals(level, encoded_visuals)
+    del encoded_visuals
+
     visual_index = write_visual_children(
-        chunked_writer, vertex_buffers, indices_buffers,
+        chunked_writer,
         visual_index, visuals_hierrarhy, visuals_ids, visuals, level,
         fastpath_vertex_buffers, fastpath_indices_buffers
     )
@@ -1288,9 +1523,26 @@ def write_header():
     return packed_writer
 
 
-def write_level(chunked_writer, level_object, file_path):
+def write_level(
+        chunked_writer,
+        level_object,
+        file_path,
+        level_profiler,
+        context
+    ):
     level = Level()
     level.source_level_path = level_object.xray.level.source_path
+    level.profiler = level_profiler
+    level.workers_count = get_workers_count(context)
+    level.optimize_vertex_cache = context.optimize_vertex_cache
+    level.progressive_meshes = context.progressive_meshes
+    level_profiler.info['threads'] = level.workers_count
+    stage = level_profiler.stage
+
+    if context.use_export_cache:
+        level.export_cache = export_cache.ExportCache()
+        with stage('load_export_cache'):
+            level.export_cache.load(export_cache.get_cache_path(file_path))
 
     # header
     header_writer = write_header()
@@ -1300,34 +1552,40 @@ def write_level(chunked_writer, level_object, file_path):
     sectors_map = get_sectors_map(level, level_object)
 
     # visuals
-    (visuals_writer, vbs, ibs,
-    sectors_chunked_writer, fp_vbs, fp_ibs) = write_visuals(
-        level_object, sectors_map, level
-    )
+    with stage('write_visuals'):
+        (visuals_writer, vbs, ibs,
+        sectors_chunked_writer, fp_vbs, fp_ibs) = write_visuals(
+            level_object, sectors_map, level
+        )
+        report_buffers(context, level, vbs, ibs)
 
     # portals
-    portals_writer = write_portals(level, level_object)
-    chunked_writer.put(fmt.Chunks13.PORTALS, portals_writer)
-    del portals_writer
+    with stage('write_portals'):
+        portals_writer = write_portals(level, level_object)
+        chunked_writer.put(fmt.Chunks13.PORTALS, portals_writer)
+        del portals_writer
 
     # light dynamic
-    light_writer = write_light(level, level_object)
-    chunked_writer.put(fmt.Chunks13.LIGHT_DYNAMIC, light_writer)
-    del light_writer
+    with stage('write_light'):
+        light_writer = write_light(level, level_object)
+        chunked_writer.put(fmt.Chunks13.LIGHT_DYNAMIC, light_writer)
+        del light_writer
 
     # glow
-    glows_writer = write_glows(level_object, level)
-    chunked_writer.put(fmt.Chunks13.GLOWS, glows_writer)
-    del glows_writer
+    with stage('write_glows'):
+        glows_writer = write_glows(level_object, level)
+        chunked_writer.put(fmt.Chunks13.GLOWS, glows_writer)
+        del glows_writer
 
     # write visuals chunk
     chunked_writer.put(fmt.Chunks13.VISUALS, visuals_writer)
     del visuals_writer
 
     # shaders
-    shaders_writer = write_shaders(level)
-    chunked_writer.put(fmt.Chunks13.SHADERS, shaders_writer)
-    del shaders_writer
+    with stage('write_shaders'):
+        shaders_writer = write_shaders(level)
+        chunked_writer.put(fmt.Chunks13.SHADERS, shaders_writer)
+        del shaders_writer
 
     # sectors
     chunked_writer.put(fmt.Chunks13.SECTORS, sectors_chunked_writer)
@@ -1343,15 +1601,208 @@ def get_bbox(bbox_1, bbox_2, function):
     return (bbox_x, bbox_y, bbox_z)
 
 
-def write_level_cform(packed_writer, level):
+def get_mesh_triangles(mesh):
+    # triangles vertices and material indices of the mesh polygons
+    if version_utils.IS_28:
+        mesh.calc_loop_triangles()
+        triangles_count = len(mesh.loop_triangles)
+        triangles = numpy.empty(triangles_count * 3, dtype=numpy.int32)
+        mesh.loop_triangles.foreach_get('vertices', triangles)
+        material_indices = numpy.empty(triangles_count, dtype=numpy.int32)
+        mesh.loop_triangles.foreach_get('material_index', material_indices)
+        return triangles.reshape(-1, 3), material_indices
+    # tessellated faces are triangles and quads,
+    # quad is split into (0, 1, 2) and (0, 2, 3) triangles
+    mesh.calc_tessface()
+    faces_count = len(mesh.tessfaces)
+    faces = numpy.empty(faces_count * 4, dtype=numpy.int32)
+    mesh.tessfaces.foreach_get('vertices_raw', faces)
+    faces = faces.reshape(-1, 4)
+    faces_material_indices = numpy.empty(faces_count, dtype=numpy.int32)
+    mesh.tessfaces.foreach_get('material_index', faces_material_indices)
+    is_quad = faces[:, 3] != 0
+    triangles = numpy.concatenate((
+        faces[:, (0, 1, 2)],
+        faces[is_quad][:, (0, 2, 3)]
+    ))
+    material_indices = numpy.concatenate((
+        faces_material_indices,
+        faces_material_indices[is_quad]
+    ))
+    # quad triangles follow the first triangle of the quad
+    order = numpy.argsort(
+        numpy.concatenate((
+            numpy.arange(faces_count),
+            numpy.flatnonzero(is_quad)
+        )),
+        kind='mergesort'
+    )
+    return triangles[order], material_indices[order]
+
+
+def get_cform_materials(mesh, game_materials):
+    # cform material word of the every material slot:
+    # game material id, suppress shadows and suppress wallmarks bits
+    materials = []
+    for material in mesh.materials:
+        if not material:
+            materials.append(0)
+            continue
+        material_id = game_materials[material.name]
+        suppress_shadows = (int(material.xray.suppress_shadows) << 14) & 0x4000
+        suppress_wm = (int(material.xray.suppress_wm) << 15) & 0x8000
+        materials.append(material_id | suppress_shadows | suppress_wm)
+    return numpy.array(materials, dtype=numpy.uint32)
+
+
+def remove_unused_vertices(vertices, tris):
+    used = numpy.zeros(len(vertices), dtype=bool)
+    used[tris['verts'].ravel()] = True
+    remap = numpy.cumsum(used) - 1
+    tris['verts'] = remap[tris['verts']]
+    return vertices[used], tris
+
+
+# maximum number of the weld grid cells along one axis, the cells
+# are enlarged for the huge meshes, so that the cell keys fit in int64
+WELD_GRID_SIZE = 2 ** 20
+
+
+def get_weld_pairs(coords, weld_distance):
+    # pairs (vertex, other vertex with the smaller index) that are not
+    # farther than the weld distance, the pairs are searched in the
+    # 27 neighbouring cells of the grid with cells not smaller than it
+    extent = (coords.max(axis=0) - coords.min(axis=0)).max()
+    cell_size = max(weld_distance, extent / WELD_GRID_SIZE)
+    cells = numpy.floor((coords - coords.min(axis=0)) / cell_size)
+    cells = cells.astype(numpy.int64) + 1
+    grid_size = int(cells.max()) + 2
+    keys = (cells[:, 0] * grid_size + cells[:, 1]) * grid_size + cells[:, 2]
+    order = numpy.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+    # the neighbours are searched for the sorted unique cells
+    cells_starts = numpy.flatnonzero(numpy.concatenate((
+        (True, ), sorted_keys[1 : ] != sorted_keys[ : -1]
+    )))
+    cells_keys = sorted_keys[cells_starts]
+    cells_ends = numpy.append(cells_starts[1 : ], len(sorted_keys))
+    vertices_cells = numpy.empty(len(coords), dtype=numpy.int64)
+    vertices_cells[order] = numpy.repeat(
+        numpy.arange(len(cells_keys)),
+        cells_ends - cells_starts
+    )
+    squared_distance = weld_distance * weld_distance
+    pairs = []
+    for offset_x in (-1, 0, 1):
+        for offset_y in (-1, 0, 1):
+            for offset_z in (-1, 0, 1):
+                offset = (offset_x * grid_size + offset_y) * grid_size + offset_z
+                neighbours = numpy.searchsorted(cells_keys, cells_keys + offset)
+                neighbours = numpy.minimum(neighbours, len(cells_keys) - 1)
+                found = cells_keys[neighbours] == cells_keys + offset
+                neighbours_counts = numpy.where(
+                    found,
+                    cells_ends[neighbours] - cells_starts[neighbours],
+                    0
+                )
+                starts = cells_starts[neighbours][vertices_cells]
+                counts = neighbours_counts[vertices_cells]
+                vertices = numpy.repeat(numpy.arange(len(coords)), counts)
+                positions = numpy.arange(counts.sum()) + numpy.repeat(
+                    starts - (numpy.cumsum(counts) - counts),
+                    counts
+                )
+                others = order[positions]
+                smaller = others < vertices
+                vertices = vertices[smaller]
+                others = others[smaller]
+                offsets = coords[vertices] - coords[others]
+                near = (offsets * offsets).sum(axis=1) <= squared_distance
+                pairs.append((vertices[near], others[near]))
+    vertices = numpy.concatenate([pair[0] for pair in pairs])
+    others = numpy.concatenate([pair[1] for pair in pairs])
+    pairs_order = numpy.lexsort((others, vertices))
+    return vertices[pairs_order], others[pairs_order]
+
+
+def get_weld_indices(vertices, weld_distance):
+    # index of the vertex that replaces every vertex: vertices are
+    # visited in the index order, a vertex is welded to the first kept
+    # vertex not farther than the weld distance or it is kept itself,
+    # so the welded vertices never move farther than the weld distance
+    coords = vertices.astype(numpy.float64)
+    # exact duplicates are welded without the grid
+    unique_ids = ogf.imp.get_group_ids(coords + 0.0)
+    first_indices = numpy.zeros(int(unique_ids.max()) + 1, dtype=numpy.int64)
+    first_indices[unique_ids[::-1]] = numpy.arange(len(unique_ids))[::-1]
+    weld_ids = numpy.arange(len(first_indices))
+    if weld_distance > 0.0 and len(first_indices) > 1:
+        pairs_vertices, pairs_others = get_weld_pairs(
+            coords[first_indices],
+            weld_distance
+        )
+        # only the vertices close to others are visited here
+        weld_list = weld_ids.tolist()
+        for vertex, other in zip(pairs_vertices.tolist(), pairs_others.tolist()):
+            if weld_list[vertex] == vertex and weld_list[other] == other:
+                weld_list[vertex] = other
+        weld_ids = numpy.array(weld_list, dtype=numpy.int64)
+    return first_indices[weld_ids[unique_ids]]
+
+
+def cleanup_cform(vertices, tris, weld_distance):
+    # vertices not farther than the weld distance are welded (see
+    # get_weld_indices), then degenerate triangles and repeated
+    # triangles (the same vertices with the same winding, material
+    # and sector) are removed, the order of the rest is kept
+    tris = tris.copy()
+    if len(vertices):
+        weld_indices = get_weld_indices(vertices, weld_distance)
+        tris['verts'] = weld_indices[tris['verts']]
+
+    # degenerate triangles: repeated vertices or zero area
+    verts = tris['verts']
+    coords = vertices.astype(numpy.float64)
+    cross = numpy.cross(
+        coords[verts[:, 1]] - coords[verts[:, 0]],
+        coords[verts[:, 2]] - coords[verts[:, 0]]
+    )
+    degenerate = (
+        (verts[:, 0] == verts[:, 1]) |
+        (verts[:, 1] == verts[:, 2]) |
+        (verts[:, 2] == verts[:, 0]) |
+        ~(cross * cross).sum(axis=1).astype(bool)
+    )
+    tris = tris[~degenerate]
+
+    # repeated triangles, the rotation with the smallest vertex first,
+    # triangles with other material or sector are not repeated
+    verts = tris['verts'].astype(numpy.int64)
+    shift = numpy.argmin(verts, axis=1)
+    rows = numpy.arange(len(verts))[:, None]
+    columns = (shift[:, None] + numpy.arange(3)) % 3
+    tris_keys = numpy.column_stack((
+        verts[rows, columns],
+        tris['material'],
+        tris['sector']
+    ))
+    tris_ids = ogf.imp.get_group_ids(tris_keys)
+    first_tris = numpy.zeros(len(tris_ids), dtype=bool)
+    first_tris[numpy.unique(tris_ids, return_index=True)[1]] = True
+    tris = tris[first_tris]
+
+    return remove_unused_vertices(vertices, tris)
+
+
+def get_cform_size(vertices, tris):
+    header_size = 4 * 3 + 4 * 6
+    return header_size + vertices.nbytes + tris.nbytes
+
+
+def write_level_cform(writer, level, context):
     sectors_count = len(level.cform_objects)
     cform_header_packed_writer = xray_io.PackedWriter()
     cform_header_packed_writer.putf('<I', 4)    # version
-    vertices_packed_writer = xray_io.PackedWriter()
-    tris_packed_writer = xray_io.PackedWriter()
-    vertex_index_offset = 0
-    faces_count = 0
-    face_vert_indices = (0, 2, 1)
 
     materials = set()
     bbox_min = None
@@ -1381,9 +1832,13 @@ def write_level_cform(packed_writer, level):
 
     game_materials = {}
     for material in materials:
-        gamemtl_id = game_mtls.get(material.xray.gamemtl, 0)
-        game_materials[material.name] = gamemtl_id
+        if material:
+            gamemtl_id = game_mtls.get(material.xray.gamemtl, 0)
+            game_materials[material.name] = gamemtl_id
 
+    sectors_vertices = []
+    sectors_tris = []
+    vertex_index_offset = 0
     for sector_index in range(sectors_count):
         cform_object = level.cform_objects[sector_index]
         if cform_object.type != 'MESH':
@@ -1394,90 +1849,192 @@ def write_level_cform(packed_writer, level):
                     type=cform_object.type
                 )
             )
-        if not len(cform_object.data.polygons):
+        mesh = cform_object.data
+        if not len(mesh.polygons):
             raise utils.AppError(
                 text.error.level_cform_no_geom,
                 log.props(object=cform_object.name)
             )
-        bm = bmesh.new()
-        bm.from_mesh(cform_object.data)
-        bmesh.ops.triangulate(bm, faces=bm.faces)
-        vertices_count = 0
-        for vert in bm.verts:
-            vertices_packed_writer.putf(
-                '<3f', vert.co.x, vert.co.z, vert.co.y
-            )
-            vertices_count += 1
-        for face in bm.faces:
-            for vert_index in face_vert_indices:
-                vert = face.verts[vert_index]
-                tris_packed_writer.putf('<I', vert.index + vertex_index_offset)
-            material = cform_object.data.materials[face.material_index]
-            material_id = game_materials[material.name]
-            suppress_shadows = (int(material.xray.suppress_shadows) << 14) & 0x4000
-            suppress_wm = (int(material.xray.suppress_wm << 15)) & 0x8000
-            cform_material = material_id | suppress_shadows | suppress_wm
-            tris_packed_writer.putf('<2H', cform_material, sector_index)
-            faces_count += 1
+
+        # vertices in x, z, y order
+        vertices_count = len(mesh.vertices)
+        vertices = numpy.empty(vertices_count * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get('co', vertices)
+        sectors_vertices.append(vertices.reshape(-1, 3)[:, (0, 2, 1)])
+
+        # triangles with the reversed winding order
+        triangles, material_indices = get_mesh_triangles(mesh)
+        cform_materials = get_cform_materials(mesh, game_materials)
+        tris = numpy.empty(len(triangles), dtype=xray_io.RECORD_CFORM_FACE_V4)
+        tris['verts'] = triangles[:, (0, 2, 1)] + vertex_index_offset
+        tris['material'] = cform_materials[material_indices]
+        tris['sector'] = sector_index
+        sectors_tris.append(tris)
         vertex_index_offset += vertices_count
 
-    cform_header_packed_writer.putf('<I', vertex_index_offset)    # vertices count
-    cform_header_packed_writer.putf('<I', faces_count)
+    vertices = numpy.concatenate(sectors_vertices)
+    tris = numpy.concatenate(sectors_tris)
+
+    if context.cform_cleanup:
+        size = get_cform_size(vertices, tris)
+        vertices_count = len(vertices)
+        tris_count = len(tris)
+        vertices, tris = cleanup_cform(
+            vertices,
+            tris,
+            context.cform_weld_distance
+        )
+        context.operator.report(
+            {'INFO'},
+            'CForm cleanup: vertices {0} -> {1}, triangles {2} -> {3}, ' \
+            'size {4} -> {5} bytes'.format(
+                vertices_count,
+                len(vertices),
+                tris_count,
+                len(tris),
+                size,
+                get_cform_size(vertices, tris)
+            )
+        )
+
+    cform_header_packed_writer.putf('<I', len(vertices))    # vertices count
+    cform_header_packed_writer.putf('<I', len(tris))
     cform_header_packed_writer.putf('<3f', bbox_min[0], bbox_min[2], bbox_min[1])    # bbox min
     cform_header_packed_writer.putf('<3f', bbox_max[0], bbox_max[2], bbox_max[1])    # bbox max
 
-    packed_writer.putp(cform_header_packed_writer)
+    writer.putp(cform_header_packed_writer)
     del cform_header_packed_writer
 
-    packed_writer.putp(vertices_packed_writer)
+    vertices_packed_writer = xray_io.PackedWriter()
+    vertices_packed_writer.put_array(numpy.ascontiguousarray(vertices))
+    writer.putp(vertices_packed_writer)
     del vertices_packed_writer
 
-    packed_writer.putp(tris_packed_writer)
+    tris_packed_writer = xray_io.PackedWriter()
+    tris_packed_writer.put_records(tris)
+    writer.putp(tris_packed_writer)
     del tris_packed_writer
 
 
-def get_writer():
-    chunked_writer = xray_io.ChunkedWriter()
-    return chunked_writer
+def save_export_cache(context, level, file_path):
+    cache = level.export_cache
+    level.profiler.info['cached_visuals'] = cache.hits
+    context.operator.report(
+        {'INFO'},
+        'Level export cache: {0} of {1} visuals reused'.format(
+            cache.hits,
+            cache.hits + cache.misses
+        )
+    )
+    cache_path = export_cache.get_cache_path(file_path)
+    try:
+        cache.save(cache_path)
+    except PermissionError:
+        raise utils.AppError(
+            text.error.file_another_prog,
+            log.props(file=os.path.basename(cache_path), path=cache_path)
+        )
 
 
-@log.with_context(name='export-game-level')
-def export_file(level_object, dir_path):
-    log.update(object=level_object.name)
-    file_path = dir_path + os.sep + 'level'
-    level_chunked_writer = get_writer()
-    vbs, ibs, fp_vbs, fp_ibs, level = write_level(level_chunked_writer, level_object, file_path)
+def get_workers_count(context):
+    if context.workers_count:
+        return context.workers_count
+    return os.cpu_count() or 1
 
-    utils.save_file(file_path, level_chunked_writer)
-    del level_chunked_writer
+
+def export_main(level_object, file_path, context, level_profiler):
+    # the files are written to the temporary files, the existing
+    # level files are replaced only after the successful export
+    level_geom_file_path = file_path + os.extsep + 'geom'
+    level_geomx_file_path = file_path + os.extsep + 'geomx'
+    level_cform_file_path = file_path + os.extsep + 'cform'
+    file_paths = (
+        file_path,
+        level_geom_file_path,
+        level_geomx_file_path,
+        level_cform_file_path
+    )
+    try:
+        level = write_level_files(
+            level_object,
+            file_path,
+            level_geom_file_path,
+            level_geomx_file_path,
+            level_cform_file_path,
+            context,
+            level_profiler
+        )
+    except Exception:
+        utils.remove_temp_files(file_paths)
+        raise
+    utils.replace_temp_files(file_paths)
+
+    # the cache is saved after the successful export only
+    if level.export_cache:
+        with level_profiler.stage('save_export_cache'):
+            save_export_cache(context, level, file_path)
+    del level
+
+
+def write_level_files(
+        level_object,
+        file_path,
+        level_geom_file_path,
+        level_geomx_file_path,
+        level_cform_file_path,
+        context,
+        level_profiler
+    ):
+    stage = level_profiler.stage
+
+    with stage('write_level'):
+        with utils.open_file_writer(file_path) as level_chunked_writer:
+            vbs, ibs, fp_vbs, fp_ibs, level = write_level(
+                level_chunked_writer,
+                level_object,
+                file_path,
+                level_profiler,
+                context
+            )
+    vertex_cache.report(context, level.vertex_cache_stats)
 
     # geometry
-    level_geom_chunked_writer = get_writer()
-    write_level_geom(level_geom_chunked_writer, vbs, ibs)
+    with stage('write_level_geom'):
+        with utils.open_file_writer(level_geom_file_path) as geom_chunked_writer:
+            write_level_geom(geom_chunked_writer, vbs, ibs, level.swis)
 
     del (
-        vbs, ibs, level.materials, level.visuals, level.vbs_offsets,
-        level.ibs_offsets, level.saved_visuals, level.sectors_indices,
+        vbs, ibs, level.materials, level.visuals,
+        level.saved_visuals, level.sectors_indices, level.slide_windows,
         level.visuals_bbox, level.visuals_center, level.visuals_radius,
         level.visuals_cache
     )
 
-    level_geom_file_path = file_path + os.extsep + 'geom'
-    utils.save_file(level_geom_file_path, level_geom_chunked_writer)
-    del level_geom_chunked_writer
-
     # fast path geometry
-    level_geomx_chunked_writer = get_writer()
-    write_level_geom(level_geomx_chunked_writer, fp_vbs, fp_ibs)
+    with stage('write_level_geomx'):
+        with utils.open_file_writer(level_geomx_file_path) as geomx_chunked_writer:
+            write_level_geom(geomx_chunked_writer, fp_vbs, fp_ibs)
     del fp_vbs, fp_ibs, level.fp_vbs_offsets, level.fp_ibs_offsets
 
-    level_geomx_file_path = file_path + os.extsep + 'geomx'
-    utils.save_file(level_geomx_file_path, level_geomx_chunked_writer)
-    del level_geomx_chunked_writer
-
     # cform
-    level_cform_packed_writer = xray_io.PackedWriter()
-    write_level_cform(level_cform_packed_writer, level)
-    level_cform_file_path = file_path + os.extsep + 'cform'
-    utils.save_file(level_cform_file_path, level_cform_packed_writer)
-    del level_cform_packed_writer, level
+    with stage('write_level_cform'):
+        with utils.open_file_writer(level_cform_file_path) as cform_writer:
+            write_level_cform(cform_writer, level, context)
+
+    return level
+
+
+@log.with_context(name='export-game-level')
+def export_file(level_object, dir_path, context):
+    log.update(object=level_object.name)
+    file_path = dir_path + os.sep + 'level'
+    level_profiler = profiler.Profiler(
+        'export',
+        trace_memory=context.trace_memory
+    )
+    level_profiler.start()
+    try:
+        export_main(level_object, file_path, context, level_profiler)
+    finally:
+        level_profiler.stop()
+    profiler.write_profile(context, level_profiler, file_path)
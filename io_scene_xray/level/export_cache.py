@@ -0,0 +1,136 @@
+# standart modules
+import zipfile
+import hashlib
+import threading
+
+# blender modules
+import numpy
+
+# addon modules
+from .. import utils
+from .. import vertex_cache
+
+
+# version of the cache file, the old caches are ignored
+CACHE_VERSION = 1
+# version of the encoded visuals, it is hashed into the keys together
+# with the addon version. It must be bumped whenever the encoding is
+# changed (exp.encode_visual, vertex_cache, progressive), otherwise the
+# visuals encoded by the old code are reused
+ENCODER_VERSION = 2
+
+GEOMETRY_ARRAYS = (
+    'coords', 'normals', 'tangents', 'uvs', 'uvs_lmap', 'hemi', 'sun', 'light'
+)
+GEOMETRY_VALUES = (
+    'vertex_format', 'has_lmap', 'has_sun', 'has_light',
+    'frac_low', 'frac_y_size'
+)
+
+
+def get_cache_path(file_path):
+    # cache is saved next to the level file
+    return '{0}.export_cache.npz'.format(file_path)
+
+
+def get_visual_key(geometry, optimize_vertex_cache, use_progressive):
+    # content hash of the all encode_visual arguments
+    hasher = hashlib.sha1()
+    for name in GEOMETRY_ARRAYS:
+        array = numpy.ascontiguousarray(getattr(geometry, name))
+        hasher.update('{0} {1} {2}'.format(name, array.dtype.str, array.shape).encode())
+        hasher.update(memoryview(array).cast('B'))
+    values = [getattr(geometry, name) for name in GEOMETRY_VALUES]
+    values.extend((optimize_vertex_cache, use_progressive))
+    values.extend((ENCODER_VERSION, utils.plugin_version_number()))
+    hasher.update(repr(values).encode())
+    return hasher.hexdigest()
+
+
+class ExportCache(object):
+    # encoded visuals of the previous export, only the
+    # visuals used by the current export are saved
+    def __init__(self):
+        self.entries = {}
+        self.used_entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()    # visuals are encoded in threads
+
+    def load(self, file_path):
+        try:
+            with numpy.load(file_path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return
+        version = arrays.pop('version', None)
+        if version is None or int(version) != CACHE_VERSION:
+            return
+        for name, array in arrays.items():
+            key, field = name.split('/', 1)
+            self.entries.setdefault(key, {})[field] = array
+
+    def save(self, file_path):
+        arrays = {'version': numpy.array(CACHE_VERSION)}
+        for key, entry in self.used_entries.items():
+            for field, array in entry.items():
+                arrays['{0}/{1}'.format(key, field)] = array
+        with open(file_path, 'wb') as file:
+            numpy.savez(file, **arrays)
+
+    def get(self, key, encoded):
+        # fills the encoded visual from the cache,
+        # returns False if there is no cache entry
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False
+            self.hits += 1
+            self.used_entries[key] = entry
+        vertices_count, triangles, misses_before, misses_after = \
+            entry['header'].tolist()
+        encoded.vertices_count = vertices_count
+        encoded.indices = entry['indices']
+        for field, array in entry.items():
+            if field.startswith('column.'):
+                encoded.columns[field[len('column.') : ]] = array
+        if 'slide_windows' in entry:
+            encoded.slide_windows = [
+                tuple(window)
+                for window in entry['slide_windows'].tolist()
+            ]
+        if 'cache_stats' in entry:
+            encoded.cache_stats = vertex_cache.CacheStats()
+            encoded.cache_stats.add(triangles, misses_before, misses_after)
+        return True
+
+    def put(self, key, encoded):
+        stats = encoded.cache_stats
+        if stats:
+            stats_values = (
+                stats.triangles_count,
+                stats.misses_before,
+                stats.misses_after
+            )
+        else:
+            stats_values = (0, 0, 0)
+        entry = {
+            'header': numpy.array(
+                (encoded.vertices_count, ) + stats_values,
+                dtype=numpy.int64
+            ),
+            'indices': encoded.indices
+        }
+        for name, array in encoded.columns.items():
+            entry['column.' + name] = array
+        if encoded.slide_windows:
+            entry['slide_windows'] = numpy.array(
+                encoded.slide_windows,
+                dtype=numpy.int64
+            )
+        if stats:
+            entry['cache_stats'] = numpy.ones(1, dtype=bool)
+        with self._lock:
+            self.entries[key] = entry
+            self.used_entries[key] = entry
@@ -232,6 +232,8 @@ usage_values = {
 UV_COEFFICIENT = 1024
 UV_COEFFICIENT_2 = 2048
 LIGHT_MAP_UV_COEFFICIENT = 2 ** 15 - 1
+# visual indices are 16 bit
+VERTICES_COUNT_LIMIT = 0xffff
 
 # cform
 CFORM_VERSION_4 = 4
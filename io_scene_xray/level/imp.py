@@ -1,5 +1,6 @@
 # standart modules
 import os
+import concurrent.futures
 
 # blender modules
 import bpy
@@ -15,6 +16,7 @@ from . import ib
 from . import swi
 from . import cform
 from . import utility
+from . import profiler
 from .. import text
 from .. import log
 from .. import utils
@@ -49,6 +51,8 @@ class Level(object):
         self.sectors_objects = {}
         self.visual_keys = set()
         self.stats = ''
+        self.profiler = None
+        self.mapped_files = []
 
 
 def create_sector_object(sector_id, collection, sectors_object):
@@ -515,7 +519,7 @@ def import_geomx(level, context):
     if not os.path.exists(geomx_path):
         return
     geomx_chunks = {}
-    geomx_chunked_reader = utility.get_level_reader(geomx_path)
+    geomx_chunked_reader = utility.get_level_reader(geomx_path, level)
     chunks = get_chunks(geomx_chunked_reader)
     del geomx_chunked_reader
     level.xrlc_version_geom = get_version(chunks.pop(fmt.HEADER), geomx_path)
@@ -529,7 +533,7 @@ def import_geom(level, chunks, context):
         return
     if level.xrlc_version in fmt.SUPPORTED_VERSIONS:
         geom_path = context.filepath + os.extsep + 'geom'
-        geom_chunked_reader = utility.get_level_reader(geom_path)
+        geom_chunked_reader = utility.get_level_reader(geom_path, level)
         geom_chunks = get_chunks(geom_chunked_reader)
         del geom_chunked_reader
         level.xrlc_version_geom = get_version(
@@ -540,7 +544,7 @@ def import_geom(level, chunks, context):
         del geom_chunks
 
 
-def import_level(level, context, chunks, geomx_chunks):
+def get_chunks_ids(level):
     if level.xrlc_version >= fmt.VERSION_13:
         chunks_ids = fmt.Chunks13
     elif level.xrlc_version == fmt.VERSION_12:
@@ -555,27 +559,17 @@ def import_level(level, context, chunks, geomx_chunks):
         chunks_ids = fmt.Chunks5
     elif level.xrlc_version == fmt.VERSION_4:
         chunks_ids = fmt.Chunks4
-    shaders_chunk_data = chunks.pop(chunks_ids.SHADERS)
-    level.materials, level.images = shaders.import_shaders(
-        level,
-        context,
-        shaders_chunk_data
-    )
-    del shaders_chunk_data
+    return chunks_ids
 
-    if level.xrlc_version <= fmt.VERSION_5:
-        textures_chunk_data = chunks.pop(chunks_ids.TEXTURES)
-        shaders.import_textures(level, context, textures_chunk_data)
-        del textures_chunk_data
 
-    # geometry
-    vb_chunk_data = chunks.pop(chunks_ids.VB, None)
-    directx_3d_7_mode = False
-    if level.xrlc_version <= fmt.VERSION_8:
-        directx_3d_7_mode = True
-    if not vb_chunk_data and level.xrlc_version == fmt.VERSION_9:
-        directx_3d_7_mode = True
-        vb_chunk_data = chunks.pop(chunks_ids.VB_OLD)
+def import_vertex_buffers(
+        level,
+        vb_chunk_data,
+        fastpath_vb_chunk_data,
+        directx_3d_7_mode
+    ):
+    # fastpath buffers are read after the visuals buffers,
+    # because the stats use the usages of both
     level.vertex_buffers, stats = vb.import_vertex_buffers(
         vb_chunk_data,
         level,
@@ -583,96 +577,199 @@ def import_level(level, context, chunks, geomx_chunks):
         d3d7=directx_3d_7_mode
     )
     level.stats += stats
-    del vb_chunk_data
+    if fastpath_vb_chunk_data:
+        level.fastpath_vertex_buffers, stats = vb.import_vertex_buffers(
+            fastpath_vb_chunk_data, level, fast=True
+        )
+        level.stats += stats
 
-    if level.xrlc_version >= fmt.VERSION_9:
-        ib_chunk_data = chunks.pop(chunks_ids.IB)
-        level.indices_buffers = ib.import_indices_buffers(ib_chunk_data)
-        del ib_chunk_data
 
-    if level.xrlc_version >= fmt.VERSION_12:
-        swis_chunk_data = chunks.pop(chunks_ids.SWIS, None)
-        if swis_chunk_data:
-            level.swis = swi.import_slide_window_items(swis_chunk_data)
-            del swis_chunk_data
+def decode_level(level, chunks, geomx_chunks, workers_count):
+    # binary data is decoded in the threads, bpy is not used here
+    chunks_ids = get_chunks_ids(level)
 
-    # fastpath geometry
+    vb_chunk_data = chunks.pop(chunks_ids.VB, None)
+    directx_3d_7_mode = False
+    if level.xrlc_version <= fmt.VERSION_8:
+        directx_3d_7_mode = True
+    if not vb_chunk_data and level.xrlc_version == fmt.VERSION_9:
+        directx_3d_7_mode = True
+        vb_chunk_data = chunks.pop(chunks_ids.VB_OLD)
+
+    fastpath_vb_chunk_data = None
     if level.xrlc_version == fmt.VERSION_14 and geomx_chunks:
         fastpath_vb_chunk_data = geomx_chunks.pop(chunks_ids.VB)
-        level.fastpath_vertex_buffers, stats = vb.import_vertex_buffers(
-            fastpath_vb_chunk_data, level, fast=True
+
+    cform_data = None
+    if level.xrlc_version <= fmt.VERSION_9:
+        cform_data = chunks.pop(chunks_ids.CFORM)
+    cform_data, cform_path = cform.read_file(level, cform_data)
+
+    wrap = level.profiler.wrap
+    with concurrent.futures.ThreadPoolExecutor(workers_count) as executor:
+        vb_future = executor.submit(
+            wrap('import_vertex_buffers')(import_vertex_buffers),
+            level,
+            vb_chunk_data,
+            fastpath_vb_chunk_data,
+            directx_3d_7_mode
+        )
+        cform_future = executor.submit(
+            wrap('read_cform')(cform.read_main),
+            cform_data,
+            cform_path
         )
-        level.stats += stats
-        del fastpath_vb_chunk_data
 
-        fastpath_ib_chunk_data = geomx_chunks.pop(chunks_ids.IB)
-        level.fastpath_indices_buffers = ib.import_indices_buffers(fastpath_ib_chunk_data)
-        del fastpath_ib_chunk_data
+        ib_future = None
+        if level.xrlc_version >= fmt.VERSION_9:
+            ib_chunk_data = chunks.pop(chunks_ids.IB)
+            ib_future = executor.submit(
+                wrap('import_indices_buffers')(ib.import_indices_buffers),
+                ib_chunk_data
+            )
 
-        fastpath_swis_chunk_data = geomx_chunks.pop(chunks_ids.SWIS)
-        level.fastpath_swis = swi.import_slide_window_items(fastpath_swis_chunk_data)
-        del fastpath_swis_chunk_data
+        swis_future = None
+        if level.xrlc_version >= fmt.VERSION_12:
+            swis_chunk_data = chunks.pop(chunks_ids.SWIS, None)
+            if swis_chunk_data:
+                swis_future = executor.submit(
+                    wrap('import_swis')(swi.import_slide_window_items),
+                    swis_chunk_data
+                )
+
+        fastpath_ib_future = None
+        fastpath_swis_future = None
+        if fastpath_vb_chunk_data:
+            fastpath_ib_future = executor.submit(
+                wrap('import_indices_buffers')(ib.import_indices_buffers),
+                geomx_chunks.pop(chunks_ids.IB)
+            )
+            fastpath_swis_future = executor.submit(
+                wrap('import_swis')(swi.import_slide_window_items),
+                geomx_chunks.pop(chunks_ids.SWIS)
+            )
+
+        # errors of the threads are raised here
+        vb_future.result()
+        if ib_future:
+            level.indices_buffers = ib_future.result()
+        if swis_future:
+            level.swis = swis_future.result()
+        if fastpath_ib_future:
+            level.fastpath_indices_buffers = fastpath_ib_future.result()
+            level.fastpath_swis = fastpath_swis_future.result()
+        level_cform = cform_future.result()
+
+    return level_cform
+
+
+def import_level(level, context, chunks):
+    chunks_ids = get_chunks_ids(level)
+    stage = level.profiler.stage
+
+    with stage('import_shaders'):
+        shaders_chunk_data = chunks.pop(chunks_ids.SHADERS)
+        level.materials, level.images = shaders.import_shaders(
+            level,
+            context,
+            shaders_chunk_data
+        )
+        del shaders_chunk_data
+
+        if level.xrlc_version <= fmt.VERSION_5:
+            textures_chunk_data = chunks.pop(chunks_ids.TEXTURES)
+            shaders.import_textures(level, context, textures_chunk_data)
+            del textures_chunk_data
 
     level_collection = create.create_level_collections(level)
     level_object = create.create_level_object(level, level_collection)
 
-    visuals_chunk_data = chunks.pop(chunks_ids.VISUALS)
-    visuals.import_visuals(visuals_chunk_data, level)
-    visuals.import_hierrarhy_visuals(level)
-    del visuals_chunk_data
+    with stage('import_visuals'):
+        visuals_chunk_data = chunks.pop(chunks_ids.VISUALS)
+        visuals.import_visuals(visuals_chunk_data, level)
+        visuals.import_hierrarhy_visuals(level)
+        del visuals_chunk_data
 
-    sectors_chunk_data = chunks.pop(chunks_ids.SECTORS)
-    import_sectors(sectors_chunk_data, level, level_object)
-    del sectors_chunk_data
+    with stage('import_sectors'):
+        sectors_chunk_data = chunks.pop(chunks_ids.SECTORS)
+        import_sectors(sectors_chunk_data, level, level_object)
+        del sectors_chunk_data
 
-    portals_chunk_data = chunks.pop(chunks_ids.PORTALS)
-    portals_object = import_portals(portals_chunk_data, level)
-    del portals_chunk_data
+    with stage('import_portals'):
+        portals_chunk_data = chunks.pop(chunks_ids.PORTALS)
+        portals_object = import_portals(portals_chunk_data, level)
+        del portals_chunk_data
 
     portals_object.parent = level_object
 
-    glows_chunk_data = chunks.pop(chunks_ids.GLOWS)
-    if level.xrlc_version >= fmt.VERSION_12:
-        glows_object = import_glows(
-            glows_chunk_data,
-            level
-        )
-    else:
-        glows_object = import_glows_v5(
-            glows_chunk_data,
-            level
-        )
-    del glows_chunk_data
+    with stage('import_glows'):
+        glows_chunk_data = chunks.pop(chunks_ids.GLOWS)
+        if level.xrlc_version >= fmt.VERSION_12:
+            glows_object = import_glows(
+                glows_chunk_data,
+                level
+            )
+        else:
+            glows_object = import_glows_v5(
+                glows_chunk_data,
+                level
+            )
+        del glows_chunk_data
     glows_object.parent = level_object
 
-    light_chunk_data = chunks.pop(chunks_ids.LIGHT_DYNAMIC)
-    lights_dynamic_object = import_lights_dynamic(
-        light_chunk_data, level
-    )
+    with stage('import_lights'):
+        light_chunk_data = chunks.pop(chunks_ids.LIGHT_DYNAMIC)
+        lights_dynamic_object = import_lights_dynamic(
+            light_chunk_data, level
+        )
+        del light_chunk_data
     lights_dynamic_object.parent = level_object
-    del light_chunk_data
-
-    cform_data_v2 = None
-    if level.xrlc_version <= fmt.VERSION_9:
-        cform_data_v2 = chunks.pop(chunks_ids.CFORM)
 
     for chunk_id, chunk_data in chunks.items():
         print('UNKNOWN LEVEL CHUNK: {0:#x}, SIZE = {1}'.format(
             chunk_id, len(chunk_data)
         ))
-    return cform_data_v2
+
+
+def get_workers_count(context):
+    if context.workers_count:
+        return context.workers_count
+    return os.cpu_count() or 1
 
 
 def import_main(context, chunked_reader, level):
-    chunks = get_chunks(chunked_reader)
-    del chunked_reader
-    import_geom(level, chunks, context)
-    geomx_chunks = import_geomx(level, context)
-    cform_data_v2 = import_level(level, context, chunks, geomx_chunks)
-    if level.xrlc_version >= fmt.VERSION_10:
-        cform.import_main(context, level)
-    else:
-        cform.import_main(context, level, data=cform_data_v2)
+    workers_count = get_workers_count(context)
+    level.profiler.info['threads'] = workers_count
+    stage = level.profiler.stage
+
+    # decode phase
+    with stage('decode'):
+        with stage('read_files'):
+            chunks = get_chunks(chunked_reader)
+            del chunked_reader
+            import_geom(level, chunks, context)
+            geomx_chunks = import_geomx(level, context)
+        level_cform = decode_level(level, chunks, geomx_chunks, workers_count)
+
+    # create phase
+    with stage('create'):
+        import_level(level, context, chunks)
+        with stage('import_cform'):
+            cform.import_main(context, level, level_cform)
+
+
+def close_files(level):
+    # the decoded buffers are views of the memory-mapped files
+    level.vertex_buffers = None
+    level.indices_buffers = None
+    level.swis = None
+    level.fastpath_vertex_buffers = None
+    level.fastpath_indices_buffers = None
+    level.fastpath_swis = None
+    level.loaded_geometry = {}
+    level.loaded_fastpath_geometry = {}
+    utils.close_files(level.mapped_files)
+    level.mapped_files = []
 
 
 TEST_MODE = False
@@ -687,7 +784,7 @@ def import_file(context, operator):
     level.context = context
     level.usage_list = set()
     level.vertex_format_list = set()
-    chunked_reader = utility.get_level_reader(context.filepath)
+    chunked_reader = utility.get_level_reader(context.filepath, level)
     level.name = utility.get_level_name(context.filepath)
     level.xrlc_version = get_version(
         chunked_reader.next(fmt.HEADER),
@@ -707,16 +804,29 @@ def import_file(context, operator):
         )
         if len(chunked_reader.get_size()) > MAX_LEVEL_SIZE:
             print('skip big level:', stats_name)
+            close_files(level)
             return
         stats_path = os.path.join(temp_folder, stats_name)
         if os.path.exists(stats_path):
             print('skip:', stats_name)
+            close_files(level)
             return
         print(build, index, level.name)
 
     level.file = context.filepath
     level.path = os.path.dirname(context.filepath)
-    import_main(context, chunked_reader, level)
+    level.profiler = profiler.Profiler(
+        'import',
+        trace_memory=context.trace_memory
+    )
+    level.profiler.start()
+    try:
+        import_main(context, chunked_reader, level)
+    finally:
+        level.profiler.stop()
+        del chunked_reader
+        close_files(level)
+    profiler.write_profile(context, level.profiler, context.filepath)
 
     # test code
     if TEST_MODE:
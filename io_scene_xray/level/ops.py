@@ -16,6 +16,21 @@ from .. import ie_props
 class ImportLevelContext(contexts.ImportMeshContext):
     def __init__(self):
         super().__init__()
+        self.workers_count = None
+        self.trace_memory = False
+        self.write_profile_report = False
+
+
+class ExportLevelContext(contexts.ExportContext):
+    def __init__(self):
+        super().__init__()
+        self.workers_count = None
+        self.progressive_meshes = False
+        self.use_export_cache = False
+        self.trace_memory = False
+        self.write_profile_report = False
+        self.cform_cleanup = False
+        self.cform_weld_distance = 0.0
 
 
 op_text = 'Game Level'
@@ -68,6 +83,9 @@ class XRAY_OT_import_level(
         import_context.textures_folder=textures_folder
         import_context.operator=self
         import_context.filepath = self.filepath
+        import_context.workers_count = preferences.level_import_workers
+        import_context.trace_memory = preferences.level_profile_memory
+        import_context.write_profile_report = preferences.level_profile_report
         try:
             imp.import_file(import_context, self)
         except utils.AppError as err:
@@ -87,6 +105,28 @@ export_props = {
     'filter_glob': bpy.props.StringProperty(
         default='level;level.geom;level.geomx;level.cform',
         options={'HIDDEN'}
+    ),
+    'optimize_vertex_cache': ie_props.prop_optimize_vertex_cache(),
+    'progressive_meshes': ie_props.prop_progressive_meshes(),
+    'use_export_cache': bpy.props.BoolProperty(
+        name='Use Export Cache',
+        description='Reuse the encoded visuals of the previous export ' \
+        + 'when their geometry is not changed',
+        default=False
+    ),
+    'cform_cleanup': bpy.props.BoolProperty(
+        name='Clean Up CForm',
+        description='Weld coincident cform vertices of all sectors ' \
+        + 'and remove degenerate and repeated triangles',
+        default=False
+    ),
+    'cform_weld_distance': bpy.props.FloatProperty(
+        name='Weld Distance',
+        description='Cform vertices closer than this distance are welded',
+        default=0.001,
+        min=0.0,
+        precision=4,
+        subtype='DISTANCE'
     )
 }
 
@@ -105,7 +145,18 @@ class XRAY_OT_export_level(ie_props.BaseOperator):
             exec('{0} = props.get("{0}")'.format(prop_name))
 
     def export(self, level_object, context):
-        exp.export_file(level_object, self.directory)
+        preferences = version_utils.get_preferences()
+        export_context = ExportLevelContext()
+        export_context.operator = self
+        export_context.workers_count = preferences.level_export_workers
+        export_context.trace_memory = preferences.level_profile_memory
+        export_context.write_profile_report = preferences.level_profile_report
+        export_context.optimize_vertex_cache = self.optimize_vertex_cache
+        export_context.progressive_meshes = self.progressive_meshes
+        export_context.use_export_cache = self.use_export_cache
+        export_context.cform_cleanup = self.cform_cleanup
+        export_context.cform_weld_distance = self.cform_weld_distance
+        exp.export_file(level_object, self.directory, export_context)
         return {'FINISHED'}
 
     @utils.execute_with_logger
@@ -0,0 +1,177 @@
+# standart modules
+import os
+import json
+import time
+import threading
+import contextlib
+import functools
+import tracemalloc
+
+# addon modules
+from .. import log
+from .. import text
+from .. import utils
+
+
+class Stage(object):
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth    # None for the stages of the worker threads
+        self.calls = 0
+        self.time = 0.0
+        self.memory_peak = None
+
+
+class Profiler(object):
+    def __init__(self, operation, trace_memory=False):
+        self.operation = operation
+        self.trace_memory = trace_memory
+        self.info = {}    # additional report values
+        self.stages = []
+        self._stages = {}
+        self._stack = []    # memory peaks of the running stages
+        self._lock = threading.Lock()
+        self._start_time = None
+        self._started_tracing = False
+        self.total_time = None
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        self.total_time = time.perf_counter() - self._start_time
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _get_stage(self, name, depth):
+        with self._lock:
+            stage = self._stages.get(name)
+            if not stage:
+                stage = Stage(name, depth)
+                self._stages[name] = stage
+                self.stages.append(stage)
+            return stage
+
+    def _reset_peak(self):
+        # tracemalloc.reset_peak is available since python 3.9
+        reset_peak = getattr(tracemalloc, 'reset_peak', None)
+        if reset_peak:
+            reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # the stages of the main thread are nested, the stages of
+        # the worker threads only accumulate the time, because
+        # the memory peak of tracemalloc is common for all threads
+        is_main_thread = threading.current_thread() is threading.main_thread()
+        if is_main_thread:
+            depth = len(self._stack)
+        else:
+            depth = None
+        use_memory = (
+            is_main_thread and
+            self.trace_memory and
+            tracemalloc.is_tracing()
+        )
+        stage = self._get_stage(name, depth)
+        if use_memory:
+            if self._stack:
+                peak = tracemalloc.get_traced_memory()[1]
+                self._stack[-1] = max(self._stack[-1], peak)
+            self._reset_peak()
+        if is_main_thread:
+            self._stack.append(0)
+        start_time = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage_time = time.perf_counter() - start_time
+            if is_main_thread:
+                peak = self._stack.pop()
+            if use_memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                stage.memory_peak = max(stage.memory_peak or 0, peak)
+                if self._stack:
+                    self._stack[-1] = max(self._stack[-1], peak)
+                self._reset_peak()
+            with self._lock:
+                stage.calls += 1
+                stage.time += stage_time
+
+    def wrap(self, name):
+        # decorator version of the stage
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get_report(self):
+        stages = []
+        for stage in self.stages:
+            stages.append({
+                'name': stage.name,
+                'depth': stage.depth,
+                'calls': stage.calls,
+                'time': stage.time,
+                'memory_peak': stage.memory_peak
+            })
+        return {
+            'operation': self.operation,
+            'total_time': self.total_time,
+            'trace_memory': self.trace_memory,
+            'info': self.info,
+            'stages': stages
+        }
+
+    def write_report(self, file_path):
+        with open(file_path, 'w') as file:
+            json.dump(self.get_report(), file, indent=4)
+
+    def get_summary(self, slowest_count=3):
+        # top level stages and the slowest nested stages
+        top_stages = [stage for stage in self.stages if stage.depth == 0]
+        nested_stages = [stage for stage in self.stages if stage.depth != 0]
+        nested_stages.sort(key=lambda stage: stage.time, reverse=True)
+        summary = 'Level {0}: {1:.3f} sec'.format(
+            self.operation,
+            self.total_time
+        )
+        stages_text = ', '.join(
+            '{0} {1:.3f} sec'.format(stage.name, stage.time)
+            for stage in top_stages
+        )
+        if stages_text:
+            summary += ' ({})'.format(stages_text)
+        slowest_text = ', '.join(
+            '{0} {1:.3f} sec'.format(stage.name, stage.time)
+            for stage in nested_stages[ : slowest_count]
+        )
+        if slowest_text:
+            summary += '; slowest: ' + slowest_text
+        return summary
+
+
+def get_report_path(file_path, operation):
+    # report is saved next to the level file
+    return '{0}.{1}_profile.json'.format(file_path, operation)
+
+
+def write_profile(context, level_profiler, file_path):
+    context.operator.report({'INFO'}, level_profiler.get_summary())
+    if not context.write_profile_report:
+        return
+    report_path = get_report_path(file_path, level_profiler.operation)
+    try:
+        level_profiler.write_report(report_path)
+    except PermissionError:
+        raise utils.AppError(
+            text.error.file_another_prog,
+            log.props(file=os.path.basename(report_path), path=report_path)
+        )
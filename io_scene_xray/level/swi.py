@@ -40,3 +40,20 @@ def import_slide_window_items(data):
         swis_buffer.append(swis)
 
     return swis_buffer
+
+
+def write_slide_window_item(packed_writer, windows):
+    # windows are (offset, triangles count, vertices count) tuples
+    for reserved_index in range(4):
+        packed_writer.putf('<I', 0)
+    packed_writer.putf('<I', len(windows))
+    for offset, triangles_count, vertices_count in windows:
+        packed_writer.putf('<I2H', offset, triangles_count, vertices_count)
+
+
+def write_slide_window_items(swis):
+    packed_writer = xray_io.PackedWriter()
+    packed_writer.putf('<I', len(swis))
+    for windows in swis:
+        write_slide_window_item(packed_writer, windows)
+    return packed_writer
@@ -17,7 +17,9 @@ def get_level_name(file_path):
     return level_name
 
 
-def get_level_reader(file_path):
-    data = utils.read_file(file_path)
-    chunked_reader = xray_io.ChunkedReader(data)
+def get_level_reader(file_path, level):
+    # the file is closed by the close_files of the level import
+    file_data = utils.read_file(file_path, use_mmap=True)
+    level.mapped_files.append(file_data)
+    chunked_reader = xray_io.ChunkedReader(file_data.data)
     return chunked_reader
@@ -1,3 +1,6 @@
+# blender modules
+import numpy
+
 # addon modules
 from . import fmt
 from .. import xray_io
@@ -25,6 +28,31 @@ def get_uv_corrector(value):
     return uv_corrector
 
 
+# vertex declaration type -> numpy fields (suffix, type, components)
+declaration_types = {
+    fmt.FLOAT2: (('', '<f4', 2), ),
+    fmt.FLOAT3: (('', '<f4', 3), ),
+    fmt.FLOAT4: (('', '<f4', 4), ),
+    fmt.D3DCOLOR: (('', '<u1', 4), ),
+    fmt.SHORT2: (('', '<i2', 2), ),
+    fmt.SHORT4: (('', '<i2', 2), ('_data', '<u2', 2))
+}
+
+
+def get_field_name(usage, usage_index):
+    return '{0}_{1}'.format(fmt.usage[usage], usage_index)
+
+
+def get_declaration_dtype(usage_list):
+    # vertex elements are read sequentially, the offsets are not used
+    fields = []
+    for _, _, data_type, _, usage, usage_index in usage_list:
+        field_name = get_field_name(usage, usage_index)
+        for suffix, field_type, count in declaration_types[fmt.types[data_type]]:
+            fields.append((field_name + suffix, field_type, (count, )))
+    return numpy.dtype(fields)
+
+
 def import_vertices(
         xrlc_version,
         packed_reader,
@@ -33,99 +61,97 @@ def import_vertices(
         usage_list,
         global_usage_list
     ):
-    code = ''
-    code += 'for vertex_index in range({}):\n'.format(vertices_count)
-    has_uv_corrector = False
-    usages = []
+    # the whole buffer is decoded at once into the columns
+    dtype = get_declaration_dtype(usage_list)
+    vertices = packed_reader.get_records(dtype, vertices_count)
+    correct_u = None
+    correct_v = None
     for usage_info in usage_list:
-        data_type = usage_info[2]
-        usage = usage_info[4]
+        data_type = fmt.types[usage_info[2]]
+        usage = fmt.usage[usage_info[4]]
         usage_index = usage_info[5]
-        usages.append(usage_info)
-        data_format = fmt.types_struct[data_type]
-        data_type = fmt.types[data_type]
-        usage = fmt.usage[usage]
+        field_name = get_field_name(usage_info[4], usage_index)
+        field = vertices[field_name]
         if usage == fmt.POSITION:
-            code += '    coord_x, coord_y, coord_z = packed_reader.getf("<{}")\n'.format(data_format)
-            code += '    vertex_buffer.position.append((coord_x, coord_z, coord_y))\n'
+            vertex_buffer.position = field[:, (0, 2, 1)]
         elif usage == fmt.NORMAL:
-            code += '    norm_x, norm_y, norm_z, hemi = packed_reader.getf("<{}")\n'.format(data_format)
-            code += '    vertex_buffer.normal.append((\n' \
-                    '       norm_x,\n' \
-                    '       norm_y,\n' \
-                    '       norm_z\n' \
-                    '    ))\n'
-            code += '    vertex_buffer.color_hemi.append(hemi / 255)\n'
+            vertex_buffer.normal = field[:, 0 : 3]
+            vertex_buffer.color_hemi = field[:, 3] / 255
         elif usage == fmt.TANGENT:
-            code += '    tangent_x, tangent_y, tangent_z, correct_u = packed_reader.getf("<{}")\n'.format(data_format)
-            has_uv_corrector = True
+            correct_u = get_uv_corrector(field[:, 3])
         elif usage == fmt.BINORMAL:
-            code += '    binorm_x, binorm_y, binorm_z, correct_v = packed_reader.getf("<{}")\n'.format(data_format)
-            has_uv_corrector = True
+            correct_v = get_uv_corrector(field[:, 3])
         elif usage == fmt.TEXCOORD:
+            coord_u = field[:, 0].astype(numpy.float64)
+            coord_v = field[:, 1].astype(numpy.float64)
+            has_uv_corrector = not (correct_u is None or correct_v is None)
             if usage_index == 0:    # texture uv
-                if data_type in (fmt.FLOAT2, fmt.SHORT2):
-                    code += '    coord_u, coord_v = packed_reader.getf("<{}")\n'.format(data_format)
-                elif data_type == fmt.SHORT4:
-                    if xrlc_version >= fmt.VERSION_12:
-                        code += '    coord_u, coord_v, shader_data, unused = packed_reader.getf("<{}")\n'.format(data_format)
-                    else:
-                        code += '    coord_u, coord_v, lmap_u, lmap_v = packed_reader.getf("<{}")\n'.format(data_format)
                 if data_type == fmt.FLOAT2:
-                    code += '    vertex_buffer.uv.append((coord_u, 1 - coord_v))\n'
-                elif data_type == fmt.SHORT2:
+                    coord_v = 1 - coord_v
+                elif data_type == fmt.SHORT4 and xrlc_version >= fmt.VERSION_12:
+                    coord_u = coord_u / fmt.UV_COEFFICIENT_2
+                    coord_v = 1 - coord_v / fmt.UV_COEFFICIENT_2
                     if has_uv_corrector:
-                        code += '    vertex_buffer.uv.append((\n' \
-                                '        coord_u / fmt.UV_COEFFICIENT + get_uv_corrector(correct_u),\n' \
-                                '        1 - coord_v / fmt.UV_COEFFICIENT - get_uv_corrector(correct_v)\n' \
-                                '    ))\n'
-                    else:
-                        code += '    vertex_buffer.uv.append((\n' \
-                                '        coord_u / fmt.UV_COEFFICIENT,\n' \
-                                '        1 - coord_v / fmt.UV_COEFFICIENT\n' \
-                                '    ))\n'
-                elif data_type == fmt.SHORT4:
-                    if xrlc_version >= fmt.VERSION_12:
-                        if has_uv_corrector:
-                            code += '    vertex_buffer.uv.append((\n' \
-                                    '        coord_u / fmt.UV_COEFFICIENT_2 + get_uv_corrector(correct_u),\n' \
-                                    '        1 - coord_v / fmt.UV_COEFFICIENT_2 - get_uv_corrector(correct_v)\n' \
-                                    '    ))\n'
-                        else:
-                            code += '    vertex_buffer.uv.append((\n' \
-                                    '        coord_u / fmt.UV_COEFFICIENT_2,\n' \
-                                    '        1 - coord_v / fmt.UV_COEFFICIENT_2\n' \
-                                    '    ))\n'
-                        code += '    vertex_buffer.shader_data.append(shader_data)\n'
-                    else:
-                        code += '    vertex_buffer.uv.append((\n' \
-                                '        coord_u / fmt.UV_COEFFICIENT,\n' \
-                                '        1 - coord_v / fmt.UV_COEFFICIENT\n' \
-                                '    ))\n' \
-                                '    vertex_buffer.uv_lmap.append((\n' \
-                                '        lmap_u / fmt.LIGHT_MAP_UV_COEFFICIENT,\n' \
-                                '        1 - lmap_v / fmt.LIGHT_MAP_UV_COEFFICIENT\n' \
-                                '    ))\n'
+                        coord_u += correct_u
+                        coord_v -= correct_v
+                    data = vertices[field_name + '_data']
+                    vertex_buffer.shader_data = data[:, 0]
+                else:    # SHORT2 or SHORT4 with light map uv
+                    coord_u = coord_u / fmt.UV_COEFFICIENT
+                    coord_v = 1 - coord_v / fmt.UV_COEFFICIENT
+                    if has_uv_corrector and data_type == fmt.SHORT2:
+                        coord_u += correct_u
+                        coord_v -= correct_v
+                    if data_type == fmt.SHORT4:
+                        data = vertices[field_name + '_data']
+                        vertex_buffer.uv_lmap = numpy.column_stack((
+                            data[:, 0] / fmt.LIGHT_MAP_UV_COEFFICIENT,
+                            1 - data[:, 1] / fmt.LIGHT_MAP_UV_COEFFICIENT
+                        ))
+                vertex_buffer.uv = numpy.column_stack((coord_u, coord_v))
             elif usage_index == 1:    # lmap uv
-                code += '    lmap_u, lmap_v = packed_reader.getf("<{}")\n'.format(data_format)
                 if data_type == fmt.SHORT2:
-                    code += '    lmap_u = lmap_u / fmt.LIGHT_MAP_UV_COEFFICIENT\n'
-                    code += '    lmap_v = 1 - lmap_v / fmt.LIGHT_MAP_UV_COEFFICIENT\n'
-                code += '    vertex_buffer.uv_lmap.append((lmap_u, lmap_v))\n'
+                    vertex_buffer.uv_lmap = numpy.column_stack((
+                        coord_u / fmt.LIGHT_MAP_UV_COEFFICIENT,
+                        1 - coord_v / fmt.LIGHT_MAP_UV_COEFFICIENT
+                    ))
+                else:
+                    vertex_buffer.uv_lmap = field
             else:
                 raise BaseException('Unsupported uv usage index: {}'.format(usage_index))
         elif usage == fmt.COLOR:
-            code += '    blue, green, red, sun = packed_reader.getf("<{}")\n'.format(data_format)
+            # blue, green, red, sun
+            light = field[:, (2, 1, 0)]
             if data_type == fmt.D3DCOLOR:
-                code += '    red = red / 255\n'
-                code += '    green = green / 255\n'
-                code += '    blue = blue / 255\n'
-            code += '    vertex_buffer.color_light.append((\n' \
-                    '       red, green, blue\n' \
-                    '    ))\n'
-            code += '    vertex_buffer.color_sun.append(sun)\n'
-    global_usage_list.add(tuple(usages))
-    exec(code)
+                light = light / 255
+            vertex_buffer.color_light = light
+            vertex_buffer.color_sun = field[:, 3]
+    global_usage_list.add(tuple(usage_list))
+
+
+def get_fvf_dtype(vertex_format, xrlc_version):
+    fields = []
+    if (vertex_format & fmt.D3D7FVF.POSITION_MASK) == fmt.D3D7FVF.XYZ:
+        fields.append(('position', '<f4', (3, )))
+    if vertex_format & fmt.D3D7FVF.NORMAL:
+        fields.append(('normal', '<f4', (3, )))
+    if vertex_format & fmt.D3D7FVF.DIFFUSE:
+        fields.append(('diffuse', '<u1', (4, )))
+    tex_coord = (vertex_format & fmt.D3D7FVF.TEXCOUNT_MASK) >> fmt.D3D7FVF.TEXCOUNT_SHIFT
+    uv_fields = []
+    if tex_coord >= 1:
+        uv_fields.append(('uv', '<f4', (2, )))
+    if tex_coord >= 2:
+        uv_fields.append(('uv_lmap', '<f4', (2, )))
+    # light map uv is stored before texture uv in old builds
+    if xrlc_version < fmt.VERSION_5:
+        uv_fields.reverse()
+    fields.extend(uv_fields)
+    # the next texture sets are not imported, but they are
+    # read to get the right size of the vertex
+    for tex_index in range(2, tex_coord):
+        fields.append(('uv_{}'.format(tex_index), '<f4', (2, )))
+    return numpy.dtype(fields), tex_coord
 
 
 def import_vertices_d3d7(
@@ -135,43 +161,32 @@ def import_vertices_d3d7(
         vertices_count,
         vertex_format
     ):
-    code = ''
-    code += 'for vertex_index in range({0}):\n'.format(vertices_count)
+    # the whole buffer is decoded at once into the columns
+    dtype, tex_coord = get_fvf_dtype(vertex_format, level.xrlc_version)
+    vertices = packed_reader.get_records(dtype, vertices_count)
+    fields = dtype.names
     # xyz, normal, diffuse, tex coord
-    vertex_format_key = [False, ] * 4
-    if (vertex_format & fmt.D3D7FVF.POSITION_MASK) == fmt.D3D7FVF.XYZ:
-        vertex_format_key[0] = True    # xyz
-        code += '    coord_x, coord_y, coord_z = packed_reader.getf("<3f")\n'
-        code += '    vertex_buffer.position.append((coord_x, coord_z, coord_y))\n'
-    if vertex_format & fmt.D3D7FVF.NORMAL:
-        vertex_format_key[1] = True    # normal
+    vertex_format_key = (
+        'position' in fields,
+        'normal' in fields,
+        'diffuse' in fields,
+        tex_coord
+    )
+    if 'position' in fields:
+        vertex_buffer.position = vertices['position'][:, (0, 2, 1)]
+    if 'normal' in fields:
         vertex_buffer.float_normals = True
-        code += '    norm_x, norm_y, norm_z = packed_reader.getf("<3f")\n'
-        code += '    vertex_buffer.normal.append((norm_x, norm_y, norm_z))\n'
-    if vertex_format & fmt.D3D7FVF.DIFFUSE:
-        vertex_format_key[2] = True    # diffuse
-        code += '    red, green, blue, unknown = packed_reader.getf("<4B")\n'
-        code += '    red = red / 255\n'
-        code += '    green = green / 255\n'
-        code += '    blue = blue / 255\n'
-        code += '    vertex_buffer.color_light.append((red, green, blue))\n'
-    tex_coord = (vertex_format & fmt.D3D7FVF.TEXCOUNT_MASK) >> fmt.D3D7FVF.TEXCOUNT_SHIFT
-    vertex_format_key[3] = tex_coord    # texture coord count
-    lmap_uv_code = ''
-    if tex_coord in (1, 2):
-        tex_uv_code = '    coord_u, coord_v = packed_reader.getf("<2f")\n'
-        tex_uv_code += '    vertex_buffer.uv.append((coord_u, 1 - coord_v))\n'
-    if tex_coord == 2:
-        lmap_uv_code = '    lmap_u, lmap_v = packed_reader.getf("<2f")\n'
-        lmap_uv_code += '    vertex_buffer.uv_lmap.append((lmap_u, lmap_v))\n'
-    if level.xrlc_version >= fmt.VERSION_5:
-        code += tex_uv_code
-        code += lmap_uv_code
-    else:
-        code += lmap_uv_code
-        code += tex_uv_code
-    level.vertex_format_list.add(tuple(vertex_format_key))
-    exec(code)
+        vertex_buffer.normal = vertices['normal']
+    if 'diffuse' in fields:
+        # red, green, blue, unknown
+        vertex_buffer.color_light = vertices['diffuse'][:, 0 : 3] / 255
+    if 'uv' in fields:
+        uv = vertices['uv'].astype(numpy.float64)
+        uv[:, 1] = 1 - uv[:, 1]
+        vertex_buffer.uv = uv
+    if 'uv_lmap' in fields:
+        vertex_buffer.uv_lmap = vertices['uv_lmap']
+    level.vertex_format_list.add(vertex_format_key)
 
 
 def import_vertex_buffer_declaration(packed_reader):
@@ -9,6 +9,11 @@
 
 # Huffman coding
 
+# standart modules
+import struct
+from bisect import bisect_left, bisect_right
+
+
 N = 4096  # buffer size
 F = 60  # lookahead buffer size
 THRESHOLD = 2
@@ -20,198 +25,338 @@ MAX_FREQ = 0x4000  # updates tree when the root frequency comes to this value
 N_MASK = N - 1
 
 
-def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
-    buffer_pos = 0
-    buffer_size = len(buffer)
-
-    def getcz():
-        nonlocal buffer_pos, buffer_size
-        if buffer_pos == buffer_size:
-            return 0
-        result = buffer[buffer_pos]
-        buffer_pos += 1
-        return result
-
-    getbuf = 0
-    getlen = 0
-
-    def GetBit() -> int:  # get one bit
-        nonlocal getbuf, getlen
-        while getlen <= 8:
-            i = getcz()
-            getbuf |= i << (8 - getlen)
-            getlen += 8
-        i = getbuf
-        getbuf = (getbuf << 1) & 0xFFFFFFFF
-        getlen -= 1
-        return (i >> 15) & 1
-
-    def GetByte() -> int:  # get one byte
-        nonlocal getbuf, getlen
-        while getlen <= 8:
-            i = getcz()
-            getbuf |= i << (8 - getlen)
-            getlen += 8
-        i = getbuf
-        getbuf = (getbuf << 8) & 0xFFFFFFFF
-        getlen -= 8
-        return (i & 0xff00) >> 8
+def _start_huff(freq, prnt, son):
+    # initialization of tree
+    for i in range(N_CHAR):
+        freq[i] = 1
+        son[i] = i + T
+        prnt[i + T] = i
+
+    i, j = 0, N_CHAR
+    while j <= R:
+        freq[j] = freq[i] + freq[i + 1]
+        son[j] = i
+        prnt[i] = prnt[i + 1] = j
+        i += 2
+        j += 1
+    freq[T] = 0xffff
+    prnt[R] = 0
+
+
+def _reconst(freq, prnt, son):
+    # reconstruction of tree
+
+    # collect leaf nodes in the first half of the table
+    # and replace the freq by (freq + 1) / 2.
+    j = 0
+    for i in range(T):
+        if son[i] >= T:
+            freq[j] = (freq[i] + 1) // 2
+            son[j] = son[i]
+            j += 1
 
-    result = bytearray()
+    # begin constructing tree by connecting sons
+    i, j = 0, N_CHAR
+    while j < T:
+        f = freq[j] = freq[i] + freq[i + 1]
+
+        k = bisect_right(freq, f, 0, j)
+        freq[k + 1:j + 1] = freq[k:j]
+        son[k + 1:j + 1] = son[k:j]
+
+        freq[k] = f
+        son[k] = i
+        i += 2
+        j += 1
+
+    # connect prnt
+    for i in range(T):
+        k = son[i]
+        if k >= T:
+            prnt[k] = i
+        else:
+            prnt[k] = prnt[k + 1] = i
 
-    freq = [0] * (T + 1)  # frequency table
 
-    prnt = [0] * (T + N_CHAR)  # pointers to parent nodes, except for the
-    # elements [T..T + N_CHAR - 1] which are used to get
-    # the positions of leaves corresponding to the codes
+def _update(freq, prnt, son, c):
+    # increment frequency of given code by one, and update tree
+    if freq[R] == MAX_FREQ:
+        _reconst(freq, prnt, son)
 
-    son = [0] * T  # pointers to child nodes (son[], son[] + 1)
-    text_buf = [0] * (N + F - 1)
-
-    def StartHuff():  # initialization of tree
-        for i in range(N_CHAR):
-            freq[i] = 1
-            son[i] = i + T
-            prnt[i + T] = i
-
-        i, j = 0, N_CHAR
-        while j <= R:
-            freq[j] = freq[i] + freq[i + 1]
-            son[j] = i
-            prnt[i] = prnt[i + 1] = j
-            i += 2
-            j += 1
-        freq[T] = 0xffff
-        prnt[R] = 0
-
-    def reconst():  # reconstruction of tree
-        # collect leaf nodes in the first half of the table
-        # and replace the freq by (freq + 1) / 2.
-        j = 0
-        for i in range(T):
-            if son[i] >= T:
-                freq[j] = (freq[i] + 1) // 2
-                son[j] = son[i]
-                j += 1
-
-        # begin constructing tree by connecting sons
-        i, j = 0, N_CHAR
-        while j < T:
-            k = i + 1
-            f = freq[j] = freq[i] + freq[k]
-
-            k = j - 1
-            while f < freq[k]:
-                k -= 1
-            k += 1
-
-            for l in range(j - k):
-                t = j - l
-                s = t - 1
-                freq[t] = freq[s]
-                son[t] = son[s]
-
-            freq[k] = f
-            son[k] = i
-            i += 2
-            j += 1
+    c = prnt[c + T]
+    while True:
+        k = freq[c] + 1
+        freq[c] = k
 
-        # connect prnt
-        for i in range(T):
-            k = son[i]
-            if k >= T:
-                prnt[k] = i
-            else:
-                prnt[k] = prnt[k + 1] = i
+        # if the order is disturbed, exchange nodes
+        if k > freq[c + 1]:
+            l = bisect_left(freq, k, c + 2) - 1
+            freq[c] = freq[l]
+            freq[l] = k
 
-    def update(c: int):  # increment frequency of given code by one, and update tree
-        if freq[R] == MAX_FREQ:
-            reconst()
+            i = son[c]
+            prnt[i] = l
+            if i < T:
+                prnt[i + 1] = l
 
-        c = prnt[c + T]
-        while True:
-            k = freq[c] + 1
-            freq[c] = k
+            j = son[l]
+            son[l] = i
+
+            prnt[j] = c
+            if j < T:
+                prnt[j + 1] = c
+            son[c] = j
+
+            c = l
+        c = prnt[c]
+        if c == 0:  # repeat up to root
+            break
+
+
+def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
+    # The decoder is a single flat loop: the bit reader, the huffman
+    # tree walk and the tree update are inlined, because a function call
+    # per bit dominates the decoding time in python.
+    data = bytes(buffer)
+    data_size = len(data)
+    data_pos = 0
+
+    # The input is expanded block by block to a bytes object
+    # with one 0/1 byte per bit, so reading a bit is a plain index.
+    bits = b''
+    bit_pos = 0
+    bits_limit = -1
 
+    freq = [0] * (T + 1)  # frequency table
+    prnt = [0] * (T + N_CHAR)  # pointers to parent nodes
+    son = [0] * T  # pointers to child nodes (son[], son[] + 1)
+    _start_huff(freq, prnt, son)
+
+    # The output is a linear buffer prefixed with the initial
+    # contents of the ring buffer, so back-references never wrap.
+    # For the text position p the ring position is (N - F + p) & N_MASK,
+    # that gives F zero bytes followed by N - F spaces.
+    result = bytearray(F) + bytearray(b' ' * (N - F))
+    result += bytearray(textsize + F)
+    view = memoryview(result)
+    out = N
+    out_end = N + textsize
+
+    bits_values = _BITS_VALUES
+    tree_size = T
+    root = R
+
+    while out < out_end:
+        # one character and position code is always shorter than 64 bits,
+        # because the huffman tree depth is limited by MAX_FREQ
+        if bit_pos > bits_limit:
+            # bits past the end of the input are read as zeros
+            block = data[data_pos:data_pos + _BLOCK_SIZE] or bytes(8)
+            data_pos += _BLOCK_SIZE
+            block_bits = '{0:0{1}b}'.format(
+                int.from_bytes(block, 'big'),
+                len(block) * 8
+            )
+            bits = bits[bit_pos:] + block_bits.encode().translate(_BITS_TABLE)
+            bit_pos = 0
+            bits_limit = len(bits) - 64
+
+        # decode char: travel from root to leaf, choosing the smaller
+        # child node (son[]) if the read bit is 0, the bigger (son[] + 1) if 1
+        c = son[root]
+        while c < tree_size:
+            c = son[c + bits[bit_pos]]
+            bit_pos += 1
+        c -= tree_size
+
+        # increment frequency of given code by one, and update tree
+        if freq[root] == MAX_FREQ:
+            _reconst(freq, prnt, son)
+        node = prnt[c + tree_size]
+        while True:
+            k = freq[node] + 1
+            freq[node] = k
             # if the order is disturbed, exchange nodes
-            l = c + 1
-            if k > freq[l]:
-                while k > freq[l + 1]:
-                    l += 1
-                freq[c] = freq[l]
+            if k > freq[node + 1]:
+                # the frequency table is sorted, so a binary search
+                # finds the last node with a frequency less than k
+                l = bisect_left(freq, k, node + 2) - 1
+                freq[node] = freq[l]
                 freq[l] = k
 
-                i = son[c]
+                i = son[node]
                 prnt[i] = l
-                if i < T:
+                if i < tree_size:
                     prnt[i + 1] = l
 
                 j = son[l]
                 son[l] = i
 
-                prnt[j] = c
-                if j < T:
-                    prnt[j + 1] = c
-                son[c] = j
+                prnt[j] = node
+                if j < tree_size:
+                    prnt[j + 1] = node
+                son[node] = j
 
-                c = l
-            c = prnt[c]
-            if c == 0:  # repeat up to root
+                node = l
+            node = prnt[node]
+            if not node:  # repeat up to root
                 break
 
-    def DecodeChar() -> int:
-        c = son[R]
-
-        # travel from root to leaf,
-        # choosing the smaller child node (son[]) if the read bit is 0,
-        # the bigger (son[]+1} if 1
-        while c < T:
-            c += GetBit()
-            c = son[c]
-        c -= T
-        update(c)
-        return c
-
-    def DecodePosition() -> int:
-        # recover upper 6 bits from table
-        i = GetByte()
-        c = D_CODE[i] << 6
-        j = D_LEN[i]
+        if c < 256:
+            result[out] = c
+            out += 1
+            continue
 
+        # decode position: recover upper 6 bits from table
+        i = bits_values[bits[bit_pos:bit_pos + 8]]
+        j = D_LEN[i] - 2
         # read lower 6 bits verbatim
-        j -= 2
-        while j:
-            j -= 1
-            i = (i << 1) + GetBit()
-        return c | (i & 0x3f)
-
-    StartHuff()
-
-    # Decode
-    for i in range(N - F):
-        text_buf[i] = 32
-    r = N - F
-    count = 0
-    while count < textsize:
-        c = DecodeChar()
-        if c < 256:
-            result.append(c)
-            text_buf[r] = c
-            r = (r + 1) & N_MASK
-            count += 1
+        low = bits_values[bits[bit_pos + 8:bit_pos + 8 + j]]
+        bit_pos += 8 + j
+        start = out - ((D_CODE[i] << 6) | (((i << j) | low) & 0x3f)) - 1
+
+        length = c - 255 + THRESHOLD
+        if out - start >= length:
+            view[out:out + length] = view[start:start + length]
         else:
-            i = (r - DecodePosition() - 1) & N_MASK
-            j = c - 255 + THRESHOLD
-            for k in range(j):
-                c = text_buf[(i + k) & N_MASK]
-                result.append(c)
-                text_buf[r] = c
-                r = (r + 1) & N_MASK
-                count += 1
+            # overlapped copy, repeat the pattern
+            pattern = result[start:out]
+            pattern *= length // len(pattern) + 1
+            view[out:out + length] = pattern[:length]
+        out += length
+
+    view.release()
+    del result[out:]
+    del result[:N]
+    return result
+
+
+def compress_buffer(buffer: bytearray) -> bytearray:
+    # Greedy LZ77 parsing with a hash-chained match finder, the literals,
+    # match lengths and positions are coded the same way as in lzhuf.c
+    data = bytes(buffer)
+    size = len(data)
+
+    freq = [0] * (T + 1)  # frequency table
+    prnt = [0] * (T + N_CHAR)  # pointers to parent nodes
+    son = [0] * T  # pointers to child nodes (son[], son[] + 1)
+    _start_huff(freq, prnt, son)
+
+    result = bytearray()
+    bit_buf = 0
+    bit_count = 0
+
+    # hash chains of the match finder: head holds the last position
+    # of every 3-byte hash, prev links positions inside the window
+    head = [-N] * (_HASH_MASK + 1)
+    prev = [-N] * N
+    max_dist = N - F
+
+    pos = 0
+    while pos < size:
+        max_len = min(F, size - pos)
+        match_len = 0
+        match_pos = 0
+
+        if max_len > THRESHOLD:
+            key = (
+                (data[pos] << 8) ^ (data[pos + 1] << 4) ^ data[pos + 2]
+            ) & _HASH_MASK
+            cand = head[key]
+            chain = _MAX_CHAIN
+            while chain and pos - cand <= max_dist:
+                chain -= 1
+                if data[cand + match_len] == data[pos + match_len] and \
+                        data[cand:cand + match_len + 1] == \
+                        data[pos:pos + match_len + 1]:
+                    # binary search of the match length
+                    low = match_len + 1
+                    high = max_len
+                    while low < high:
+                        mid = (low + high + 1) >> 1
+                        if data[cand:cand + mid] == data[pos:pos + mid]:
+                            low = mid
+                        else:
+                            high = mid - 1
+                    match_len = low
+                    match_pos = cand
+                    if match_len == max_len:
+                        break
+                cand = prev[cand & N_MASK]
+
+        if match_len > THRESHOLD:
+            c = 255 - THRESHOLD + match_len
+            step = match_len
+        else:
+            c = data[pos]
+            step = 1
+
+        # encode char: travel from leaf to root
+        code = 0
+        code_len = 0
+        k = prnt[c + T]
+        while True:
+            # if node's address is odd-numbered, choose bigger brother node
+            code |= (k & 1) << code_len
+            code_len += 1
+            k = prnt[k]
+            if k == R:
+                break
+        bit_buf = (bit_buf << code_len) | code
+        bit_count += code_len
+        _update(freq, prnt, son, c)
+
+        if step > 1:
+            # encode position: output upper 6 bits by table lookup
+            # and lower 6 bits verbatim
+            dist = pos - match_pos - 1
+            i = dist >> 6
+            code_len = P_LEN[i]
+            bit_buf = (
+                (bit_buf << (code_len + 6)) |
+                ((P_CODE[i] >> (8 - code_len)) << 6) |
+                (dist & 0x3f)
+            )
+            bit_count += code_len + 6
+
+        while bit_count >= 32:
+            bit_count -= 32
+            result += _WORD.pack(bit_buf >> bit_count)
+            bit_buf &= (1 << bit_count) - 1
+
+        # insert the encoded positions into the hash chains
+        next_pos = pos + step
+        end = min(next_pos, size - THRESHOLD)
+        while pos < end:
+            key = (
+                (data[pos] << 8) ^ (data[pos + 1] << 4) ^ data[pos + 2]
+            ) & _HASH_MASK
+            prev[pos & N_MASK] = head[key]
+            head[key] = pos
+            pos += 1
+        pos = next_pos
+
+    # flush the remaining bits
+    if bit_count:
+        count = (bit_count + 7) // 8
+        result += (bit_buf << (count * 8 - bit_count)).to_bytes(count, 'big')
 
     return result
 
 
+_BLOCK_SIZE = 0x10000
+_HASH_MASK = 0xffff
+_MAX_CHAIN = 32
+_WORD = struct.Struct('>I')
+_BITS_TABLE = bytes.maketrans(b'01', b'\x00\x01')
+# values of the bit strings with length from 1 to 8 bits
+_BITS_VALUES = {
+    bytes((value >> shift) & 1 for shift in range(length - 1, -1, -1)): value
+    for length in range(1, 9)
+    for value in range(1 << length)
+}
+
+
 # table for encoding and decoding the upper 6 bits of position
 
 D_CODE = tuple(code - 48
@@ -229,3 +374,15 @@ D_LEN = tuple(code - 48
 5555555555555555666666666666666666666666666666666666666666666666\
 7777777777777777777777777777777777777777777777778888888888888888\
 ')
+
+# table for encoding the upper 6 bits of position
+
+P_LEN = tuple(
+    D_LEN[D_CODE.index(code)]
+    for code in range(64)
+)
+
+P_CODE = tuple(
+    D_CODE.index(code)
+    for code in range(64)
+)
@@ -9,7 +9,11 @@ from ... import utils
 def _export(bpy_obj, chunked_writer, context):
     writer = xray_io.ChunkedWriter()
     main.export_main(bpy_obj, writer, context)
-    chunked_writer.put(fmt.Chunks.Object.MAIN, writer)
+    chunked_writer.put(
+        fmt.Chunks.Object.MAIN,
+        writer,
+        compress=context.compress_chunks
+    )
 
 
 def export_file(bpy_obj, file_path, context):
@@ -195,13 +195,15 @@ def export_faces(chunked_writer, bm, bpy_obj):
 
     packed_writer = xray_io.PackedWriter()
     packed_writer.putf('<I', len(bm.faces))
+    face_refs = []
     for face in bm.faces:
         for vert_index in (0, 2, 1):
-            packed_writer.putf('<2I', face.verts[vert_index].index, len(uvs))
+            face_refs.append((face.verts[vert_index].index, len(uvs)))
             uv_coord = face.loops[vert_index][uv_layer].uv
             uvs.append((uv_coord[0], 1 - uv_coord[1]))
             vert_indices.append(face.verts[vert_index].index)
             face_indices.append(face.index)
+    packed_writer.put_many('<2I', face_refs)
     chunked_writer.put(fmt.Chunks.Mesh.FACES, packed_writer)
 
     return uvs, vert_indices, face_indices
@@ -303,12 +305,15 @@ def export_mesh(bpy_obj, bpy_root, chunked_writer, context):
         weight_ref = weight_refs[vertex_index]
         # vertex references count
         refs_count = uv_maps_count + len(weight_ref)
-        packed_writer.putf('<B', refs_count)
-        # uv ref
-        packed_writer.putf('<2I', uv_map_index, vertex_map_index)
+        # references count and uv ref
+        packed_writer.putf(
+            '<B2I',
+            refs_count,
+            uv_map_index,
+            vertex_map_index
+        )
         # weight refs
-        for ref in weight_ref:
-            packed_writer.putf('<2I', *ref)
+        packed_writer.put_many('<2I', weight_ref)
     chunked_writer.put(fmt.Chunks.Mesh.VMREFS, packed_writer)
 
     packed_writer = xray_io.PackedWriter()
@@ -383,8 +388,7 @@ def export_mesh(bpy_obj, bpy_root, chunked_writer, context):
     if not  nrm:
         nrm = export_normal_form_bm(bm,bpy_obj)
     packed_writer = xray_io.PackedWriter()
-    for fidx in nrm:
-        packed_writer.putf('fff', *pw_v3f(fidx))
+    packed_writer.put_many('<3f', [pw_v3f(fidx) for fidx in nrm])
     chunked_writer.put(fmt.Chunks.Mesh.NORM, packed_writer)
 
     # write vmaps chunk
@@ -400,12 +404,9 @@ def export_mesh(bpy_obj, bpy_root, chunked_writer, context):
     packed_writer.putf('<B', fmt.VMapTypes.UVS)    # type
     packed_writer.putf('<I', len(uvs))
     # write uv coords
-    for uvc in uvs:
-        packed_writer.putf('<2f', *uvc)
-    for vidx in vert_indices:
-        packed_writer.putf('<I', vidx)
-    for fidx in face_indices:
-        packed_writer.putf('<I', fidx)
+    packed_writer.put_many('<2f', uvs)
+    packed_writer.putf('<{}I'.format(len(vert_indices)), *vert_indices)
+    packed_writer.putf('<{}I'.format(len(face_indices)), *face_indices)
     # write vertex weights
     for group_index, vertex_group in enumerate(bpy_obj.vertex_groups):
         weight_map = weight_maps[group_index]
@@ -417,8 +418,11 @@ def export_mesh(bpy_obj, bpy_root, chunked_writer, context):
         packed_writer.putf('<B', 0)    # discon
         packed_writer.putf('<B', fmt.VMapTypes.WEIGHTS)    # type
         packed_writer.putf('<I', len(vert_indices))
-        for vert_index in vert_indices:
-            packed_writer.putf('<f', bm.verts[vert_index][weights_layer][group_index])
+        weights = [
+            bm.verts[vert_index][weights_layer][group_index]
+            for vert_index in vert_indices
+        ]
+        packed_writer.putf('<{}f'.format(len(weights)), *weights)
         packed_writer.putf('<' + str(len(vert_indices)) + 'I', *vert_indices)
     chunked_writer.put(fmt.Chunks.Mesh.VMAPS2, packed_writer)
 
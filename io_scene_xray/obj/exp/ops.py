@@ -41,6 +41,7 @@ def draw_props(self, mode='SINGLE'):
         layout.prop(self, 'use_export_paths')
     layout.prop(self, 'export_motions')
     layout.prop(self, 'texture_name_from_image_path')
+    layout.prop(self, 'compress_chunks')
 
 
 def find_objects_for_export(context):
@@ -92,7 +93,8 @@ export_props = {
 
     'fmt_version': ie_props.PropSDKVersion(),
     'use_export_paths': ie_props.PropUseExportPaths(),
-    'smoothing_out_of': ie_props.prop_smoothing_out_of()
+    'smoothing_out_of': ie_props.prop_smoothing_out_of(),
+    'compress_chunks': ie_props.prop_compress_chunks()
 }
 
 
@@ -121,6 +123,7 @@ class XRAY_OT_export_object(ie_props.BaseOperator, _WithExportMotions):
         export_context.soc_sgroups = self.fmt_version == 'soc'
         export_context.export_motions = self.export_motions
         export_context.smoothing_out_of = self.smoothing_out_of
+        export_context.compress_chunks = self.compress_chunks
         preferences = version_utils.get_preferences()
         export_context.textures_folder = preferences.textures_folder_auto
         use_split_normals = self.smoothing_out_of == 'SPLIT_NORMALS'
@@ -162,6 +165,7 @@ class XRAY_OT_export_object(ie_props.BaseOperator, _WithExportMotions):
         self.texture_name_from_image_path = \
             preferences.object_texture_names_from_path
         self.smoothing_out_of = preferences.smoothing_out_of
+        self.compress_chunks = preferences.object_compress_chunks
         self.use_export_paths = preferences.export_object_use_export_paths
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
@@ -176,7 +180,8 @@ export_props = {
     'texture_name_from_image_path': \
         ie_props.PropObjectTextureNamesFromPath(),
     'fmt_version': ie_props.PropSDKVersion(),
-    'smoothing_out_of': ie_props.prop_smoothing_out_of()
+    'smoothing_out_of': ie_props.prop_smoothing_out_of(),
+    'compress_chunks': ie_props.prop_compress_chunks()
 }
 
 
@@ -208,6 +213,7 @@ class XRAY_OT_export_object_file(
         export_context.soc_sgroups = self.fmt_version == 'soc'
         export_context.export_motions = self.export_motions
         export_context.smoothing_out_of = self.smoothing_out_of
+        export_context.compress_chunks = self.compress_chunks
         bpy_obj = context.scene.objects[self.object]
         preferences = version_utils.get_preferences()
         export_context.textures_folder = preferences.textures_folder_auto
@@ -242,6 +248,7 @@ class XRAY_OT_export_object_file(
         self.texture_name_from_image_path = \
             preferences.object_texture_names_from_path
         self.smoothing_out_of = preferences.smoothing_out_of
+        self.compress_chunks = preferences.object_compress_chunks
         return super().invoke(context, event)
 
 
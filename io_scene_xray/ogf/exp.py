@@ -6,6 +6,7 @@ import time
 import bpy
 import bmesh
 import mathutils
+import numpy
 
 # addon modules
 from . import fmt
@@ -17,23 +18,26 @@ from .. import version_utils
 from .. import xray_motions
 from .. import data_blocks
 from .. import omf
+from .. import vertex_cache
+from .. import bounding_sphere
+from .. import progressive
+from .. import level
 
 
 multiply = version_utils.get_multiply()
 
 
-def calculate_mesh_bsphere(bbox, vertices, mat=mathutils.Matrix()):
-    center = (bbox[0] + bbox[1]) / 2
-    _delta = bbox[1] - bbox[0]
-    max_radius = max(abs(_delta.x), abs(_delta.y), abs(_delta.z)) / 2
-    for vtx in vertices:
-        relative = multiply(mat, vtx.co) - center
-        radius = relative.length
-        if radius > max_radius:
-            offset = center - relative.normalized() * max_radius
-            center = (multiply(mat, vtx.co) + offset) / 2
-            max_radius = (center - offset).length
-    return center, max_radius
+def get_mesh_coords(vertices, mat=mathutils.Matrix()):
+    coords = numpy.array([vertex.co for vertex in vertices], dtype=numpy.float64)
+    coords = coords.reshape(-1, 3)
+    matrix = numpy.array(mat, dtype=numpy.float64)
+    return coords.dot(matrix[ : 3, : 3].T) + matrix[ : 3, 3]
+
+
+def calculate_mesh_bsphere(vertices, mat=mathutils.Matrix()):
+    coords = get_mesh_coords(vertices, mat)
+    center, radius = bounding_sphere.calculate(coords)
+    return mathutils.Vector(center), radius
 
 
 def calculate_bbox_and_bsphere(bpy_obj, apply_transforms=False, cache=None):
@@ -73,7 +77,7 @@ def calculate_bbox_and_bsphere(bpy_obj, apply_transforms=False, cache=None):
                     mat_world = mathutils.Matrix()
                 mesh = utils.convert_object_to_space_bmesh(bpy_mesh, mat_world)
                 bbx = utils.calculate_mesh_bbox(mesh.verts, mat=mat_world)
-                center, radius = calculate_mesh_bsphere(bbx, mesh.verts, mat=mat_world)
+                center, radius = calculate_mesh_bsphere(mesh.verts, mat=mat_world)
                 cache.bounds[bpy_mesh.name] = bbx, center, radius
         else:
             if apply_transforms:
@@ -82,7 +86,7 @@ def calculate_bbox_and_bsphere(bpy_obj, apply_transforms=False, cache=None):
                 mat_world = mathutils.Matrix()
             mesh = utils.convert_object_to_space_bmesh(bpy_mesh, mat_world)
             bbx = utils.calculate_mesh_bbox(mesh.verts, mat=mat_world)
-            center, radius = calculate_mesh_bsphere(bbx, mesh.verts, mat=mat_world)
+            center, radius = calculate_mesh_bsphere(mesh.verts, mat=mat_world)
 
         if bbox is None:
             bbox = bbx
@@ -92,16 +96,10 @@ def calculate_bbox_and_bsphere(bpy_obj, apply_transforms=False, cache=None):
                 bbox[1][axis] = max(bbox[1][axis], bbx[1][axis])
         spheres.append((center, radius))
 
-    center = mathutils.Vector()
-    radius = 0
     if not spheres:
-        return (mathutils.Vector(), mathutils.Vector()), (center, radius)
-    for sphere in spheres:
-        center += sphere[0]
-    center /= len(spheres)
-    for ctr, rad in spheres:
-        radius = max(radius, (ctr - center).length + rad)
-    return bbox, (center, radius)
+        return (mathutils.Vector(), mathutils.Vector()), (mathutils.Vector(), 0)
+    center, radius = bounding_sphere.merge(spheres)
+    return bbox, (mathutils.Vector(center), radius)
 
 
 def top_two(dic):
@@ -138,24 +136,13 @@ def _export_child(bpy_obj, chunked_writer, context, vertex_groups_map):
         mathutils.Matrix.Identity(4)
     )
     bbox = utils.calculate_mesh_bbox(mesh.verts)
-    bsphere = calculate_mesh_bsphere(bbox, mesh.verts)
+    bsphere = calculate_mesh_bsphere(mesh.verts)
     bmesh.ops.triangulate(mesh, faces=mesh.faces)
     bpy_mesh = bpy.data.meshes.new('.export-ogf')
     bpy_mesh.use_auto_smooth = bpy_obj.data.use_auto_smooth
     bpy_mesh.auto_smooth_angle = bpy_obj.data.auto_smooth_angle
     mesh.to_mesh(bpy_mesh)
 
-    # write header chunk
-    header_writer = xray_io.PackedWriter()
-    header_writer.putf('<B', fmt.FORMAT_VERSION_4)
-    header_writer.putf('<B', fmt.ModelType_v4.SKELETON_GEOMDEF_ST)
-    header_writer.putf('<H', 0)  # shader id
-    header_writer.putv3f(bbox[0])
-    header_writer.putv3f(bbox[1])
-    header_writer.putv3f(bsphere[0])
-    header_writer.putf('<f', bsphere[1])
-    chunked_writer.put(fmt.HEADER, header_writer)
-
     # search material
     used_materials = set()
     for face in bpy_obj.data.polygons:
@@ -194,11 +181,10 @@ def _export_child(bpy_obj, chunked_writer, context, vertex_groups_map):
         no_err=False
     )
 
-    # write texture chunk
+    # texture chunk data
     texture_writer = xray_io.PackedWriter()
     texture_writer.puts(texture_path)
     texture_writer.puts(material.xray.eshader)
-    chunked_writer.put(fmt.Chunks_v4.TEXTURE, texture_writer)
 
     # collect geometry data
     uv_layer = mesh.loops.layers.uv.active
@@ -228,6 +214,41 @@ def _export_child(bpy_obj, chunked_writer, context, vertex_groups_map):
         triangles.append(face_indices)
     utils.fix_ensure_lookup_table(mesh.verts)
 
+    model_type = fmt.ModelType_v4.SKELETON_GEOMDEF_ST
+    slide_windows = None
+    if context.progressive_meshes:
+        progressive_mesh = progressive.generate(
+            [vertex[1] for vertex in vertices],
+            triangles
+        )
+        if progressive_mesh:
+            # slide windows define the triangles order,
+            # so the vertex cache optimization is not used
+            vertices_order, indices, slide_windows = progressive_mesh
+            triangles = indices.reshape(-1, 3).tolist()
+            vertices = [vertices[index] for index in vertices_order.tolist()]
+            model_type = fmt.ModelType_v4.SKELETON_GEOMDEF_PM
+    if context.optimize_vertex_cache and not slide_windows:
+        triangles, vertices_order = vertex_cache.optimize_with_stats(
+            triangles, len(vertices), context.vertex_cache_stats
+        )
+        triangles = triangles.tolist()
+        vertices = [vertices[index] for index in vertices_order.tolist()]
+
+    # write header chunk
+    header_writer = xray_io.PackedWriter()
+    header_writer.putf('<B', fmt.FORMAT_VERSION_4)
+    header_writer.putf('<B', model_type)
+    header_writer.putf('<H', 0)  # shader id
+    header_writer.putv3f(bbox[0])
+    header_writer.putv3f(bbox[1])
+    header_writer.putv3f(bsphere[0])
+    header_writer.putf('<f', bsphere[1])
+    chunked_writer.put(fmt.HEADER, header_writer)
+
+    # write texture chunk
+    chunked_writer.put(fmt.Chunks_v4.TEXTURE, texture_writer)
+
     # find max number of vertex weights
     vertex_max_weights = 0
     for vertex in mesh.verts:
@@ -304,6 +325,12 @@ def _export_child(bpy_obj, chunked_writer, context, vertex_groups_map):
         indices_writer.putf('<3H', tris[0], tris[2], tris[1])
     chunked_writer.put(fmt.Chunks_v4.INDICES, indices_writer)
 
+    # write slide windows chunk
+    if slide_windows:
+        swi_writer = xray_io.PackedWriter()
+        level.swi.write_slide_window_item(swi_writer, slide_windows)
+        chunked_writer.put(fmt.Chunks_v4.SWIDATA, swi_writer)
+
 
 def get_ode_ik_limits(value_1, value_2):
     # swap special for ODE
@@ -426,7 +453,11 @@ def _export(bpy_obj, cwriter, context):
     for mesh_writer in meshes:
         children_chunked_writer.put(mesh_index, mesh_writer)
         mesh_index += 1
-    cwriter.put(fmt.Chunks_v4.CHILDREN, children_chunked_writer)
+    cwriter.put(
+        fmt.Chunks_v4.CHILDREN,
+        children_chunked_writer,
+        compress=context.compress_chunks
+    )
 
     pwriter = xray_io.PackedWriter()
     pwriter.putf('<I', len(bones))
@@ -535,5 +566,7 @@ def _export(bpy_obj, cwriter, context):
 def export_file(bpy_obj, file_path, context):
     log.update(object=bpy_obj.name)
     cwriter = xray_io.ChunkedWriter()
+    context.vertex_cache_stats = vertex_cache.CacheStats()
     _export(bpy_obj, cwriter, context)
     utils.save_file(file_path, cwriter)
+    vertex_cache.report(context, context.vertex_cache_stats)
@@ -3,8 +3,8 @@ import math
 
 # blender modules
 import bpy
-import bmesh
 import mathutils
+import numpy
 
 # addon modules
 from . import fmt
@@ -108,107 +108,236 @@ def create_object(name, obj_data):
     return bpy_object
 
 
-def convert_normal(norm_in):
-    norm_out_x = 2.0 * norm_in[0] / 255 - 1.0
-    norm_out_y = 2.0 * norm_in[1] / 255 - 1.0
-    norm_out_z = 2.0 * norm_in[2] / 255 - 1.0
-    return mathutils.Vector((norm_out_z, norm_out_x, norm_out_y)).normalized()
+def convert_normals(normals):
+    # quantized normals to unit vectors in blender axes
+    normals = numpy.asarray(normals, dtype=numpy.float64)[:, 0 : 3]
+    return convert_float_normals(2.0 * normals / 255 - 1.0)
+
+
+def convert_float_normals(normals):
+    normals = numpy.asarray(normals, dtype=numpy.float64)[:, (2, 0, 1)]
+    lengths = numpy.sqrt((normals * normals).sum(axis=1))
+    lengths[lengths == 0.0] = 1.0
+    return normals / lengths[:, None]
+
+
+def has_values(values):
+    return values is not None and len(values) != 0
+
+
+def normalize_vectors(vectors):
+    lengths = numpy.sqrt((vectors * vectors).sum(axis=1))
+    nonzero = lengths > 0.0
+    vectors = vectors.copy()
+    vectors[nonzero] /= lengths[nonzero, None]
+    return vectors, nonzero
+
+
+def get_vertex_normals(coords, triangles):
+    # vertex normals as in bmesh normal_update: face normals
+    # accumulated with the weight of the corner angle
+    corners = [coords[triangles[:, index]] for index in range(3)]
+    face_normals, _ = normalize_vectors(numpy.cross(
+        corners[0] - corners[1],
+        corners[1] - corners[2]
+    ))
+    vertex_normals = numpy.zeros(coords.shape, dtype=numpy.float64)
+    for index in range(3):
+        corner = corners[index]
+        edge_prev, _ = normalize_vectors(corners[index - 1] - corner)
+        edge_next, _ = normalize_vectors(corners[(index + 1) % 3] - corner)
+        dot_product = numpy.clip((edge_prev * edge_next).sum(axis=1), -1.0, 1.0)
+        angles = numpy.arccos(dot_product)
+        numpy.add.at(
+            vertex_normals,
+            triangles[:, index],
+            face_normals * angles[:, None]
+        )
+    vertex_normals, nonzero = normalize_vectors(vertex_normals)
+    # loose vertices use the normalized coordinate
+    vertex_normals[~nonzero], _ = normalize_vectors(coords[~nonzero])
+    return vertex_normals
+
+
+def get_group_ids(keys):
+    # group identical rows of the keys array, groups are numbered
+    # in the order of the first occurrence
+    rows_count = len(keys)
+    if not rows_count:
+        return numpy.zeros(0, dtype=numpy.int32)
+    order = numpy.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    group_starts = numpy.ones(rows_count, dtype=bool)
+    group_starts[1 : ] = (sorted_keys[1 : ] != sorted_keys[ : -1]).any(axis=1)
+    sorted_ids = numpy.cumsum(group_starts) - 1
+    ids = numpy.empty(rows_count, dtype=numpy.int64)
+    ids[order] = sorted_ids
+    # lexsort is stable, so the group start is its first occurrence
+    first_indices = order[group_starts]
+    renumber = numpy.empty(len(first_indices), dtype=numpy.int64)
+    renumber[numpy.argsort(first_indices, kind='mergesort')] = numpy.arange(
+        len(first_indices)
+    )
+    return renumber[ids].astype(numpy.int32)
+
+
+def weld_vertices(visual):
+    vertices = numpy.asarray(visual.vertices, dtype=numpy.float64)
+    vertices = vertices.reshape(-1, 3)
+    triangles = numpy.asarray(visual.triangles, dtype=numpy.int64)
+    triangles = triangles.reshape(-1, 3)
+
+    # vertex normals rounded as float32 bmesh normals
+    coords = vertices.astype(numpy.float32).astype(numpy.float64)
+    normals = get_vertex_normals(coords, triangles)
+    normals = normals.astype(numpy.float32).astype(numpy.float64)
+    normals = numpy.round(normals, 3) + 0.0    # + 0.0 removes -0.0
+
+    # the normal with its reversed normal is a class, in every class the
+    # vertices of the coordinate with the normal of the first vertex are
+    # front side, with the reversed normal are back side
+    reversed_normals = -normals + 0.0
+    use_reversed = numpy.zeros(len(normals), dtype=bool)
+    undecided = numpy.ones(len(normals), dtype=bool)
+    for axis in range(3):
+        less = reversed_normals[:, axis] < normals[:, axis]
+        greater = reversed_normals[:, axis] > normals[:, axis]
+        use_reversed |= undecided & less
+        undecided &= ~(less | greater)
+    class_normals = numpy.where(
+        use_reversed[:, None],
+        reversed_normals,
+        normals
+    )
+    class_ids = get_group_ids(numpy.hstack((coords, class_normals)))
+    vertex_indices = numpy.arange(len(class_ids))
+    # index of the first vertex of the class
+    first_indices = numpy.zeros(len(class_ids), dtype=numpy.int64)
+    first_indices[class_ids[::-1]] = vertex_indices[::-1]
+    first_indices = first_indices[class_ids]
+    back_side = (normals != normals[first_indices]).any(axis=1)
+    # zero normal is reversed itself, all except the first are back side
+    zero_normals = ~normals.any(axis=1)
+    back_side |= zero_normals & (first_indices != vertex_indices)
+
+    # weld vertices with the same coordinates, side and weights
+    weld_keys = [vertices, back_side[:, None]]
+    if visual.weights:
+        weights_ids = {}
+        vertices_weights = [
+            weights_ids.setdefault(tuple(weights), len(weights_ids))
+            for weights in visual.weights
+        ]
+        weld_keys.append(numpy.array(vertices_weights)[:, None])
+
+    return get_group_ids(numpy.hstack(weld_keys))
 
 
-def convert_float_normal(norm_in):
-    return mathutils.Vector((norm_in[2], norm_in[0], norm_in[1])).normalized()
+def get_created_faces(faces):
+    # mask of the triangles that are created in the mesh: triangles with
+    # repeated vertices and triangles with the vertices of the already
+    # created triangle are skipped (bmesh faces.new raises ValueError)
+    sorted_faces = numpy.sort(faces, axis=1)
+    degenerate = (
+        (sorted_faces[:, 0] == sorted_faces[:, 1]) |
+        (sorted_faces[:, 1] == sorted_faces[:, 2])
+    )
+    valid_indices = numpy.flatnonzero(~degenerate)
+    created = numpy.zeros(len(faces), dtype=bool)
+    if len(valid_indices):
+        # rows are grouped by lexsort, packed scalar keys
+        # overflow for the meshes with millions of vertices
+        face_ids = get_group_ids(sorted_faces[valid_indices])
+        _, first_indices = numpy.unique(face_ids, return_index=True)
+        created[valid_indices[first_indices]] = True
+    return created
+
+
+def new_uv_layer(bpy_mesh, name, uvs):
+    if version_utils.IS_28:
+        uv_layer = bpy_mesh.uv_layers.new(name=name)
+    else:
+        uv_texture = bpy_mesh.uv_textures.new(name=name)
+        uv_layer = bpy_mesh.uv_layers[uv_texture.name]
+    uv_layer.data.foreach_set(
+        'uv',
+        numpy.ascontiguousarray(uvs, dtype=numpy.float32).ravel()
+    )
+
+
+def new_color_layer(bpy_mesh, name, colors):
+    # colors is (loops count, 3) array, or (loops count, ) for gray colors
+    colors = numpy.asarray(colors, dtype=numpy.float32)
+    if colors.ndim == 1:
+        colors = numpy.repeat(colors[:, None], 3, axis=1)
+    if version_utils.IS_28:
+        alpha = numpy.ones((len(colors), 1), dtype=numpy.float32)
+        colors = numpy.hstack((colors, alpha))
+    color_layer = bpy_mesh.vertex_colors.new(name=name)
+    color_layer.data.foreach_set(
+        'color',
+        numpy.ascontiguousarray(colors).ravel()
+    )
+
+
+def create_mesh(name, vertices, faces):
+    bpy_mesh = bpy.data.meshes.new(name)
+    faces_count = len(faces)
+    loops_count = faces_count * 3
+    bpy_mesh.vertices.add(len(vertices))
+    bpy_mesh.vertices.foreach_set(
+        'co',
+        numpy.ascontiguousarray(vertices, dtype=numpy.float32).ravel()
+    )
+    bpy_mesh.loops.add(loops_count)
+    bpy_mesh.loops.foreach_set(
+        'vertex_index',
+        numpy.ascontiguousarray(faces, dtype=numpy.int32).ravel()
+    )
+    bpy_mesh.polygons.add(faces_count)
+    bpy_mesh.polygons.foreach_set(
+        'loop_start',
+        numpy.arange(0, loops_count, 3, dtype=numpy.int32)
+    )
+    bpy_mesh.polygons.foreach_set(
+        'loop_total',
+        numpy.full(faces_count, 3, dtype=numpy.int32)
+    )
+    bpy_mesh.polygons.foreach_set(
+        'use_smooth',
+        numpy.ones(faces_count, dtype=bool)
+    )
+    return bpy_mesh
 
 
 def create_visual(visual, bpy_mesh=None, lvl=None, geometry_key=None, bones=None):
     if not bpy_mesh:
-        mesh = bmesh.new()
-
-        temp_mesh = bmesh.new()
-
-        remap_vertex_index = 0
-        remap_vertices = {}
-        unique_verts = {}
-        vert_normals = {}
-        for vertex_index, vertex_coord in enumerate(visual.vertices):
-            vert = temp_mesh.verts.new(vertex_coord)
-            vert_normals[tuple(vert.co)] = []
-
-        temp_mesh.verts.ensure_lookup_table()
-        temp_mesh.verts.index_update()
-
-        for triangle in visual.triangles:
-            temp_mesh.faces.new((
-                temp_mesh.verts[triangle[0]],
-                temp_mesh.verts[triangle[1]],
-                temp_mesh.verts[triangle[2]]
-            ))
+        remap_vertices = weld_vertices(visual)
 
-        temp_mesh.faces.ensure_lookup_table()
-        temp_mesh.normal_update()
+        # welded vertices coordinates in the order of the first use
+        vertices = numpy.asarray(visual.vertices, dtype=numpy.float32)
+        unique_indices = numpy.zeros(
+            remap_vertices.max() + 1 if len(remap_vertices) else 0,
+            dtype=numpy.int32
+        )
+        unique_indices[remap_vertices[::-1]] = numpy.arange(
+            len(remap_vertices) - 1, -1, -1, dtype=numpy.int32
+        )
+        weld_coords = vertices[unique_indices]
 
-        back_side = {}
+        # triangles
+        triangles = numpy.asarray(
+            visual.triangles,
+            dtype=numpy.int32
+        ).reshape(-1, 3)
+        faces = remap_vertices[triangles]
+        created = get_created_faces(faces)
+        faces = faces[created]
+        # source vertex index of the every loop
+        loops = triangles[created].ravel()
+
+        bpy_mesh = create_mesh(visual.name, weld_coords, faces)
 
-        for vert in temp_mesh.verts:
-            norm = (
-                round(vert.normal[0], 3),
-                round(vert.normal[1], 3),
-                round(vert.normal[2], 3)
-            )
-            vert_normals[tuple(vert.co)].append((vert.index, norm))
-
-        temp_mesh.clear()
-        del temp_mesh
-
-        for vertex_co, norms in vert_normals.items():
-            back_side_norms = set()
-            for vertex_index, normal in norms:
-                normal = tuple(normal)
-                back_norm = (-normal[0], -normal[1], -normal[2])
-                if back_norm in back_side_norms:
-                    back_side[vertex_index] = True
-                else:
-                    back_side[vertex_index] = False
-                    back_side_norms.add(normal)
-
-        # import vertices
-        remap_vertex_index = 0
-        remap_vertices = {}
-        unique_verts = {}
-        if not visual.weights:
-            for vertex_index, vertex_coord in enumerate(visual.vertices):
-                is_back_vert = back_side[vertex_index]
-                if unique_verts.get((vertex_coord, is_back_vert), None) is None:
-                    mesh.verts.new(vertex_coord)
-                    remap_vertices[vertex_index] = remap_vertex_index
-                    unique_verts[(vertex_coord, is_back_vert)] = remap_vertex_index
-                    remap_vertex_index += 1
-                else:
-                    current_remap_vertex_index = unique_verts[(vertex_coord, is_back_vert)]
-                    remap_vertices[vertex_index] = current_remap_vertex_index
-        else:
-            for vertex_index, vertex_coord in enumerate(visual.vertices):
-                is_back_vert = back_side[vertex_index]
-                weights = tuple(visual.weights[vertex_index])
-                if unique_verts.get((vertex_coord, weights, is_back_vert), None) is None:
-                    mesh.verts.new(vertex_coord)
-                    remap_vertices[vertex_index] = remap_vertex_index
-                    unique_verts[(vertex_coord, weights, is_back_vert)] = remap_vertex_index
-                    remap_vertex_index += 1
-                else:
-                    current_remap_vertex_index = unique_verts[(vertex_coord, weights, is_back_vert)]
-                    remap_vertices[vertex_index] = current_remap_vertex_index
-
-        mesh.verts.ensure_lookup_table()
-        mesh.verts.index_update()
-
-        # import triangles
-        remap_loops = []
-        custom_normals = []
-        if not visual.vb_index is None:
-            if not lvl.vertex_buffers[visual.vb_index].float_normals:
-                convert_normal_function = convert_normal
-        else:
-            convert_normal_function = convert_float_normal
         is_new_format = False
         if lvl:
             if lvl.xrlc_version >= level.fmt.VERSION_11:
@@ -216,172 +345,52 @@ def create_visual(visual, bpy_mesh=None, lvl=None, geometry_key=None, bones=None
         else:
             if visual.format_version == fmt.FORMAT_VERSION_4:
                 is_new_format = True
+
+        # normals
+        custom_normals = None
         if is_new_format:
-            for triangle in visual.triangles:
-                try:
-                    vert_1 = remap_vertices[triangle[0]]
-                    vert_2 = remap_vertices[triangle[1]]
-                    vert_3 = remap_vertices[triangle[2]]
-                    face = mesh.faces.new((
-                        mesh.verts[vert_1],
-                        mesh.verts[vert_2],
-                        mesh.verts[vert_3]
-                    ))
-                    face.smooth = True
-                    for vert_index in triangle:
-                        remap_loops.append(vert_index)
-                    normal_1 = visual.normals[triangle[0]]
-                    normal_2 = visual.normals[triangle[1]]
-                    normal_3 = visual.normals[triangle[2]]
-                    custom_normals.extend((
-                        convert_normal_function(normal_1),
-                        convert_normal_function(normal_2),
-                        convert_normal_function(normal_3)
-                    ))
-                except ValueError:    # face already exists
-                    pass
-
-            mesh.faces.ensure_lookup_table()
-
-            # import uvs and vertex colors
-            uv_layer = mesh.loops.layers.uv.new('Texture')
-            current_loop = 0
-            if visual.uvs_lmap:    # light maps
-                hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-                lmap_uv_layer = mesh.loops.layers.uv.new('Light Map')
-                for face in mesh.faces:
-                    for loop in face.loops:
-                        loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                        loop[lmap_uv_layer].uv = visual.uvs_lmap[remap_loops[current_loop]]
-                        # hemi vertex color
-                        hemi = visual.hemi[remap_loops[current_loop]]
-                        bmesh_hemi_color = loop[hemi_vertex_color]
-                        bmesh_hemi_color[0] = hemi
-                        bmesh_hemi_color[1] = hemi
-                        bmesh_hemi_color[2] = hemi
-                        current_loop += 1
-            elif visual.light:    # vertex colors
-                hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-                sun_vertex_color = mesh.loops.layers.color.new('Sun')
-                light_vertex_color = mesh.loops.layers.color.new('Light')
-                for face in mesh.faces:
-                    for loop in face.loops:
-                        loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                        # hemi vertex color
-                        hemi = visual.hemi[remap_loops[current_loop]]
-                        bmesh_hemi_color = loop[hemi_vertex_color]
-                        bmesh_hemi_color[0] = hemi
-                        bmesh_hemi_color[1] = hemi
-                        bmesh_hemi_color[2] = hemi
-                        # light vertex color
-                        light = visual.light[remap_loops[current_loop]]
-                        bmesh_light_color = loop[light_vertex_color]
-                        bmesh_light_color[0] = light[0]
-                        bmesh_light_color[1] = light[1]
-                        bmesh_light_color[2] = light[2]
-                        # sun vertex color
-                        sun = visual.sun[remap_loops[current_loop]]
-                        bmesh_sun_color = loop[sun_vertex_color]
-                        bmesh_sun_color[0] = sun
-                        bmesh_sun_color[1] = sun
-                        bmesh_sun_color[2] = sun
-                        current_loop += 1
+            float_normals = True
+            if not visual.vb_index is None:
+                vertex_buffer = lvl.vertex_buffers[visual.vb_index]
+                float_normals = vertex_buffer.float_normals
+            if float_normals:
+                normals = convert_float_normals(visual.normals)
             else:
-                if visual.hemi:    # trees
-                    hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-                    for face in mesh.faces:
-                        for loop in face.loops:
-                            loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                            # hemi vertex color
-                            hemi = visual.hemi[remap_loops[current_loop]]
-                            bmesh_hemi_color = loop[hemi_vertex_color]
-                            bmesh_hemi_color[0] = hemi
-                            bmesh_hemi_color[1] = hemi
-                            bmesh_hemi_color[2] = hemi
-                            current_loop += 1
-                else:    # ogf file
-                    for face in mesh.faces:
-                        for loop in face.loops:
-                            loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                            current_loop += 1
-
+                normals = convert_normals(visual.normals)
+            custom_normals = normals[loops]
+        elif has_values(visual.normals):    # xrlc version <= 10
+            custom_normals = convert_normals(visual.normals)[loops]
+
+        # import uvs and vertex colors
+        uvs = numpy.asarray(visual.uvs, dtype=numpy.float32)
+        new_uv_layer(bpy_mesh, 'Texture', uvs[loops])
+        if is_new_format:
+            if has_values(visual.uvs_lmap):    # light maps
+                hemi = numpy.asarray(visual.hemi)
+                new_color_layer(bpy_mesh, 'Hemi', hemi[loops])
+                uvs_lmap = numpy.asarray(visual.uvs_lmap)
+                new_uv_layer(bpy_mesh, 'Light Map', uvs_lmap[loops])
+            elif has_values(visual.light):    # vertex colors
+                hemi = numpy.asarray(visual.hemi)
+                sun = numpy.asarray(visual.sun)
+                light = numpy.asarray(visual.light)
+                new_color_layer(bpy_mesh, 'Hemi', hemi[loops])
+                new_color_layer(bpy_mesh, 'Sun', sun[loops])
+                new_color_layer(bpy_mesh, 'Light', light[loops])
+            elif has_values(visual.hemi):    # trees
+                hemi = numpy.asarray(visual.hemi)
+                new_color_layer(bpy_mesh, 'Hemi', hemi[loops])
         else:    # xrlc version <= 10
-            if visual.normals:
-                for triangle in visual.triangles:
-                    try:
-                        vert_1 = remap_vertices[triangle[0]]
-                        vert_2 = remap_vertices[triangle[1]]
-                        vert_3 = remap_vertices[triangle[2]]
-                        face = mesh.faces.new((
-                            mesh.verts[vert_1],
-                            mesh.verts[vert_2],
-                            mesh.verts[vert_3]
-                        ))
-                        face.smooth = True
-                        for vert_index in triangle:
-                            remap_loops.append(vert_index)
-                        normal_1 = visual.normals[triangle[0]]
-                        normal_2 = visual.normals[triangle[1]]
-                        normal_3 = visual.normals[triangle[2]]
-                        custom_normals.extend((
-                            convert_normal(normal_1),
-                            convert_normal(normal_2),
-                            convert_normal(normal_3)
-                        ))
-                    except ValueError:    # face already exists
-                        pass
-            else:
-                for triangle in visual.triangles:
-                    try:
-                        vert_1 = remap_vertices[triangle[0]]
-                        vert_2 = remap_vertices[triangle[1]]
-                        vert_3 = remap_vertices[triangle[2]]
-                        face = mesh.faces.new((
-                            mesh.verts[vert_1],
-                            mesh.verts[vert_2],
-                            mesh.verts[vert_3]
-                        ))
-                        face.smooth = True
-                        for vert_index in triangle:
-                            remap_loops.append(vert_index)
-                    except ValueError:    # face already exists
-                        pass
-
-            mesh.faces.ensure_lookup_table()
-
-            # import uvs and vertex colors
-            uv_layer = mesh.loops.layers.uv.new('Texture')
-            current_loop = 0
-            if visual.uvs_lmap:    # light maps
-                lmap_uv_layer = mesh.loops.layers.uv.new('Light Map')
-                for face in mesh.faces:
-                    for loop in face.loops:
-                        loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                        loop[lmap_uv_layer].uv = visual.uvs_lmap[remap_loops[current_loop]]
-                        current_loop += 1
-            elif visual.light:    # vertex colors
-                light_vertex_color = mesh.loops.layers.color.new('Light')
-                for face in mesh.faces:
-                    for loop in face.loops:
-                        loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                        # light vertex color
-                        light = visual.light[remap_loops[current_loop]]
-                        bmesh_light_color = loop[light_vertex_color]
-                        bmesh_light_color[0] = light[0]
-                        bmesh_light_color[1] = light[1]
-                        bmesh_light_color[2] = light[2]
-                        current_loop += 1
-            else:
-                for face in mesh.faces:
-                    for loop in face.loops:
-                        loop[uv_layer].uv = visual.uvs[remap_loops[current_loop]]
-                        current_loop += 1
+            if has_values(visual.uvs_lmap):    # light maps
+                uvs_lmap = numpy.asarray(visual.uvs_lmap)
+                new_uv_layer(bpy_mesh, 'Light Map', uvs_lmap[loops])
+            elif has_values(visual.light):    # vertex colors
+                light = numpy.asarray(visual.light)
+                new_color_layer(bpy_mesh, 'Light', light[loops])
 
-        # normals
-        mesh.normal_update()
+        bpy_mesh.update(calc_edges=True)
 
         # create mesh
-        bpy_mesh = bpy.data.meshes.new(visual.name)
         bpy_mesh.use_auto_smooth = True
         bpy_mesh.auto_smooth_angle = math.pi
         if lvl:
@@ -389,9 +398,8 @@ def create_visual(visual, bpy_mesh=None, lvl=None, geometry_key=None, bones=None
 
             if not version_utils.IS_28:
                 bpy_image = lvl.images[visual.shader_id]
-                texture_layer = mesh.faces.layers.tex.new('Texture')
-                for face in mesh.faces:
-                    face[texture_layer].image = bpy_image
+                for tex_poly in bpy_mesh.uv_textures['Texture'].data:
+                    tex_poly.image = bpy_image
 
             lvl.loaded_geometry[geometry_key] = bpy_mesh
 
@@ -400,14 +408,11 @@ def create_visual(visual, bpy_mesh=None, lvl=None, geometry_key=None, bones=None
             bpy_mesh.materials.append(material)
 
             if not version_utils.IS_28:
-                texture_layer = mesh.faces.layers.tex.new('Texture')
-                for face in mesh.faces:
-                    face[texture_layer].image = visual.bpy_image
+                for tex_poly in bpy_mesh.uv_textures['Texture'].data:
+                    tex_poly.image = visual.bpy_image
 
-        mesh.to_mesh(bpy_mesh)
-        if custom_normals:
+        if custom_normals is not None and len(custom_normals):
             bpy_mesh.normals_split_custom_set(custom_normals)
-        del mesh
 
     else:
         if lvl:
@@ -417,6 +422,7 @@ def create_visual(visual, bpy_mesh=None, lvl=None, geometry_key=None, bones=None
 
     # assign weights
     if visual.weights:
+        remap_vertices = remap_vertices.tolist()
         for index, (name, parent) in enumerate(visual.bones):
             if index in visual.deform_bones:
                 bpy_object.vertex_groups.new(name=name)
@@ -447,6 +453,7 @@ def import_fastpath_gcontainer(data, visual, lvl):
         return bpy_mesh, geometry_key
     vertex_buffers = lvl.fastpath_vertex_buffers
     indices_buffers = lvl.fastpath_indices_buffers
+    # views of the shared buffers, the data is not copied
     visual.vertices = vertex_buffers[vb_index].position[vb_slice]
 
     visual.indices = indices_buffers[ib_index][
@@ -484,17 +491,19 @@ def import_gcontainer(
             return bpy_mesh, geometry_key
         vertex_buffers = lvl.vertex_buffers
         indices_buffers = lvl.indices_buffers
-        visual.vertices = vertex_buffers[vb_index].position[vb_slice]
-        visual.normals = vertex_buffers[vb_index].normal[vb_slice]
-        visual.uvs = vertex_buffers[vb_index].uv[vb_slice]
-        visual.uvs_lmap = vertex_buffers[vb_index].uv_lmap[vb_slice]
-        visual.hemi = vertex_buffers[vb_index].color_hemi[vb_slice]
+        vertex_buffer = vertex_buffers[vb_index]
+        # views of the shared buffer columns, the data is not copied
+        visual.vertices = vertex_buffer.position[vb_slice]
+        visual.normals = vertex_buffer.normal[vb_slice]
+        visual.uvs = vertex_buffer.uv[vb_slice]
+        visual.uvs_lmap = vertex_buffer.uv_lmap[vb_slice]
+        visual.hemi = vertex_buffer.color_hemi[vb_slice]
         visual.vb_index = vb_index
 
-        if vertex_buffers[vb_index].color_light:
-            visual.light = vertex_buffers[vb_index].color_light[vb_slice]
-        if vertex_buffers[vb_index].color_sun:
-            visual.sun = vertex_buffers[vb_index].color_sun[vb_slice]
+        if len(vertex_buffer.color_light):
+            visual.light = vertex_buffer.color_light[vb_slice]
+        if len(vertex_buffer.color_sun):
+            visual.sun = vertex_buffer.color_sun[vb_slice]
     else:
         bpy_mesh = None
         geometry_key = None
@@ -514,7 +523,7 @@ def import_vcontainer(data):
 
 def read_indices(packed_reader):
     indices_count = packed_reader.getf('<I')[0]
-    indices_buffer = packed_reader.getf('<{0}H'.format(indices_count))
+    indices_buffer = packed_reader.get_array('H', indices_count)
     return indices_buffer, indices_count
 
 
@@ -526,12 +535,7 @@ def import_indices(chunks, ogf_chunks, visual):
 
 def read_indices_v3(data, visual):
     packed_reader = xray_io.PackedReader(data)
-    indices_count = packed_reader.getf('<I')[0]
-    visual.indices_count = indices_count
-    visual.indices = [
-        packed_reader.getf('<H')[0]
-        for index in range(indices_count)
-    ]
+    visual.indices, visual.indices_count = read_indices(packed_reader)
 
 
 def read_vertices_v3(data, visual, lvl):
@@ -872,13 +876,9 @@ def import_geometry(chunks, visual, lvl):
 
 
 def convert_indices_to_triangles(visual):
-    visual.triangles = []
-    for index in range(0, visual.indices_count, 3):
-        visual.triangles.append((
-            visual.indices[index],
-            visual.indices[index + 2],
-            visual.indices[index + 1]
-        ))
+    indices = numpy.asarray(visual.indices[ : visual.indices_count])
+    # triangles with the reversed winding order
+    visual.triangles = indices.reshape(-1, 3)[:, (0, 2, 1)]
     del visual.indices
     del visual.indices_count
 
@@ -1866,11 +1866,13 @@ def import_visual(context, data, visual):
 def import_file(context, file_path, file_name):
     log.update(file=file_path)
     ie_utils.check_file_exists(file_path)
-    data = utils.read_file(file_path)
-    visual = Visual()
-    visual.file_path = file_path
-    visual.visual_id = 0
-    visual.name = file_name
-    visual.is_root = True
-    visual.bpy_materials = {}
-    import_visual(context, data, visual)
+    with utils.read_file(file_path, use_mmap=True) as data:
+        visual = Visual()
+        visual.file_path = file_path
+        visual.visual_id = 0
+        visual.name = file_name
+        visual.is_root = True
+        visual.bpy_materials = {}
+        import_visual(context, data, visual)
+        # the visual keeps the views of the file data
+        del visual
@@ -32,6 +32,7 @@ class ExportOgfContext(
     ):
     def __init__(self):
         super().__init__()
+        self.progressive_meshes = False
 
 
 op_text = 'Game Object'
@@ -114,7 +115,10 @@ export_props = {
         options={'HIDDEN'}
     ),
     'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath(),
-    'export_motions': ie_props.PropObjectMotionsExport()
+    'export_motions': ie_props.PropObjectMotionsExport(),
+    'compress_chunks': ie_props.prop_compress_chunks(),
+    'optimize_vertex_cache': ie_props.prop_optimize_vertex_cache(),
+    'progressive_meshes': ie_props.prop_progressive_meshes()
 }
 
 
@@ -142,6 +146,10 @@ class XRAY_OT_export_ogf_file(
         export_context = ExportOgfContext()
         export_context.texname_from_path = self.texture_name_from_image_path
         export_context.export_motions = self.export_motions
+        export_context.compress_chunks = self.compress_chunks
+        export_context.optimize_vertex_cache = self.optimize_vertex_cache
+        export_context.progressive_meshes = self.progressive_meshes
+        export_context.operator = self
         try:
             exp.export_file(self.exported_object, self.filepath, export_context)
         except utils.AppError as err:
@@ -157,6 +165,7 @@ class XRAY_OT_export_ogf_file(
         preferences = version_utils.get_preferences()
         self.texture_name_from_image_path = preferences.ogf_texture_names_from_path
         self.export_motions = preferences.ogf_export_motions
+        self.compress_chunks = preferences.ogf_compress_chunks
         self.filepath = context.object.name
         objs = context.selected_objects
         self.selected_objects = context.selected_objects
@@ -177,7 +186,10 @@ batch_export_props = {
         options={'HIDDEN'}
     ),
     'texture_name_from_image_path': ie_props.PropObjectTextureNamesFromPath(),
-    'export_motions': ie_props.PropObjectMotionsExport()
+    'export_motions': ie_props.PropObjectMotionsExport(),
+    'compress_chunks': ie_props.prop_compress_chunks(),
+    'optimize_vertex_cache': ie_props.prop_optimize_vertex_cache(),
+    'progressive_meshes': ie_props.prop_progressive_meshes()
 }
 
 
@@ -201,6 +213,10 @@ class XRAY_OT_export_ogf(ie_props.BaseOperator):
         export_context = ExportOgfContext()
         export_context.texname_from_path = self.texture_name_from_image_path
         export_context.export_motions = self.export_motions
+        export_context.compress_chunks = self.compress_chunks
+        export_context.optimize_vertex_cache = self.optimize_vertex_cache
+        export_context.progressive_meshes = self.progressive_meshes
+        export_context.operator = self
         for obj in self.roots:
             file_name = obj.name
             if not file_name.endswith(filename_ext):
@@ -218,6 +234,7 @@ class XRAY_OT_export_ogf(ie_props.BaseOperator):
         preferences = version_utils.get_preferences()
         self.texture_name_from_image_path = preferences.ogf_texture_names_from_path
         self.export_motions = preferences.ogf_export_motions
+        self.compress_chunks = preferences.ogf_compress_chunks
         self.selected_objects = context.selected_objects
         self.roots = [obj for obj in self.selected_objects if obj.xray.isroot]
         if not self.roots:
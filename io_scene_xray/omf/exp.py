@@ -165,9 +165,8 @@ def get_motions(context):
             else:
                 motion_crc32 = packed_reader.getf('<I')[0]
                 packed_writer.putf('<I', motion_crc32)
-                for key_index in range(length):
-                    quaternion = packed_reader.getf('<4h')
-                    packed_writer.putf('<4h', *quaternion)
+                quaternions = packed_reader.get_records('4h', length)
+                packed_writer.put_records(quaternions)
             if t_present:
                 motion_crc32 = packed_reader.getf('<I')[0]
                 packed_writer.putf('<I', motion_crc32)
@@ -175,9 +174,11 @@ def get_motions(context):
                     translate_format = '3h'
                 else:
                     translate_format = '3b'
-                for key_index in range(length):
-                    translate = packed_reader.getf('<' + translate_format)
-                    packed_writer.putf(translate_format, *translate)
+                translations = packed_reader.get_records(
+                    translate_format,
+                    length
+                )
+                packed_writer.put_records(translations)
                 t_size = packed_reader.getf('<3f')
                 packed_writer.putf('<3f', *t_size)
                 t_init = packed_reader.getf('<3f')
@@ -405,41 +406,33 @@ def export_omf(context):
                 flags |= fmt.FL_T_KEY_PRESENT
             if len(set(quaternions)) != 1:
                 packed_writer.putf('<B', flags)
-                crc32_temp = 0x0    # temp value
-                crc32_offset = len(packed_writer.data)
-                packed_writer.putf('<I', crc32_temp)
-                for y, z, q, x in quaternions:
-                    packed_writer.putf('<4h', y, z, q, x)
+                crc32_offset = packed_writer.reserve(4)
+                packed_writer.put_many('<4h', quaternions)
                 # crc32
                 crc32_data_start = crc32_offset + 4
                 crc32_data_end = len(packed_writer.data)
                 crc32_value = zlib.crc32(
                     packed_writer.data[crc32_data_start : crc32_data_end]
                 )
-                crc32_packed = struct.pack('<I', crc32_value)
-                packed_writer.replace(crc32_offset, crc32_packed)
+                packed_writer.pack_into('<I', crc32_offset, crc32_value)
             else:
                 flags |= fmt.FL_R_KEY_ABSENT
                 packed_writer.putf('<B', flags)
                 packed_writer.putf('<4h', *quaternions[0])
             if flags & fmt.FL_T_KEY_PRESENT:
-                crc32_temp = 0x0    # temp value
-                crc32_offset = len(packed_writer.data)
-                packed_writer.putf('<I', crc32_temp)
+                crc32_offset = packed_writer.reserve(4)
                 if flags & fmt.KPF_T_HQ:
                     trn_fmt = 'h'
                 else:
                     trn_fmt = 'b'
-                for translate in translations:
-                    packed_writer.putf('<3' + trn_fmt, *translate)
+                packed_writer.put_many('<3' + trn_fmt, translations)
                 # crc32
                 crc32_data_start = crc32_offset + 4
                 crc32_data_end = len(packed_writer.data)
                 crc32_value = zlib.crc32(
                     packed_writer.data[crc32_data_start : crc32_data_end]
                 )
-                crc32_packed = struct.pack('<I', crc32_value)
-                packed_writer.replace(crc32_offset, crc32_packed)
+                packed_writer.pack_into('<I', crc32_offset, crc32_value)
                 # size, init
                 packed_writer.putf('<3f', *tr_size)
                 packed_writer.putf('<3f', *tr_init)
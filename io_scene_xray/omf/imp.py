@@ -30,42 +30,42 @@ def motion_mark(packed_reader):
 
 def examine_motions(data):
     motion_names = []
-    chunked_reader = xray_io.ChunkedReader(data)
-    for chunk_id, chunk_data in chunked_reader:
-        if chunk_id == fmt.Chunks.S_SMPARAMS:
-            packed_reader = xray_io.PackedReader(chunk_data)
-            params_version = packed_reader.getf('<H')[0]
-            partition_count = packed_reader.getf('<H')[0]
-            for partition_index in range(partition_count):
-                partition_name = packed_reader.gets()
-                bone_count = packed_reader.getf('<H')[0]
-                for bone in range(bone_count):
-                    if params_version == 1:
-                        bone_id = packed_reader.getf('<I')[0]
-                        bone_name = None
-                    elif params_version == 2:
-                        bone_id = None
-                        bone_name = packed_reader.gets()
-                    elif params_version in (3, 4):
-                        bone_name = packed_reader.gets()
-                        bone_id = packed_reader.getf('<I')[0]
-                    else:
-                        raise BaseException('Unknown params version')
-            motion_count = packed_reader.getf('<H')[0]
-            for motion_index in range(motion_count):
-                name = packed_reader.gets()
-                motion_names.append(name)
-                flags = packed_reader.getf('<I')[0]
-                bone_or_part = packed_reader.getf('<H')[0]
-                motion = packed_reader.getf('<H')[0]
-                speed = packed_reader.getf('<f')[0]
-                power = packed_reader.getf('<f')[0]
-                accrue = packed_reader.getf('<f')[0]
-                falloff = packed_reader.getf('<f')[0]
-                if params_version == 4:
-                    num_marks = packed_reader.getf('<I')[0]
-                    for mark_index in range(num_marks):
-                        motion_mark(packed_reader)
+    # only the params chunk is read, motions are not sliced
+    chunk_data = xray_io.ChunkIndex(data).get(fmt.Chunks.S_SMPARAMS)
+    if chunk_data is not None:
+        packed_reader = xray_io.PackedReader(chunk_data)
+        params_version = packed_reader.getf('<H')[0]
+        partition_count = packed_reader.getf('<H')[0]
+        for partition_index in range(partition_count):
+            partition_name = packed_reader.gets()
+            bone_count = packed_reader.getf('<H')[0]
+            for bone in range(bone_count):
+                if params_version == 1:
+                    bone_id = packed_reader.getf('<I')[0]
+                    bone_name = None
+                elif params_version == 2:
+                    bone_id = None
+                    bone_name = packed_reader.gets()
+                elif params_version in (3, 4):
+                    bone_name = packed_reader.gets()
+                    bone_id = packed_reader.getf('<I')[0]
+                else:
+                    raise BaseException('Unknown params version')
+        motion_count = packed_reader.getf('<H')[0]
+        for motion_index in range(motion_count):
+            name = packed_reader.gets()
+            motion_names.append(name)
+            flags = packed_reader.getf('<I')[0]
+            bone_or_part = packed_reader.getf('<H')[0]
+            motion = packed_reader.getf('<H')[0]
+            speed = packed_reader.getf('<f')[0]
+            power = packed_reader.getf('<f')[0]
+            accrue = packed_reader.getf('<f')[0]
+            falloff = packed_reader.getf('<f')[0]
+            if params_version == 4:
+                num_marks = packed_reader.getf('<I')[0]
+                for mark_index in range(num_marks):
+                    motion_mark(packed_reader)
     return motion_names
 
 
@@ -173,8 +173,11 @@ def read_motion(data, context, motions_params, bone_names):
                 bone_rotations.append(euler)
             else:
                 motion_crc32 = packed_reader.getf('<I')[0]
-                for key_index in range(length):
-                    quaternion = packed_reader.getf('<4h')
+                quaternions = packed_reader.get_records(
+                    xray_io.RECORD_QUATERNION_16,
+                    length
+                )
+                for quaternion in quaternions['quat'].tolist():
                     euler = convert_to_euler(quaternion)
                     bone_rotations.append(euler)
 
@@ -187,9 +190,10 @@ def read_motion(data, context, motions_params, bone_names):
                     translate_format = '3h'
                 else:
                     translate_format = '3b'
-                for key_index in range(length):
-                    translate = packed_reader.getf('<' + translate_format)
-                    translations.append(translate)
+                translations = packed_reader.get_records(
+                    translate_format,
+                    length
+                ).tolist()
                 t_size = packed_reader.getf('<3f')
                 t_init = packed_reader.getf('<3f')
                 for translate in translations:
@@ -359,28 +363,25 @@ def read_main(data, context):
         raise utils.AppError(text.error.omf_nothing)
         return
 
-    chunked_reader = xray_io.ChunkedReader(data)
-    chunks = {}
-
-    for chunk_id, chunk_data in chunked_reader:
-        chunks[chunk_id] = chunk_data
+    chunks = xray_io.ChunkIndex(data)
 
-    params_chunk_data = chunks.pop(fmt.Chunks.S_SMPARAMS)
+    params_chunk_data = chunks[fmt.Chunks.S_SMPARAMS]
     motions_params, bone_names = read_params(params_chunk_data, context)
     del params_chunk_data
 
     if context.import_motions:
-        motions_chunk_data = chunks.pop(fmt.Chunks.S_MOTIONS)
+        motions_chunk_data = chunks[fmt.Chunks.S_MOTIONS]
         read_motions(motions_chunk_data, context, motions_params, bone_names)
         del motions_chunk_data
 
-    for chunk_id, chunk_data in chunks.items():
-        print('Unknown OMF chunk: 0x{:x}'.format(chunk_id))
+    for chunk_id in chunks.keys():
+        if chunk_id not in (fmt.Chunks.S_SMPARAMS, fmt.Chunks.S_MOTIONS):
+            print('Unknown OMF chunk: 0x{:x}'.format(chunk_id))
 
 
 @log.with_context(name='import-omf')
 def import_file(context):
     log.update(file=context.filepath)
     ie_utils.check_file_exists(context.filepath)
-    file_data = utils.read_file(context.filepath)
-    read_main(file_data, context)
+    with utils.read_file(context.filepath, use_mmap=True) as file_data:
+        read_main(file_data, context)
@@ -196,8 +196,8 @@ class XRAY_OT_import_omf(
             if file_path.lower().endswith('.omf'):
                 if os.path.exists(file_path):
                     if self.__parsed_file_name != file_path:
-                        file_data = utils.read_file(file_path)
-                        motions_names = imp.examine_motions(file_data)
+                        with utils.read_file(file_path, use_mmap=True) as file_data:
+                            motions_names = imp.examine_motions(file_data)
                         items.clear()
                         for name in motions_names:
                             items.add().name = name
@@ -439,6 +439,39 @@ plugin_preferences_props = {
     'compact_menus': bpy.props.BoolProperty(
         name='Compact Import/Export Menus', update=update_menu_func
     ),
+    'mmap_threshold': bpy.props.IntProperty(
+        name='Memory-Mapped Reading Threshold (MB)',
+        description='Level, OGF, OMF and SKLS files larger than this size ' \
+        + 'are memory-mapped instead of being loaded into memory',
+        default=64,
+        min=0
+    ),
+    'level_import_workers': bpy.props.IntProperty(
+        name='Level Import Threads',
+        description='Number of threads that decode level geometry ' \
+        + 'and collision data (0 - number of processors)',
+        default=0,
+        min=0
+    ),
+    'level_export_workers': bpy.props.IntProperty(
+        name='Level Export Threads',
+        description='Number of threads that encode the vertices ' \
+        + 'of level visuals (0 - number of processors, 1 - no threads). ' \
+        + 'Vertex cache optimization and progressive meshes ' \
+        + 'are not accelerated by the threads',
+        default=0,
+        min=0
+    ),
+    'level_profile_report': bpy.props.BoolProperty(
+        name='Write Level Profiling Report',
+        description='Save the time of the level import and export stages ' \
+        + 'to the JSON file next to the level file'
+    ),
+    'level_profile_memory': bpy.props.BoolProperty(
+        name='Trace Level Memory',
+        description='Measure the memory peak of the level import and ' \
+        + 'export stages with tracemalloc (slows down the operation)'
+    ),
 
     # defaults
     'defaults_category': bpy.props.EnumProperty(
@@ -455,6 +488,7 @@ plugin_preferences_props = {
     'object_motions_export': ie_props.PropObjectMotionsExport(),
     'object_texture_names_from_path': ie_props.PropObjectTextureNamesFromPath(),
     'export_object_use_export_paths': ie_props.PropUseExportPaths(),
+    'object_compress_chunks': ie_props.prop_compress_chunks(),
     # anm import props
     'anm_create_camera': ie_props.PropAnmCameraAnimation(),
     # anm export props
@@ -481,6 +515,7 @@ plugin_preferences_props = {
     # ogf export props
     'ogf_texture_names_from_path': ie_props.PropObjectTextureNamesFromPath(),
     'ogf_export_motions': ie_props.PropObjectMotionsExport(),
+    'ogf_compress_chunks': ie_props.prop_compress_chunks(),
     # omf import props
     'omf_import_motions': ie_props.PropObjectMotionsImport(),
     'import_bone_parts': ie_props.prop_import_bone_parts(),
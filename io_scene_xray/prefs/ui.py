@@ -111,6 +111,7 @@ def draw_defaults(prefs):
         box.prop(prefs, 'object_motions_export')
         box.prop(prefs, 'object_texture_names_from_path')
         box.prop(prefs, 'export_object_use_export_paths')
+        box.prop(prefs, 'object_compress_chunks')
     elif prefs.defaults_category == 'ANM':
         # import
         box = layout.box()
@@ -161,6 +162,7 @@ def draw_defaults(prefs):
         box.label(text='Export:')
         box.prop(prefs, 'ogf_texture_names_from_path')
         box.prop(prefs, 'ogf_export_motions')
+        box.prop(prefs, 'ogf_compress_chunks')
     elif prefs.defaults_category == 'OMF':
         box = layout.box()
         # import
@@ -339,6 +341,11 @@ def draw_others(prefs):
     split.label(text='Custom Owner Name:')
     split.prop(prefs, 'custom_owner_name', text='')
     prop_bool(layout, prefs, 'compact_menus')
+    layout.prop(prefs, 'mmap_threshold')
+    layout.prop(prefs, 'level_import_workers')
+    layout.prop(prefs, 'level_export_workers')
+    prop_bool(layout, prefs, 'level_profile_report')
+    prop_bool(layout, prefs, 'level_profile_memory')
     box = layout.box()
     box.label(text='Bone Shape Colors:')
     row = box.row()
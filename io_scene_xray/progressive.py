@@ -0,0 +1,361 @@
+# standart modules
+import heapq
+
+# blender modules
+import numpy
+
+
+# Half-edge collapse progressive meshes. Only the initial quadrics are
+# computed with numpy, the collapses and their checks are pure python,
+# so generation takes about 5 seconds per 44k triangles. The index buffer
+# stores the triangles of every slide window, it grows about 2.7 times
+# with the default ratios.
+
+# triangles ratio of the lowest detail level
+MIN_TRIANGLES_RATIO = 0.25
+# triangles ratio of the next slide window
+WINDOW_TRIANGLES_RATIO = 0.8
+# minimum cosine between face normals before and after collapse
+MIN_NORMAL_COS = 0.2
+# slide window stores the counts in 16 bit integers
+MAX_COUNT = 0xffff
+
+
+def get_vertex_quadrics(vertices, triangles):
+    # area weighted plane quadrics as 10 coefficients of
+    # the symmetric matrix: aa ab ac ad bb bc bd cc cd dd
+    coords = vertices[triangles]
+    normals = numpy.cross(
+        coords[:, 1] - coords[:, 0],
+        coords[:, 2] - coords[:, 0]
+    )
+    lengths = numpy.sqrt((normals * normals).sum(axis=1))
+    nonzero = lengths > 0.0
+    normals[nonzero] /= lengths[nonzero][:, None]
+    normals[~nonzero] = 0.0
+    distances = -(normals * coords[:, 0]).sum(axis=1)
+    planes = numpy.column_stack((normals, distances))
+    rows, columns = numpy.triu_indices(4)
+    face_quadrics = planes[:, rows] * planes[:, columns] * (lengths / 2)[:, None]
+    quadrics = numpy.zeros((len(vertices), 10))
+    for corner in range(3):
+        numpy.add.at(quadrics, triangles[:, corner], face_quadrics)
+    return quadrics
+
+
+def get_edges(triangles):
+    # unique edges and the number of the faces of every edge
+    edges = numpy.concatenate((
+        triangles[:, (0, 1)],
+        triangles[:, (1, 2)],
+        triangles[:, (2, 0)]
+    ))
+    edges.sort(axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    # the edges are grouped by the 1-D keys, unique with
+    # the axis argument is not supported by the old numpy
+    base = int(edges.max()) + 1 if len(edges) else 1
+    keys = edges[:, 0].astype(numpy.int64) * base + edges[:, 1]
+    unique_keys, faces_counts = numpy.unique(keys, return_counts=True)
+    unique_edges = numpy.column_stack((unique_keys // base, unique_keys % base))
+    return unique_edges.astype(edges.dtype), faces_counts
+
+
+def get_locked_vertices(triangles, vertices_count):
+    # vertices of the border and non-manifold edges are not moved,
+    # this keeps the uv seams and the joints with other meshes
+    edges, faces_counts = get_edges(triangles)
+    locked = numpy.zeros(vertices_count, dtype=bool)
+    locked[edges[faces_counts != 2].ravel()] = True
+    return locked, edges
+
+
+def get_quadric_error(quadric, coord):
+    x, y, z = coord
+    return (
+        quadric[0] * x * x + 2 * quadric[1] * x * y +
+        2 * quadric[2] * x * z + 2 * quadric[3] * x +
+        quadric[4] * y * y + 2 * quadric[5] * y * z + 2 * quadric[6] * y +
+        quadric[7] * z * z + 2 * quadric[8] * z +
+        quadric[9]
+    )
+
+
+def get_normal(coord_1, coord_2, coord_3):
+    edge_1 = (
+        coord_2[0] - coord_1[0],
+        coord_2[1] - coord_1[1],
+        coord_2[2] - coord_1[2]
+    )
+    edge_2 = (
+        coord_3[0] - coord_1[0],
+        coord_3[1] - coord_1[1],
+        coord_3[2] - coord_1[2]
+    )
+    return (
+        edge_1[1] * edge_2[2] - edge_1[2] * edge_2[1],
+        edge_1[2] * edge_2[0] - edge_1[0] * edge_2[2],
+        edge_1[0] * edge_2[1] - edge_1[1] * edge_2[0]
+    )
+
+
+class Simplifier(object):
+    # quadric error metric half-edge collapses, vertices are not moved,
+    # so all detail levels share the same vertex buffer
+    def __init__(self, vertices, triangles):
+        self.vertices_count = len(vertices)
+        self.coords = vertices.tolist()
+        self.quadrics = get_vertex_quadrics(vertices, triangles).tolist()
+        locked, edges = get_locked_vertices(triangles, self.vertices_count)
+        self.locked = locked.tolist()
+        self.faces = triangles.tolist()
+        self.alive = [True] * len(self.faces)
+        self.triangles_count = len(self.faces)
+        self.vertex_faces = [set() for _ in range(self.vertices_count)]
+        for face_index, face in enumerate(self.faces):
+            for vertex in face:
+                self.vertex_faces[vertex].add(face_index)
+        self.removed = [False] * self.vertices_count
+        self.stamps = [0] * self.vertices_count
+        self.heap = []
+        for vertex_1, vertex_2 in edges.tolist():
+            for vertex, target in ((vertex_1, vertex_2), (vertex_2, vertex_1)):
+                entry = self.get_entry(vertex, target)
+                if entry:
+                    self.heap.append(entry)
+        heapq.heapify(self.heap)
+
+    def get_cost(self, vertex, target):
+        quadric = [
+            value_1 + value_2
+            for value_1, value_2 in zip(
+                self.quadrics[vertex],
+                self.quadrics[target]
+            )
+        ]
+        return get_quadric_error(quadric, self.coords[target])
+
+    def get_entry(self, vertex, target):
+        # heap entry of the vertex to target collapse, the stamps
+        # invalidate the entry when the quadrics are changed
+        if self.locked[vertex]:
+            return None
+        return (
+            self.get_cost(vertex, target),
+            vertex,
+            target,
+            self.stamps[vertex],
+            self.stamps[target]
+        )
+
+    def get_neighbours(self, vertex):
+        neighbours = set()
+        for face_index in self.vertex_faces[vertex]:
+            neighbours.update(self.faces[face_index])
+        neighbours.discard(vertex)
+        return neighbours
+
+    def is_valid_collapse(self, vertex, target):
+        # link condition keeps the mesh manifold
+        opposite = set()
+        for face_index in self.vertex_faces[vertex]:
+            face = self.faces[face_index]
+            if target in face:
+                opposite.update(face)
+        if not opposite:
+            return False
+        common = self.get_neighbours(vertex) & self.get_neighbours(target)
+        if common - opposite:
+            return False
+
+        # faces must not flip
+        coords = self.coords
+        for face_index in self.vertex_faces[vertex]:
+            face = self.faces[face_index]
+            if target in face:
+                continue
+            old_coords = [coords[face_vertex] for face_vertex in face]
+            new_coords = [
+                coords[target] if face_vertex == vertex else coords[face_vertex]
+                for face_vertex in face
+            ]
+            old_normal = get_normal(*old_coords)
+            new_normal = get_normal(*new_coords)
+            dot = sum(a * b for a, b in zip(old_normal, new_normal))
+            old_length = sum(a * a for a in old_normal) ** 0.5
+            new_length = sum(a * a for a in new_normal) ** 0.5
+            if not new_length:
+                return False
+            if dot < MIN_NORMAL_COS * old_length * new_length:
+                return False
+        return True
+
+    def collapse(self, vertex, target):
+        faces = self.faces
+        for face_index in self.vertex_faces[vertex]:
+            face = faces[face_index]
+            if target in face:
+                # the face degenerates
+                self.alive[face_index] = False
+                self.triangles_count -= 1
+                for face_vertex in face:
+                    if face_vertex != vertex:
+                        self.vertex_faces[face_vertex].discard(face_index)
+            else:
+                faces[face_index] = [
+                    target if face_vertex == vertex else face_vertex
+                    for face_vertex in face
+                ]
+                self.vertex_faces[target].add(face_index)
+        self.vertex_faces[vertex] = set()
+        self.removed[vertex] = True
+        self.quadrics[target] = [
+            value_1 + value_2
+            for value_1, value_2 in zip(
+                self.quadrics[vertex],
+                self.quadrics[target]
+            )
+        ]
+        self.stamps[target] += 1
+        for neighbour in self.get_neighbours(target):
+            for edge in ((neighbour, target), (target, neighbour)):
+                entry = self.get_entry(*edge)
+                if entry:
+                    heapq.heappush(self.heap, entry)
+
+    def next_collapse(self):
+        # returns the collapsed vertex or None
+        while self.heap:
+            _, vertex, target, vertex_stamp, target_stamp = heapq.heappop(self.heap)
+            if self.removed[vertex] or self.removed[target]:
+                continue
+            if self.stamps[vertex] != vertex_stamp:
+                continue
+            if self.stamps[target] != target_stamp:
+                continue
+            if not self.is_valid_collapse(vertex, target):
+                continue
+            self.collapse(vertex, target)
+            return vertex
+        return None
+
+
+def get_lods(vertices, triangles, min_triangles):
+    # returns the removed vertices and the detail levels as
+    # (faces, alive faces mask, removed vertices count) tuples
+    simplifier = Simplifier(vertices, triangles)
+    lods = [(triangles.copy(), numpy.ones(len(triangles), dtype=bool), 0)]
+    removed_vertices = []
+    window_triangles = simplifier.triangles_count * WINDOW_TRIANGLES_RATIO
+    while simplifier.triangles_count > min_triangles:
+        vertex = simplifier.next_collapse()
+        if vertex is None:
+            break
+        removed_vertices.append(vertex)
+        if simplifier.triangles_count <= window_triangles:
+            lods.append((
+                numpy.array(simplifier.faces),
+                numpy.array(simplifier.alive),
+                len(removed_vertices)
+            ))
+            window_triangles = simplifier.triangles_count * WINDOW_TRIANGLES_RATIO
+    if lods[-1][2] != len(removed_vertices):
+        lods.append((
+            numpy.array(simplifier.faces),
+            numpy.array(simplifier.alive),
+            len(removed_vertices)
+        ))
+    return removed_vertices, lods
+
+
+def get_faces_events(lods):
+    # a face gets a new instance in the index buffer when it
+    # appears or changes, returns the lod index of the next event
+    # (change or removal) of the every face instance
+    lods_count = len(lods)
+    faces_count = len(lods[0][0])
+    events = numpy.zeros((lods_count + 1, faces_count), dtype=bool)
+    events[0] = True
+    for lod_index in range(1, lods_count):
+        faces, alive, _ = lods[lod_index]
+        prev_faces, prev_alive, _ = lods[lod_index - 1]
+        changed = (faces != prev_faces).any(axis=1)
+        events[lod_index] = (alive != prev_alive) | (alive & changed)
+    events[lods_count] = True
+    next_events = numpy.empty(events.shape, dtype=numpy.int64)
+    next_events[lods_count] = lods_count
+    for lod_index in range(lods_count - 1, -1, -1):
+        next_events[lod_index] = numpy.where(
+            events[lod_index + 1],
+            lod_index + 1,
+            next_events[lod_index + 1]
+        )
+    return events, next_events
+
+
+def get_slide_windows(lods, remap, vertices_count):
+    # the index buffer is built so that every detail level is a
+    # contiguous window of it, the instances leave a window from
+    # the start and the new instances are appended to the end
+    events, next_events = get_faces_events(lods)
+    indices = []
+    windows = []
+    window = []    # (death lod, triangle) of the current window
+    for lod_index, (faces, alive, removed_count) in enumerate(lods):
+        born = numpy.flatnonzero(events[lod_index] & alive)
+        deaths = next_events[lod_index, born]
+        new_instances = list(zip(deaths.tolist(), remap[faces[born]].tolist()))
+
+        # instances up to the last dead one leave the window
+        last_dead = -1
+        for position, (death, _) in enumerate(window):
+            if death <= lod_index:
+                last_dead = position
+        carried = [
+            instance
+            for instance in window[ : last_dead + 1]
+            if instance[0] > lod_index
+        ]
+        window = window[last_dead + 1 : ]
+        appended = sorted(carried + new_instances, key=lambda instance: instance[0])
+        window.extend(appended)
+        for _, triangle in appended:
+            indices.extend(triangle)
+        triangles_count = len(window)
+        offset = len(indices) - triangles_count * 3
+        windows.append((
+            offset,
+            triangles_count,
+            vertices_count - removed_count
+        ))
+    return numpy.array(indices, dtype=numpy.int64), windows
+
+
+def generate(vertices, triangles, min_ratio=MIN_TRIANGLES_RATIO):
+    # returns old vertex indices in the new order, the index buffer
+    # and the slide windows (offset, triangles count, vertices count)
+    # or None, if mesh is too large for the slide window counts
+    vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 3)
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    vertices_count = len(vertices)
+    if not len(triangles):
+        return None
+    if len(triangles) > MAX_COUNT or vertices_count > MAX_COUNT:
+        return None
+
+    min_triangles = int(len(triangles) * min_ratio)
+    removed_vertices, lods = get_lods(vertices, triangles, min_triangles)
+
+    # removed vertices are moved to the end in the reverse removal order,
+    # so the every window uses the first vertices of the buffer
+    kept = numpy.ones(vertices_count, dtype=bool)
+    kept[removed_vertices] = False
+    vertices_order = numpy.concatenate((
+        numpy.flatnonzero(kept),
+        numpy.array(removed_vertices[::-1], dtype=numpy.int64)
+    ))
+    remap = numpy.empty(vertices_count, dtype=numpy.int64)
+    remap[vertices_order] = numpy.arange(vertices_count)
+
+    indices, windows = get_slide_windows(lods, remap, vertices_count)
+    return vertices_order, indices, windows
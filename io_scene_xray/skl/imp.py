@@ -52,6 +52,7 @@ def import_skl_file(file_path, context):
 def import_skls_file(file_path, context):
     log.update(file=file_path)
     ie_utils.check_file_exists(file_path)
-    file_data = utils.read_file(file_path)
-    reader = xray_io.PackedReader(file_data)
-    xray_motions.import_motions(reader, context, context.motions_filter)
+    with utils.read_file(file_path, use_mmap=True) as file_data:
+        reader = xray_io.PackedReader(file_data)
+        xray_motions.import_motions(reader, context, context.motions_filter)
+        del reader
@@ -119,8 +119,8 @@ class XRAY_OT_import_skls(ie_props.BaseOperator, bpy_extras.io_utils.ImportHelpe
     def _examine_file(file_path):
         if file_path.lower().endswith('.skls'):
             if os.path.exists(file_path):
-                file_data = utils.read_file(file_path)
-                return xray_motions.examine_motions(file_data)
+                with utils.read_file(file_path, use_mmap=True) as file_data:
+                    return tuple(xray_motions.examine_motions(file_data))
         return tuple()
 
     @utils.execute_with_logger
@@ -92,36 +92,41 @@ class XRAY_OT_browse_skls_file(bpy.types.Operator):
         '''
         Used to read animations from .skls file.
         Because .skls file can has big size and reading may take long time, so the animations
-        cached by byte offset in file.
-        Holds entire .skls file in memory as binary blob.
+        cached as the copies of their bytes.
+        The file itself is closed after indexing.
         '''
-        __slots__ = 'pr', 'file_path', 'animations'
+        __slots__ = 'file_path', 'animations'
 
         def __init__(self, file_path):
             self.file_path = file_path
-            # cached animations info (name: (file_offset, frames_count))
+            # cached animations info (name: (animation_data, frames_count))
             self.animations = {}
-            # read entire .skls file into memory
-            file_data = utils.read_file(file_path)
-            self.pr = xray_io.PackedReader(file_data)
-            self._index_animations()
+            with utils.read_file(file_path, use_mmap=True) as file_data:
+                self._index_animations(xray_io.PackedReader(file_data))
 
-        def _index_animations(self):
+        def _index_animations(self, pr):
             'Fills the cache (self.animations) by processing entire binary blob'
-            animations_count = self.pr.getf('I')[0]
+            animations_count = pr.getf('I')[0]
             for _ in range(animations_count):
                 # index animation
                 # first byte of the animation name
-                offset = self.pr.offset()
+                offset = pr.offset()
                 # animation name
-                name = self.pr.gets()
-                offset2 = self.pr.offset()
-                frames_range = self.pr.getf('II')
-                self.animations[name] = (offset, int(frames_range[1] - frames_range[0]))
+                name = pr.gets()
+                offset2 = pr.offset()
+                frames_range = pr.getf('II')
                 # skip the rest bytes of skl animation to the next animation
-                self.pr.set_offset(offset2)
-                skip = xray_motions.skip_motion_rest(self.pr.getv(), 0)
-                self.pr.skip(skip)
+                pr.set_offset(offset2)
+                skip = xray_motions.skip_motion_rest(pr.getv(), 0)
+                end = offset2 + skip
+                # the bytes of the animation are copied,
+                # so the file is not kept open
+                pr.set_offset(offset)
+                animation_data = bytes(pr.getb(end - offset))
+                self.animations[name] = (
+                    animation_data,
+                    int(frames_range[1] - frames_range[0])
+                )
 
     # pure python hold variable of .skls file buffer instance
     skls_file = None
@@ -182,7 +187,7 @@ def skls_animations_index_changed(self, context):
         # animation not imported yet
         context.window.cursor_set('WAIT')
         # import animation
-        XRAY_OT_browse_skls_file.skls_file.pr.set_offset(XRAY_OT_browse_skls_file.skls_file.animations[animation_name][0])
+        animation_data = XRAY_OT_browse_skls_file.skls_file.animations[animation_name][0]
         # used to bone's reference detection
         bonesmap = {bone.name.lower(): bone for bone in ob.data.bones}
         # bones names that has problems while import
@@ -191,7 +196,7 @@ def skls_animations_index_changed(self, context):
         import_context.bpy_arm_obj=ob
         import_context.motions_filter=xray_motions.MOTIONS_FILTER_ALL
         import_context.filename=XRAY_OT_browse_skls_file.skls_file.file_path
-        xray_motions.import_motion(XRAY_OT_browse_skls_file.skls_file.pr, import_context, bonesmap, reported)
+        xray_motions.import_motion(xray_io.PackedReader(animation_data), import_context, bonesmap, reported)
         sk.animations_prev_name = animation_name
         context.window.cursor_set('DEFAULT')
         # try to find DopeSheet editor & set action
@@ -71,6 +71,7 @@ translations_table = (
     (text.error.level_bad_glow, 'glow меш-объект не имеет полигонов'),
     (text.error.level_bad_glow_radius, 'glow объект имеет близкий к нулю радиус'),
     (text.error.level_lmap_no_dds, 'некорректный формат карты освещения (должен быть *.dds)'),
+    (text.error.level_many_verts, 'меш-объект визуала имеет слишком много вершин'),
     # level cform export
     (text.error.level_bad_glow_radius, 'glow объект имеет близкий к нулю радиус'),
     # level import
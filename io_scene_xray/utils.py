@@ -1,5 +1,6 @@
 # standart modules
 import os
+import mmap
 import math
 import time
 import platform
@@ -575,9 +576,106 @@ def save_file(file_path, writer):
         )
 
 
-def read_file(file_path):
+def get_temp_path(file_path):
+    return file_path + '.tmp'
+
+
+@contextlib.contextmanager
+def open_file_writer(file_path):
+    # chunks are written to the temporary file as they are put,
+    # so the whole file is not collected in memory, the existing
+    # file is replaced later by the replace_temp_files function
+    dir_path = os.path.dirname(file_path)
+    if not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+    temp_path = get_temp_path(file_path)
+    try:
+        file = open(temp_path, 'wb')
+    except PermissionError:
+        raise AppError(
+            text.error.file_another_prog,
+            log.props(file=os.path.basename(temp_path), path=temp_path)
+        )
+    try:
+        with file:
+            yield xray_io.FileChunkedWriter(file)
+    except Exception:
+        # do not leave the partially written file
+        os.remove(temp_path)
+        raise
+
+
+def replace_temp_files(file_paths):
+    # the files written by open_file_writer replace the existing files
+    for file_path in file_paths:
+        try:
+            os.replace(get_temp_path(file_path), file_path)
+        except PermissionError:
+            raise AppError(
+                text.error.file_another_prog,
+                log.props(file=os.path.basename(file_path), path=file_path)
+            )
+
+
+def remove_temp_files(file_paths):
+    for file_path in file_paths:
+        temp_path = get_temp_path(file_path)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+MEGABYTE = 1024 * 1024
+
+
+class FileData(object):
+    # contents of the file read with use_mmap, the mapping is closed on
+    # exit from the with statement, so the parsed data must not keep
+    # the views of it after that
+    def __init__(self, data, mapping=None):
+        self.data = data
+        self._mapping = mapping
+
+    def __enter__(self):
+        return self.data
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._mapping is None:
+            return
+        try:
+            self.data.release()
+            self._mapping.close()
+        except BufferError:
+            # the views are still used (while the error is raised),
+            # the mapping is closed, when the last of them is released
+            pass
+        self.data = None
+        self._mapping = None
+
+
+def close_files(files):
+    for file_data in files:
+        file_data.close()
+
+
+def read_file(file_path, use_mmap=False):
+    # if use_mmap is True, FileData is returned, files larger than the
+    # threshold from the preferences are memory-mapped and read through
+    # a read-only memoryview, so chunks are sliced without copying
     try:
         with open(file_path, 'rb') as file:
+            if use_mmap:
+                preferences = version_utils.get_preferences()
+                threshold = preferences.mmap_threshold * MEGABYTE
+                file_size = os.fstat(file.fileno()).st_size
+                if file_size and file_size >= threshold:
+                    mapping = mmap.mmap(
+                        file.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+                    return FileData(memoryview(mapping), mapping)
+                return FileData(file.read())
             data = file.read()
         return data
     except FileNotFoundError:
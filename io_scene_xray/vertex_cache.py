@@ -0,0 +1,221 @@
+# blender modules
+import numpy
+
+
+# Tom Forsyth's linear-speed vertex cache optimisation
+CACHE_SIZE = 32    # size of the simulated lru cache
+CACHE_DECAY_POWER = 1.5
+LAST_TRIANGLE_SCORE = 0.75
+VALENCE_BOOST_SCALE = 2.0
+VALENCE_BOOST_POWER = 0.5
+
+# post-transform fifo cache of the old hardware, used for acmr
+FIFO_CACHE_SIZE = 16
+
+
+def get_cache_scores():
+    scores = []
+    for position in range(CACHE_SIZE):
+        if position < 3:
+            # vertices of the last triangle have a fixed score
+            scores.append(LAST_TRIANGLE_SCORE)
+        else:
+            scale = 1.0 / (CACHE_SIZE - 3)
+            score = 1.0 - (position - 3) * scale
+            scores.append(score ** CACHE_DECAY_POWER)
+    return scores
+
+
+def get_valence_scores(max_valence):
+    valences = numpy.arange(max_valence + 1, dtype=numpy.float64)
+    valences[0] = 1.0
+    scores = VALENCE_BOOST_SCALE * valences ** -VALENCE_BOOST_POWER
+    scores[0] = -1.0    # vertex without remaining triangles
+    return scores
+
+
+def get_vertices_triangles(triangles, vertices_count):
+    # vertex -> triangles adjacency in the compressed sparse row format
+    indices = triangles.ravel()
+    valences = numpy.bincount(indices, minlength=vertices_count)
+    offsets = numpy.zeros(vertices_count + 1, dtype=numpy.int64)
+    numpy.cumsum(valences, out=offsets[1 : ])
+    adjacency = numpy.argsort(indices, kind='mergesort') // 3
+    return valences, offsets, adjacency
+
+
+def optimize_triangles(triangles, vertices_count):
+    # returns the triangles reordered for the post-transform vertex cache
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    triangles_count = len(triangles)
+    if not triangles_count:
+        return triangles.copy()
+
+    valences, offsets, adjacency = get_vertices_triangles(
+        triangles, vertices_count
+    )
+    cache_scores = get_cache_scores()
+    valence_scores = get_valence_scores(int(valences.max()))
+    vertex_scores = valence_scores[valences]
+    triangle_scores = vertex_scores[triangles].sum(axis=1)
+    best_triangle = int(numpy.argmax(triangle_scores))
+
+    # the greedy search is sequential, the python lists are
+    # used in it, because numpy scalar access is slow
+    valence_scores = valence_scores.tolist()
+    vertex_scores = vertex_scores.tolist()
+    remaining = valences.tolist()
+    offsets = offsets.tolist()
+    adjacency = adjacency.tolist()
+    triangles_list = triangles.tolist()
+    positions = [-1] * vertices_count
+    added = bytearray(triangles_count)
+    order = []
+    cache = []
+    next_triangle = 0
+
+    for _ in range(triangles_count):
+        if best_triangle < 0:
+            # dead end, continue from the first not added triangle
+            while added[next_triangle]:
+                next_triangle += 1
+            best_triangle = next_triangle
+        triangle = best_triangle
+        added[triangle] = 1
+        order.append(triangle)
+        triangle_verts = []
+        for vertex in triangles_list[triangle]:
+            if vertex not in triangle_verts:
+                triangle_verts.append(vertex)
+
+        # remove the triangle from the remaining triangles of the vertices
+        for vertex in triangle_verts:
+            start = offsets[vertex]
+            end = start + remaining[vertex] - 1
+            index = adjacency.index(triangle, start, end + 1)
+            adjacency[index] = adjacency[end]
+            adjacency[end] = triangle
+            remaining[vertex] -= 1
+
+        # move the triangle vertices to the top of the cache
+        new_cache = triangle_verts + [
+            vertex
+            for vertex in cache
+            if vertex not in triangle_verts
+        ]
+        for position, vertex in enumerate(new_cache):
+            vertex_valence = remaining[vertex]
+            if position < CACHE_SIZE:
+                positions[vertex] = position
+                score = valence_scores[vertex_valence]
+                if vertex_valence:
+                    score += cache_scores[position]
+            else:
+                positions[vertex] = -1    # evicted vertex
+                score = valence_scores[vertex_valence]
+            vertex_scores[vertex] = score
+        cache = new_cache[ : CACHE_SIZE]
+
+        # rescore the remaining triangles of the changed vertices
+        best_triangle = -1
+        best_score = -1.0
+        for vertex in new_cache:
+            start = offsets[vertex]
+            for index in range(start, start + remaining[vertex]):
+                adjacent_triangle = adjacency[index]
+                vertex_1, vertex_2, vertex_3 = triangles_list[adjacent_triangle]
+                score = (
+                    vertex_scores[vertex_1] +
+                    vertex_scores[vertex_2] +
+                    vertex_scores[vertex_3]
+                )
+                if score > best_score:
+                    best_score = score
+                    best_triangle = adjacent_triangle
+
+    return triangles[order]
+
+
+def optimize_vertex_fetch(triangles, vertices_count):
+    # vertices are renumbered in the order of the first use,
+    # unused vertices are moved to the end
+    indices = triangles.ravel()
+    used_vertices, first_uses = numpy.unique(indices, return_index=True)
+    vertices_order = used_vertices[numpy.argsort(first_uses, kind='mergesort')]
+    unused = numpy.ones(vertices_count, dtype=bool)
+    unused[used_vertices] = False
+    vertices_order = numpy.concatenate((
+        vertices_order,
+        numpy.flatnonzero(unused)
+    ))
+    remap = numpy.empty(vertices_count, dtype=numpy.int64)
+    remap[vertices_order] = numpy.arange(vertices_count)
+    return remap[triangles], vertices_order
+
+
+def optimize(triangles, vertices_count):
+    # returns reordered triangles with new vertex indices and the
+    # old vertex indices in the new order
+    triangles = optimize_triangles(triangles, vertices_count)
+    return optimize_vertex_fetch(triangles, vertices_count)
+
+
+def get_cache_misses(triangles, cache_size=FIFO_CACHE_SIZE):
+    cache = [None] * cache_size
+    cached = set()
+    cache_index = 0
+    misses = 0
+    for vertex in numpy.asarray(triangles).ravel().tolist():
+        if vertex in cached:
+            continue
+        misses += 1
+        evicted = cache[cache_index]
+        if evicted is not None:
+            cached.discard(evicted)
+        cache[cache_index] = vertex
+        cached.add(vertex)
+        cache_index = (cache_index + 1) % cache_size
+    return misses
+
+
+class CacheStats(object):
+    # average cache miss ratio (transformed vertices per triangle)
+    def __init__(self):
+        self.triangles_count = 0
+        self.misses_before = 0
+        self.misses_after = 0
+
+    def add(self, triangles_count, misses_before, misses_after):
+        self.triangles_count += triangles_count
+        self.misses_before += misses_before
+        self.misses_after += misses_after
+
+    def get_acmr(self):
+        if not self.triangles_count:
+            return 0.0, 0.0
+        return (
+            self.misses_before / self.triangles_count,
+            self.misses_after / self.triangles_count
+        )
+
+
+def optimize_with_stats(triangles, vertices_count, stats):
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    misses_before = get_cache_misses(triangles)
+    optimized, vertices_order = optimize(triangles, vertices_count)
+    stats.add(len(triangles), misses_before, get_cache_misses(optimized))
+    return optimized, vertices_order
+
+
+def report(context, stats):
+    if not context.operator or not stats.triangles_count:
+        return
+    acmr_before, acmr_after = stats.get_acmr()
+    context.operator.report(
+        {'INFO'},
+        'Vertex cache ACMR: {0:.3f} -> {1:.3f} ({2} triangles)'.format(
+            acmr_before,
+            acmr_after,
+            stats.triangles_count
+        )
+    )
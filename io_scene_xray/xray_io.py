@@ -1,5 +1,7 @@
 # standart modules
+import re
 import struct
+import contextlib
 
 # blender modules
 import numpy
@@ -10,6 +12,68 @@ from . import lzhuf
 
 ENCODE_ERROR = BaseException
 
+# struct format character -> little-endian numpy type
+_RECORD_TYPES = {
+    'b': '<i1',
+    'B': '<u1',
+    'h': '<i2',
+    'H': '<u2',
+    'i': '<i4',
+    'I': '<u4',
+    'l': '<i4',
+    'L': '<u4',
+    'q': '<i8',
+    'Q': '<u8',
+    'e': '<f2',
+    'f': '<f4',
+    'd': '<f8',
+}
+_RECORD_TOKEN = re.compile(r'(\d*)([bBhHiIlLqQefd])')
+_records_dtypes = {}
+
+
+def records_dtype(fmt):
+    # convert struct format ("3I2H") to numpy structured dtype
+    # fields are named f0, f1, ... in the same order as struct.unpack values
+    dtype = _records_dtypes.get(fmt)
+    if dtype is not None:
+        return dtype
+    fields = []
+    pos = 0
+    fmt_chars = fmt.lstrip('<')
+    for match in _RECORD_TOKEN.finditer(fmt_chars):
+        if match.start() != pos:
+            break
+        pos = match.end()
+        repeat = int(match.group(1) or 1)
+        numpy_type = _RECORD_TYPES[match.group(2)]
+        for _ in range(repeat):
+            fields.append(('f{}'.format(len(fields)), numpy_type))
+    if pos != len(fmt_chars) or not fields:
+        raise Exception('Unsupported records format: {}'.format(fmt))
+    dtype = numpy.dtype(fields)
+    _records_dtypes[fmt] = dtype
+    return dtype
+
+
+# common x-ray records layouts
+RECORD_FACE_16 = numpy.dtype([('verts', '<u2', (3, ))])
+RECORD_FACE_32 = numpy.dtype([('verts', '<u4', (3, ))])
+RECORD_VERTEX_UV = numpy.dtype([('co', '<f4', (3, )), ('uv', '<f4', (2, ))])
+RECORD_CFORM_FACE_V4 = numpy.dtype([
+    ('verts', '<u4', (3, )),
+    ('material', '<u2'),
+    ('sector', '<u2')
+])
+RECORD_CFORM_FACE_V2 = numpy.dtype([
+    ('verts', '<u4', (3, )),
+    ('adjacent', '<u4', (3, )),
+    ('dummy', '<u2'),
+    ('sector', '<u2'),
+    ('material', '<u4')
+])
+RECORD_QUATERNION_16 = numpy.dtype([('quat', '<i2', (4, ))])
+
 
 class FastBytes:
     @staticmethod
@@ -37,14 +101,22 @@ class FastBytes:
     @staticmethod
     def str_at(data, offs):
         new_offs = FastBytes.skip_str_at(data, offs)
-        return data[offs:new_offs - 1].decode('cp1251'), new_offs
+        return str(data[offs:new_offs - 1], 'cp1251'), new_offs
 
 
 class PackedReader:
     __slots__ = ['__offs', '__data', '__view']
     __PREP_I = struct.Struct('<I')
     __S_FFF = struct.Struct('<3f')
-    __NUMPY_FORMATS = {'f': numpy.float32, }
+    __NUMPY_FORMATS = {
+        'f': numpy.float32,
+        'b': numpy.int8,
+        'B': numpy.uint8,
+        'h': numpy.int16,
+        'H': numpy.uint16,
+        'i': numpy.int32,
+        'I': numpy.uint32,
+    }
 
     def __init__(self, data):
         self.__offs = 0
@@ -101,6 +173,32 @@ class PackedReader:
         self.__offs += size * count
         return verts
 
+    def get_records(self, dtype, count):
+        # read array of fixed-size records without copying,
+        # dtype is numpy dtype or struct format ("3I2H")
+        if isinstance(dtype, str):
+            dtype = records_dtype(dtype)
+        else:
+            dtype = numpy.dtype(dtype)
+        records = numpy.frombuffer(
+            self.__data,
+            dtype=dtype,
+            count=count,
+            offset=self.__offs
+        )
+        self.__offs += dtype.itemsize * count
+        return records
+
+    def getv3f_array(self, count):
+        # get vertices coords, the result is a (count, 3) copy in blender axes
+        coords = self.get_array('f', count * 3).reshape(count, 3)
+        return coords[:, (0, 2, 1)]
+
+    def get_faces(self, count, fmt='H'):
+        # get triangles indices as (count, 3) view
+        faces = self.get_array(fmt, count * 3)
+        return faces.reshape(count, 3)
+
     def byte(self):
         return self.__data[self._next(1)]
 
@@ -215,6 +313,104 @@ class ChunkedReader:
         return len(self.__data)
 
 
+# index of the chunks headers with random access by chunk-id path:
+# headers are scanned once per nesting level and only when that level
+# is accessed, payloads are sliced (or decompressed) only on request,
+# decompressed payloads are kept, so each chunk is decompressed once
+class ChunkIndex:
+    __MASK_COMPRESSED = 0x80000000
+
+    def __init__(self, data):
+        self.__data = data
+        self.__chunks = None
+        self.__nested = {}
+        self.__decompressed = {}
+
+    def __scan(self):
+        # chunk id -> (payload offset, payload size, compressed)
+        chunks = {}
+        data = self.__data
+        data_size = len(data)
+        offs = 0
+        while offs + 8 <= data_size:
+            cid = FastBytes.int_at(data, offs)
+            size = FastBytes.int_at(data, offs + 4)
+            compressed = bool(cid & ChunkIndex.__MASK_COMPRESSED)
+            cid &= ~ChunkIndex.__MASK_COMPRESSED
+            chunks[cid] = (offs + 8, size, compressed)
+            offs += 8 + size
+        self.__chunks = chunks
+        return chunks
+
+    def __get_chunks(self):
+        chunks = self.__chunks
+        if chunks is None:
+            chunks = self.__scan()
+        return chunks
+
+    def __payload(self, cid):
+        offs, size, compressed = self.__get_chunks()[cid]
+        data = self.__data
+        if compressed:
+            payload = self.__decompressed.get(cid)
+            if payload is None:
+                textsize = FastBytes.int_at(data, offs)
+                buffer = data[offs + 4:offs + size]
+                payload = memoryview(lzhuf.decompress_buffer(buffer, textsize))
+                self.__decompressed[cid] = payload
+            return payload
+        return data[offs:offs + size]
+
+    def __resolve(self, path):
+        if not isinstance(path, tuple):
+            return self, path
+        index = self
+        for cid in path[:-1]:
+            index = index.child(cid)
+        return index, path[-1]
+
+    def child(self, cid):
+        index = self.__nested.get(cid)
+        if index is None:
+            index = ChunkIndex(self.__payload(cid))
+            self.__nested[cid] = index
+        return index
+
+    def info(self, path):
+        index, cid = self.__resolve(path)
+        return index.__get_chunks()[cid]
+
+    def get(self, path, default=None):
+        try:
+            return self[path]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.__get_chunks().keys()
+
+    def items(self):
+        for cid in self.keys():
+            yield cid, self.__payload(cid)
+
+    def __getitem__(self, path):
+        index, cid = self.__resolve(path)
+        return index.__payload(cid)
+
+    def __contains__(self, path):
+        try:
+            self.info(path)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.__get_chunks())
+
+
 class PackedWriter():
     def __init__(self):
         self.data = bytearray()
@@ -237,14 +433,119 @@ class PackedWriter():
         self.data += b'\x00'
 
     def replace(self, offset, byte_list):
-        for byte_index, byte in enumerate(byte_list):
-            self.data[offset + byte_index] = byte
+        self.data[offset : offset + len(byte_list)] = byte_list
+
+    def reserve(self, size):
+        # append zeroed space and return its offset,
+        # the space is filled later with pack_into
+        offset = len(self.data)
+        self.data += bytes(size)
+        return offset
+
+    def pack_into(self, fmt, offset, *args):
+        struct.pack_into(fmt, self.data, offset, *args)
+
+    def put_many(self, fmt, values):
+        # write sequence of tuples with one format
+        prep = struct.Struct(fmt)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        size = prep.size
+        offset = self.reserve(size * len(values))
+        pack_into = prep.pack_into
+        data = self.data
+        for value in values:
+            pack_into(data, offset, *value)
+            offset += size
+
+    def put_array(self, array):
+        # append numpy array or any contiguous buffer
+        if isinstance(array, numpy.ndarray):
+            if array.dtype.byteorder == '>':
+                array = array.astype(array.dtype.newbyteorder('<'))
+            array = numpy.ascontiguousarray(array)
+            self.data += memoryview(array).cast('B')
+        else:
+            self.data += array
+
+    def put_records(self, records, dtype=None):
+        # append structured array, dtype is numpy dtype or struct format,
+        # if it is specified records are converted (a list of tuples too)
+        if dtype is not None:
+            if isinstance(dtype, str):
+                dtype = records_dtype(dtype)
+            records = numpy.asarray(records, dtype=dtype)
+        self.put_array(records)
 
 
 class ChunkedWriter():
+    __MASK_COMPRESSED = 0x80000000
+
     def __init__(self):
         self.data = bytearray()
 
-    def put(self, cid, writer):
+    def put(self, cid, writer, compress=False):
+        if compress:
+            data = lzhuf.compress_buffer(writer.data)
+            self.data += struct.pack(
+                'III',
+                cid | ChunkedWriter.__MASK_COMPRESSED,
+                len(data) + 4,
+                len(writer.data)
+            )
+            self.data += data
+            return
         self.data += struct.pack('II', cid, len(writer.data))
         self.data += writer.data
+
+    def putp(self, writer):
+        # append data to the opened chunk
+        self.data += writer.data
+
+    @contextlib.contextmanager
+    def chunk(self, cid):
+        # chunk with the size patched when the block is closed
+        offset = len(self.data)
+        self.data += struct.pack('II', cid, 0)
+        yield self
+        size = len(self.data) - offset - 8
+        struct.pack_into('I', self.data, offset + 4, size)
+
+
+class FileChunkedWriter:
+    # writes chunks directly to the binary file opened for writing,
+    # chunks opened with "chunk" get a placeholder header, payload is
+    # streamed and the size is patched when the chunk is closed
+    __MASK_COMPRESSED = 0x80000000
+
+    def __init__(self, file):
+        self.__file = file
+
+    def put(self, cid, writer, compress=False):
+        file = self.__file
+        if compress:
+            data = lzhuf.compress_buffer(writer.data)
+            file.write(struct.pack(
+                'III',
+                cid | FileChunkedWriter.__MASK_COMPRESSED,
+                len(data) + 4,
+                len(writer.data)
+            ))
+            file.write(data)
+            return
+        file.write(struct.pack('II', cid, len(writer.data)))
+        file.write(writer.data)
+
+    def putp(self, writer):
+        self.__file.write(writer.data)
+
+    @contextlib.contextmanager
+    def chunk(self, cid):
+        file = self.__file
+        offset = file.tell()
+        file.write(struct.pack('II', cid, 0))
+        yield self
+        end_offset = file.tell()
+        file.seek(offset + 4)
+        file.write(struct.pack('I', end_offset - offset - 8))
+        file.seek(end_offset)
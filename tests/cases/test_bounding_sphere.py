@@ -0,0 +1,67 @@
+import numpy
+
+from io_scene_xray import bounding_sphere
+
+from tests import utils
+
+
+def calculate_bbox_bsphere(points):
+    # previous sphere of the exporters, it is centred in the bbox
+    bbox_min = points.min(axis=0)
+    bbox_max = points.max(axis=0)
+    center = (bbox_min + bbox_max) / 2
+    max_radius = (bbox_max - bbox_min).max() / 2
+    for point in points:
+        relative = point - center
+        radius = numpy.linalg.norm(relative)
+        if radius > max_radius:
+            offset = center - relative / radius * max_radius
+            center = (point + offset) / 2
+            max_radius = numpy.linalg.norm(center - offset)
+    return center, max_radius
+
+
+class TestBoundingSphere(utils.XRayTestCase):
+    def assertEnclosed(self, points, center, radius):
+        distances = numpy.linalg.norm(points - center, axis=1)
+        self.assertLessEqual(distances.max(), radius * (1 + 1e-9))
+
+    def test_calculate(self):
+        random = numpy.random.RandomState(0)
+        box = random.rand(2000, 3) * (4, 2, 1)
+        directions = random.randn(1000, 3)
+        surface = directions / numpy.linalg.norm(directions, axis=1)[ : , None]
+        flat = numpy.column_stack((random.rand(500, 2), numpy.zeros(500)))
+        for points in (box, surface * 3 + 1, flat):
+            center, radius = bounding_sphere.calculate(points)
+            ritter_center, ritter_radius = bounding_sphere.calculate(
+                points, exact=False
+            )
+            _, bbox_radius = calculate_bbox_bsphere(points)
+            self.assertEnclosed(points, center, radius)
+            self.assertEnclosed(points, ritter_center, ritter_radius)
+            self.assertLessEqual(radius, ritter_radius)
+            self.assertLessEqual(radius, bbox_radius)
+
+        # the minimum sphere of the points on the sphere surface
+        _, radius = bounding_sphere.calculate(surface * 3 + 1)
+        self.assertAlmostEqual(radius, 3.0, places=2)
+
+    def test_degenerate(self):
+        center, radius = bounding_sphere.calculate(((1, 2, 3), ))
+        self.assertEqual(center.tolist(), [1, 2, 3])
+        self.assertEqual(radius, 0.0)
+
+        points = numpy.array(((0, 0, 0), (1, 0, 0), (2, 0, 0), (2, 0, 0)))
+        center, radius = bounding_sphere.calculate(points)
+        self.assertAlmostEqual(radius, 1.0)
+        self.assertAlmostEqual(center[0], 1.0)
+
+        center, radius = bounding_sphere.calculate(())
+        self.assertEqual(radius, 0.0)
+
+    def test_merge(self):
+        spheres = (((0, 0, 0), 1.0), ((3, 0, 0), 1.0), ((0, 0, 0), 0.5))
+        center, radius = bounding_sphere.merge(spheres)
+        self.assertAlmostEqual(radius, 2.5)
+        self.assertAlmostEqual(center[0], 1.5)
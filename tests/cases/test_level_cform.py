@@ -0,0 +1,97 @@
+import numpy
+
+from io_scene_xray import xray_io
+from io_scene_xray import ogf
+from io_scene_xray.level import exp
+
+from tests import utils
+
+
+class TestLevelCFormCleanup(utils.XRayTestCase):
+    def test_cleanup(self):
+        vertices = numpy.array((
+            (0, 0, 0), (1, 0, 0), (0, 1, 0),
+            (1, 0, 0.00001), (0, 1, 0),    # seam duplicates
+            (5, 5, 5),    # unused
+            (2, 0, 0)
+        ), dtype=numpy.float32)
+        tris = numpy.zeros(6, dtype=xray_io.RECORD_CFORM_FACE_V4)
+        tris['verts'] = (
+            (0, 1, 2),
+            (0, 3, 4),    # the same triangle after welding
+            (2, 0, 1),    # the same triangle with other first vertex
+            (0, 2, 1),    # back side
+            (0, 1, 6),    # zero area
+            (1, 1, 2)    # repeated vertex
+        )
+        tris['sector'] = (0, 0, 0, 1, 1, 1)
+
+        clean_vertices, clean_tris = exp.cleanup_cform(vertices, tris, 0.001)
+
+        self.assertEqual(clean_vertices.tolist(), vertices[0 : 3].tolist())
+        self.assertEqual(clean_tris['verts'].tolist(), [[0, 1, 2], [0, 2, 1]])
+        self.assertEqual(clean_tris['sector'].tolist(), [0, 1])
+        # the input is not changed
+        self.assertEqual(tris['verts'][1].tolist(), [0, 3, 4])
+
+    def test_repeated_attributes(self):
+        vertices = numpy.array(
+            ((0, 0, 0), (1, 0, 0), (0, 1, 0)),
+            dtype=numpy.float32
+        )
+        tris = numpy.zeros(5, dtype=xray_io.RECORD_CFORM_FACE_V4)
+        tris['verts'] = (0, 1, 2)
+        tris['material'] = (1, 1 | 0x4000, 1, 2, 1)
+        tris['sector'] = (0, 0, 1, 0, 0)
+
+        _, clean_tris = exp.cleanup_cform(vertices, tris, 0.0)
+
+        # only the last triangle repeats the first one
+        self.assertEqual(clean_tris['material'].tolist(), [1, 0x4001, 1, 2])
+        self.assertEqual(clean_tris['sector'].tolist(), [0, 0, 1, 0])
+
+    def test_weld_distance(self):
+        vertices = numpy.array((
+            (0, 0, 0),
+            (0.0899999, 0, 0), (0.0900001, 0, 0),    # rounded cells border
+            (0.1199999, 1, 0), (0.1200001, 1, 0),    # floored cells border
+            (0.5, 0.5, 0.5), (0.55, 0.55, 0.55),    # farther than weld distance
+            (0.59, 0.55, 0.55),    # close to both previous vertices
+            (0.62, 0.55, 0.55)    # close to the welded vertex only
+        ))
+
+        weld_indices = exp.get_weld_indices(vertices, 0.06)
+
+        self.assertEqual(weld_indices.tolist(), [0, 1, 1, 3, 3, 5, 6, 6, 8])
+        # with float32 coordinates
+        weld_indices = exp.get_weld_indices(vertices.astype(numpy.float32), 0.06)
+        self.assertEqual(weld_indices.tolist(), [0, 1, 1, 3, 3, 5, 6, 6, 8])
+
+    def test_exact_duplicates(self):
+        vertices = numpy.array((
+            (0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 0, 0.00001)
+        ), dtype=numpy.float32)
+        tris = numpy.zeros(2, dtype=xray_io.RECORD_CFORM_FACE_V4)
+        tris['verts'] = ((0, 1, 2), (0, 3, 2))
+
+        clean_vertices, clean_tris = exp.cleanup_cform(vertices, tris, 0.0)
+
+        self.assertEqual(len(clean_vertices), 4)
+        self.assertEqual(clean_tris['verts'].tolist(), tris['verts'].tolist())
+
+
+class TestLevelCFormFaces(utils.XRayTestCase):
+    def test_created_faces(self):
+        # the packed keys of the last two faces were equal
+        last = 2 ** 22 - 1
+        faces = numpy.array((
+            (0, 1, 2),
+            (2, 0, 1),    # the same vertices
+            (0, 0, 1),    # repeated vertex
+            (1, 2 ** 21, last),
+            (last, 2 ** 21, 1 + 2 ** 20)
+        ), dtype=numpy.uint32)
+
+        created = ogf.imp.get_created_faces(faces)
+
+        self.assertEqual(created.tolist(), [True, False, False, True, True])
@@ -0,0 +1,86 @@
+import numpy
+
+from io_scene_xray.level import exp
+from io_scene_xray.level import export_cache
+
+from tests import utils
+
+
+def create_geometry(size):
+    # triangulated grid of the tree visual, attributes of the loops
+    coords = []
+    for y in range(size):
+        for x in range(size):
+            for vert_x, vert_y in (
+                    (x, y), (x + 1, y), (x + 1, y + 1),
+                    (x, y), (x + 1, y + 1), (x, y + 1)
+                ):
+                coords.append((vert_x, vert_y, (vert_x * vert_y) % 2))
+    loops_count = len(coords)
+    geometry = exp.VisualGeometry()
+    geometry.vertex_format = 'TREE'
+    geometry.coords = numpy.array(coords, dtype=numpy.float32)
+    geometry.normals = numpy.tile(numpy.float32((0, 0, 1)), (loops_count, 1))
+    geometry.tangents = numpy.tile(numpy.float32((1, 0, 0)), (loops_count, 1))
+    geometry.uvs = geometry.coords[:, 0 : 2] / size
+    geometry.uvs_lmap = numpy.zeros((loops_count, 2), dtype=numpy.float32)
+    geometry.hemi = numpy.ones((loops_count, 1), dtype=numpy.float32)
+    geometry.sun = numpy.zeros((loops_count, 1), dtype=numpy.float32)
+    geometry.light = numpy.zeros((loops_count, 3), dtype=numpy.float32)
+    geometry.frac_low = [size / 2, size / 2, 0.0]
+    geometry.frac_y_size = 1.0
+    return geometry
+
+
+def get_visual_data(encoded):
+    vb = exp.VertexBuffer()
+    vb.vertex_format = encoded.vertex_format
+    vb.vertex_count = encoded.vertices_count
+    for name, values in encoded.columns.items():
+        vb.add(name, values)
+    return exp.get_vertex_records(vb).tobytes(), encoded.indices.tobytes()
+
+
+class TestLevelExportCache(utils.XRayTestCase):
+    def test_reuse(self):
+        geometry = create_geometry(8)
+        cache_path = export_cache.get_cache_path(self.outpath('level'))
+
+        cache = export_cache.ExportCache()
+        cache.load(cache_path)    # missing cache file
+        encoded = exp.encode_visual_cached(geometry, True, True, cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.save(cache_path)
+
+        cache = export_cache.ExportCache()
+        cache.load(cache_path)
+        cached = exp.encode_visual_cached(geometry, True, True, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        # the cached visual is the same as the encoded one
+        self.assertEqual(get_visual_data(cached), get_visual_data(encoded))
+        self.assertEqual(cached.slide_windows, encoded.slide_windows)
+        self.assertEqual(
+            cached.vertices_count,
+            exp.encode_visual(geometry, True, True).vertices_count
+        )
+
+        # other options and geometry are not reused
+        exp.encode_visual_cached(geometry, False, False, cache)
+        geometry.coords[0, 2] += 1.0
+        exp.encode_visual_cached(geometry, True, True, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_encoder_version(self):
+        geometry = create_geometry(2)
+        key = export_cache.get_visual_key(geometry, True, False)
+        self.assertEqual(key, export_cache.get_visual_key(geometry, True, False))
+        encoder_version = export_cache.ENCODER_VERSION
+        try:
+            export_cache.ENCODER_VERSION += 1
+            self.assertNotEqual(
+                key,
+                export_cache.get_visual_key(geometry, True, False)
+            )
+        finally:
+            export_cache.ENCODER_VERSION = encoder_version
@@ -0,0 +1,64 @@
+import json
+import threading
+
+from io_scene_xray.level import profiler
+
+from tests import utils
+
+
+class TestLevelProfiler(utils.XRayTestCase):
+    def test_stages(self):
+        level_profiler = profiler.Profiler('import')
+        level_profiler.start()
+        with level_profiler.stage('decode'):
+            with level_profiler.stage('read_files'):
+                pass
+        wrapped = level_profiler.wrap('import_swis')(lambda value: value + 1)
+        self.assertEqual(wrapped(1), 2)
+        self.assertEqual(wrapped(2), 3)
+        level_profiler.stop()
+
+        stages = {stage.name: stage for stage in level_profiler.stages}
+        self.assertEqual(list(stages), ['decode', 'read_files', 'import_swis'])
+        self.assertEqual(stages['decode'].depth, 0)
+        self.assertEqual(stages['read_files'].depth, 1)
+        self.assertEqual(stages['import_swis'].calls, 2)
+        self.assertIsNone(stages['decode'].memory_peak)
+        self.assertGreaterEqual(level_profiler.total_time, stages['decode'].time)
+        self.assertTrue(level_profiler.get_summary().startswith('Level import: '))
+
+    def test_threads(self):
+        level_profiler = profiler.Profiler('import', trace_memory=True)
+        level_profiler.start()
+        with level_profiler.stage('decode'):
+            data = [bytearray(1024 * 1024)]
+            thread = threading.Thread(
+                target=level_profiler.wrap('import_indices_buffers')(list),
+                args=(data, )
+            )
+            thread.start()
+            thread.join()
+        level_profiler.stop()
+
+        decode, indices = level_profiler.stages
+        self.assertGreaterEqual(decode.memory_peak, 1024 * 1024)
+        self.assertIsNone(indices.depth)
+        self.assertIsNone(indices.memory_peak)
+        self.assertEqual(indices.calls, 1)
+
+    def test_report(self):
+        level_profiler = profiler.Profiler('export')
+        level_profiler.info['threads'] = 2
+        level_profiler.start()
+        with level_profiler.stage('write_level'):
+            pass
+        level_profiler.stop()
+
+        report_path = self.outpath('level.export_profile.json')
+        level_profiler.write_report(report_path)
+        with open(report_path) as file:
+            report = json.load(file)
+        self.assertEqual(report['operation'], 'export')
+        self.assertEqual(report['info'], {'threads': 2})
+        self.assertEqual(report['stages'][0]['name'], 'write_level')
+        self.assertEqual(report['stages'][0]['calls'], 1)
@@ -0,0 +1,143 @@
+import struct
+
+import numpy
+
+from io_scene_xray.level import exp
+from io_scene_xray.level import fmt
+from io_scene_xray.level import vb
+
+from tests import utils
+
+
+class TestLevelVertexRecords(utils.XRayTestCase):
+    def test_color_records(self):
+        vb = exp.VertexBuffer()
+        vb.vertex_format = 'COLOR'
+        for index in range(2):
+            vb.add('position', numpy.full((1, 3), index, dtype=numpy.float32))
+            vb.add('normal', numpy.array(((1, 2, 3), ), dtype=numpy.uint8))
+            vb.add('tangent', numpy.array(((4, 5, 6), ), dtype=numpy.uint8))
+            vb.add('binormal', numpy.array(((7, 8, 9), ), dtype=numpy.uint8))
+            vb.add('color_hemi', numpy.array((10, ), dtype=numpy.uint8))
+            vb.add('uv_fix', numpy.array(((11, 12), ), dtype=numpy.uint8))
+            vb.add('color_light', numpy.array(((13, 14, 15), ), dtype=numpy.uint8))
+            vb.add('color_sun', numpy.array((16, ), dtype=numpy.uint8))
+            vb.add('uv', numpy.array(((-1, 1), ), dtype=numpy.int16))
+            vb.vertex_count += 1
+
+        records = exp.get_vertex_records(vb)
+
+        self.assertEqual(records.dtype.itemsize, 32)
+        self.assertEqual(records.tobytes()[32 : ], struct.pack(
+            '<3f3BB3BB3BB3BB2h',
+            1, 1, 1, 1, 2, 3, 10, 4, 5, 6, 11, 7, 8, 9, 12,
+            13, 14, 15, 16, -1, 1
+        ))
+
+    def test_tree_padding(self):
+        vb = exp.VertexBuffer()
+        vb.vertex_format = 'TREE'
+        vb.vertex_count = 1
+        vb.add('uv_fix', numpy.zeros((1, 2), dtype=numpy.uint8))
+        vb.add('shader_data', numpy.array((0xffff, ), dtype=numpy.uint16))
+
+        data = exp.get_vertex_records(vb).tobytes()
+
+        self.assertEqual(data[28 : ], b'\xff\xff\x00\x00')
+
+
+class TestLevelFvfVertices(utils.XRayTestCase):
+    def test_tex_coord_sets(self):
+        for tex_coord in range(4):
+            vertex_format = fmt.D3D7FVF.XYZ | fmt.D3D7FVF.NORMAL | \
+                (tex_coord << fmt.D3D7FVF.TEXCOUNT_SHIFT)
+            dtype, count = vb.get_fvf_dtype(vertex_format, fmt.VERSION_13)
+            self.assertEqual(count, tex_coord)
+            self.assertEqual(dtype.itemsize, 24 + 8 * tex_coord)
+        self.assertEqual(dtype.names[2 : 4], ('uv', 'uv_lmap'))
+
+
+def create_geometry(coords, vertex_format='TREE'):
+    loops_count = len(coords)
+    zeros = numpy.zeros((loops_count, 1), dtype=numpy.float32)
+    geometry = exp.VisualGeometry()
+    geometry.name = 'visual'
+    geometry.vertex_format = vertex_format
+    geometry.coords = numpy.asarray(coords, dtype=numpy.float32)
+    geometry.normals = numpy.tile(numpy.float32((0, 0, 1)), (loops_count, 1))
+    geometry.tangents = numpy.tile(numpy.float32((1, 0, 0)), (loops_count, 1))
+    geometry.uvs = geometry.coords[:, 0 : 2]
+    geometry.uvs_lmap = numpy.hstack((zeros, zeros))
+    geometry.hemi = zeros + 1
+    geometry.sun = zeros
+    geometry.light = numpy.hstack((zeros, zeros, zeros))
+    geometry.frac_low = [0.0, 0.0, 0.0]
+    geometry.frac_y_size = 1.0
+    return geometry
+
+
+class TestLevelEncodeVisual(utils.XRayTestCase):
+    def test_many_vertices(self):
+        loops_count = (fmt.VERTICES_COUNT_LIMIT // 3 + 1) * 3
+        coords = numpy.zeros((loops_count, 3))
+        coords[:, 0] = numpy.arange(loops_count)
+        with self.assertRaises(exp.utils.AppError):
+            exp.encode_visual(create_geometry(coords))
+
+        encoded = exp.encode_visual(create_geometry(coords[ : -3]))
+        self.assertEqual(encoded.vertices_count, loops_count - 3)
+        self.assertEqual(int(encoded.indices.max()), loops_count - 4)
+
+
+    def test_tree_light_color(self):
+        coords = numpy.array(((0, 0, 0), (1, 0, 0), (0, 1, 1)))
+        geometry = create_geometry(coords)
+        light = create_geometry(coords + 1)
+        light.has_light = True
+        vb = exp.VertexBuffer()
+        vb.vertex_format = 'TREE'
+        for encoded in (exp.encode_visual(geometry), exp.encode_visual(light)):
+            for name, values in encoded.columns.items():
+                vb.add(name, values)
+            vb.vertex_count += encoded.vertices_count
+
+        records = exp.get_vertex_records(vb)
+
+        self.assertEqual(len(records), 6)
+        self.assertTrue(records['shader_data'][3 : ].all())
+
+
+class TestLevelBuffersPacking(utils.XRayTestCase):
+    def test_best_fit_bins(self):
+        bins, bins_count = exp.get_best_fit_bins([5, 7, 3, 2, 4, 12, 0], 10)
+
+        self.assertEqual(bins_count, 4)
+        self.assertEqual(bins, [2, 1, 1, 3, 2, 0, 0])
+
+    def test_pack_visuals(self):
+        level = exp.Level()
+        encoded_visuals = []
+        for name, vertex_format, vertices_count in (
+                ('a', 'TREE', 40000),
+                ('b', 'NORMAL', 10),
+                ('c', 'TREE', 30000),
+                ('d', 'TREE', 20000)
+            ):
+            encoded = exp.EncodedVisual(vertex_format)
+            encoded.vertices_count = vertices_count
+            encoded.indices = numpy.zeros(vertices_count * 12, dtype='<u2')
+            encoded.columns['position'] = numpy.zeros((vertices_count, 3))
+            encoded_visuals.append((name, encoded))
+
+        vbs, ibs = exp.pack_visuals(level, encoded_visuals)
+
+        self.assertEqual([vb.vertex_format for vb in vbs], ['TREE', 'TREE', 'NORMAL'])
+        self.assertEqual([vb.vertex_count for vb in vbs], [60000, 30000, 10])
+        self.assertEqual(level.saved_visuals['a'][ : 3], (0, 0, 40000))
+        self.assertEqual(level.saved_visuals['d'][ : 3], (0, 40000, 20000))
+        self.assertEqual(level.saved_visuals['c'][ : 3], (1, 0, 30000))
+        self.assertEqual(len(ibs), 2)
+        self.assertEqual(level.saved_visuals['a'][3 : ], (0, 0, 480000))
+        self.assertEqual(level.saved_visuals['b'][3 : ], (0, 480000, 120))
+        self.assertEqual(level.saved_visuals['c'][3 : ], (0, 480120, 360000))
+        self.assertEqual(level.saved_visuals['d'][3 : ], (1, 0, 240000))
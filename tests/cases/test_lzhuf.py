@@ -0,0 +1,82 @@
+import os
+import random
+
+import bpy
+
+from io_scene_xray import lzhuf, xray_io
+
+from tests import utils
+
+
+class TestLzhuf(utils.XRayTestCase):
+    def _round_trip(self, data):
+        compressed = lzhuf.compress_buffer(data)
+        decompressed = lzhuf.decompress_buffer(compressed, len(data))
+        self.assertEqual(bytes(decompressed), bytes(data))
+        return compressed
+
+    def test_round_trip_small(self):
+        for data in (b'', b'a', b'ab', b'abc', b'abcd', b'\x00' * 5):
+            self._round_trip(data)
+
+    def test_round_trip_repeated(self):
+        data = b'abcd' * 1000 + bytes(range(256)) * 20
+        compressed = self._round_trip(data)
+        self.assertLess(len(compressed), len(data) // 10)
+
+    def test_round_trip_random(self):
+        rnd = random.Random(0)
+        words = [
+            bytes(rnd.randrange(256) for _ in range(rnd.randint(1, 12)))
+            for _ in range(100)
+        ]
+        data = bytearray()
+        while len(data) < 100000:
+            if rnd.random() < 0.7:
+                data += rnd.choice(words)
+            else:
+                data.append(rnd.randrange(256))
+        self._round_trip(data)
+        self._round_trip(os.urandom(10000))
+
+    def test_chunked_writer(self):
+        packed_writer = xray_io.PackedWriter()
+        packed_writer.puts('compressed chunk ' * 100)
+        chunked_writer = xray_io.ChunkedWriter()
+        chunked_writer.put(0x1, packed_writer, compress=True)
+        chunked_writer.put(0x2, packed_writer)
+        self.assertLess(len(chunked_writer.data), len(packed_writer.data) * 2)
+
+        chunks = list(xray_io.ChunkedReader(chunked_writer.data))
+        self.assertEqual(len(chunks), 2)
+        for (cid, data), expected_cid in zip(chunks, (0x1, 0x2)):
+            self.assertEqual(cid, expected_cid)
+            self.assertEqual(bytes(data), bytes(packed_writer.data))
+
+    def test_export_object_compressed(self):
+        # Arrange
+        bm = utils.create_bmesh((
+            (0, 0, 0),
+            (-1, -1, 0), (+1, -1, 0), (+1, +1, 0), (-1, +1, 0),
+        ), ((0, 1, 2), (0, 2, 3), (0, 3, 4), (0, 4, 1)))
+        obj = utils.create_object(bm)
+        obj.name = 'tobj'
+
+        # Act
+        bpy.ops.xray_export.object_file(
+            object='tobj', filepath=self.outpath('test.object'),
+            texture_name_from_image_path=False,
+            compress_chunks=True
+        )
+        bpy.ops.xray_import.object(
+            directory=self.outpath(),
+            files=[{'name': 'test.object'}],
+        )
+
+        # Assert
+        self.assertOutputFiles({
+            'test.object'
+        })
+        self.assertReportsNotContains('ERROR')
+        imported_object = bpy.data.objects['test.object']
+        self.assertEqual(len(imported_object.data.polygons), 4)
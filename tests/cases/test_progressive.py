@@ -0,0 +1,75 @@
+import numpy
+
+from io_scene_xray import progressive
+from io_scene_xray import xray_io
+from io_scene_xray.level import swi
+
+from tests import utils
+
+
+def create_grid(size):
+    coords = []
+    for y in range(size):
+        for x in range(size):
+            coords.append((x, y, 0.1 * ((x * y) % 3)))
+    triangles = []
+    for y in range(size - 1):
+        for x in range(size - 1):
+            vertex = y * size + x
+            triangles.append((vertex, vertex + 1, vertex + size + 1))
+            triangles.append((vertex, vertex + size + 1, vertex + size))
+    return numpy.array(coords), numpy.array(triangles)
+
+
+class TestProgressiveMesh(utils.XRayTestCase):
+    def test_slide_windows(self):
+        vertices, triangles = create_grid(12)
+        vertices_order, indices, windows = progressive.generate(
+            vertices, triangles
+        )
+
+        # write and read the slide windows
+        packed_writer = xray_io.PackedWriter()
+        swi.write_slide_window_item(packed_writer, windows)
+        packed_reader = xray_io.PackedReader(packed_writer.data)
+        swis = swi.import_slide_window_item(packed_reader)
+        self.assertTrue(packed_reader.is_end())
+        self.assertEqual(
+            [(item.offset, item.triangles_count, item.vertices_count) for item in swis],
+            windows
+        )
+
+        # the first window is the original mesh
+        remap = numpy.empty(len(vertices), dtype=numpy.int64)
+        remap[vertices_order] = numpy.arange(len(vertices))
+        first = swis[0]
+        first_triangles = indices[first.offset : first.offset + first.triangles_count * 3]
+        self.assertEqual(
+            sorted(map(tuple, first_triangles.reshape(-1, 3).tolist())),
+            sorted(map(tuple, remap[triangles].tolist()))
+        )
+
+        # the next windows are simplified
+        self.assertGreater(len(swis), 2)
+        for prev_item, item in zip(swis, swis[1 : ]):
+            self.assertLess(item.triangles_count, prev_item.triangles_count)
+            self.assertLessEqual(item.vertices_count, prev_item.vertices_count)
+        last = swis[-1]
+        self.assertLessEqual(
+            last.triangles_count,
+            len(triangles) * progressive.MIN_TRIANGLES_RATIO + 2
+        )
+        for item in swis:
+            end = item.offset + item.triangles_count * 3
+            self.assertLessEqual(end, len(indices))
+            self.assertLess(indices[item.offset : end].max(), item.vertices_count)
+
+        # the border vertices are not removed
+        border = (vertices[:, 0] % 11 == 0) | (vertices[:, 1] % 11 == 0)
+        kept = vertices_order[ : last.vertices_count]
+        self.assertTrue(set(numpy.flatnonzero(border)) <= set(kept.tolist()))
+
+    def test_large_mesh(self):
+        vertices = numpy.zeros((progressive.MAX_COUNT + 1, 3))
+        triangles = numpy.array(((0, 1, 2), ))
+        self.assertIsNone(progressive.generate(vertices, triangles))
@@ -0,0 +1,51 @@
+import numpy
+
+from io_scene_xray import vertex_cache
+
+from tests import utils
+
+
+def create_grid(size):
+    indices = numpy.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+    vert_1 = indices[ : -1, : -1].ravel()
+    vert_2 = indices[ : -1, 1 : ].ravel()
+    vert_3 = indices[1 : , : -1].ravel()
+    vert_4 = indices[1 : , 1 : ].ravel()
+    return numpy.concatenate((
+        numpy.column_stack((vert_1, vert_2, vert_3)),
+        numpy.column_stack((vert_2, vert_4, vert_3))
+    ))
+
+
+class TestVertexCache(utils.XRayTestCase):
+    def test_optimize(self):
+        triangles = create_grid(30)
+        triangles = triangles[numpy.random.RandomState(0).permutation(len(triangles))]
+        vertices_count = 31 * 31 + 2    # with unused vertices
+
+        stats = vertex_cache.CacheStats()
+        optimized, vertices_order = vertex_cache.optimize_with_stats(
+            triangles, vertices_count, stats
+        )
+
+        # the same triangles with the same winding
+        self.assertEqual(
+            sorted(map(tuple, vertices_order[optimized].tolist())),
+            sorted(map(tuple, triangles.tolist()))
+        )
+        self.assertEqual(sorted(vertices_order.tolist()), list(range(vertices_count)))
+        # vertices are in the order of the first use
+        first_uses = numpy.unique(optimized.ravel(), return_index=True)[1]
+        self.assertTrue((numpy.diff(first_uses) > 0).all())
+        acmr_before, acmr_after = stats.get_acmr()
+        self.assertLess(acmr_after, 1.0)
+        self.assertLess(acmr_after, acmr_before)
+
+        # deterministic result
+        repeated, _ = vertex_cache.optimize(triangles, vertices_count)
+        self.assertEqual(repeated.tolist(), optimized.tolist())
+
+    def test_cache_misses(self):
+        triangles = numpy.array(((0, 1, 2), (2, 1, 3), (0, 0, 4)))
+        self.assertEqual(vertex_cache.get_cache_misses(triangles), 5)
+        self.assertEqual(vertex_cache.get_cache_misses(triangles, 2), 6)
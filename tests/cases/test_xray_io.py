@@ -0,0 +1,161 @@
+import io
+
+from io_scene_xray import xray_io
+
+from tests import utils
+
+
+class TestChunkIndex(utils.XRayTestCase):
+    def _build(self):
+        leaf_writer = xray_io.PackedWriter()
+        leaf_writer.puts('leaf')
+        nested_writer = xray_io.ChunkedWriter()
+        nested_writer.put(0x7, leaf_writer)
+        nested_writer.put(0x8, leaf_writer, compress=True)
+
+        root_writer = xray_io.ChunkedWriter()
+        root_writer.put(0x1, leaf_writer)
+        root_writer.put(0x2, nested_writer)
+        root_writer.put(0x3, nested_writer, compress=True)
+        return bytes(root_writer.data), bytes(leaf_writer.data)
+
+    def test_lookup(self):
+        data, leaf = self._build()
+        chunks = xray_io.ChunkIndex(memoryview(data))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(list(chunks), [0x1, 0x2, 0x3])
+        self.assertEqual(bytes(chunks[0x1]), leaf)
+        self.assertEqual(bytes(chunks[0x2, 0x7]), leaf)
+        self.assertEqual(bytes(chunks[0x2, 0x8]), leaf)
+        self.assertEqual(bytes(chunks[0x3, 0x7]), leaf)
+        self.assertEqual(bytes(chunks[0x3, 0x8]), leaf)
+
+    def test_missing(self):
+        data, _ = self._build()
+        chunks = xray_io.ChunkIndex(data)
+
+        self.assertIn(0x1, chunks)
+        self.assertIn((0x2, 0x8), chunks)
+        self.assertNotIn(0x4, chunks)
+        self.assertNotIn((0x2, 0x9), chunks)
+        self.assertIsNone(chunks.get(0x4))
+        self.assertIsNone(chunks.get((0x3, 0x9)))
+        with self.assertRaises(KeyError):
+            chunks[0x5]
+
+    def test_info(self):
+        data, leaf = self._build()
+        chunks = xray_io.ChunkIndex(data)
+
+        self.assertEqual(chunks.info(0x1), (8, len(leaf), False))
+        offset, size, compressed = chunks.info((0x2, 0x8))
+        self.assertTrue(compressed)
+        self.assertTrue(chunks.info(0x3)[2])
+
+    def test_decompress_once(self):
+        data, leaf = self._build()
+        chunks = xray_io.ChunkIndex(data)
+
+        payload = chunks[0x2, 0x8]
+        self.assertIs(chunks[0x2, 0x8], payload)
+        self.assertIs(chunks.get((0x2, 0x8)), payload)
+        self.assertEqual(bytes(payload), leaf)
+        self.assertIsNot(chunks[0x3, 0x8], payload)
+
+
+class TestPackedReaderRecords(utils.XRayTestCase):
+    def test_get_records(self):
+        packed_writer = xray_io.PackedWriter()
+        for index in range(4):
+            packed_writer.putf('<3I2H', index, index + 1, index + 2, 7, index)
+        packed_writer.putf('<I', 0xdeadbeef)
+
+        packed_reader = xray_io.PackedReader(bytes(packed_writer.data))
+        records = packed_reader.get_records('3I2H', 4)
+        self.assertEqual(records.tolist()[2], (2, 3, 4, 7, 2))
+        self.assertEqual(packed_reader.getf('<I')[0], 0xdeadbeef)
+        self.assertTrue(packed_reader.is_end())
+
+        packed_reader.set_offset(0)
+        faces = packed_reader.get_records(xray_io.RECORD_CFORM_FACE_V4, 4)
+        self.assertEqual(faces['verts'][3].tolist(), [3, 4, 5])
+        self.assertEqual(faces['sector'].tolist(), [0, 1, 2, 3])
+
+    def test_typed_helpers(self):
+        packed_writer = xray_io.PackedWriter()
+        packed_writer.putf('<6f', 1, 2, 3, 4, 5, 6)
+        packed_writer.putf('<3H', 0, 1, 2)
+
+        packed_reader = xray_io.PackedReader(bytes(packed_writer.data))
+        coords = packed_reader.getv3f_array(2)
+        self.assertEqual(coords.tolist(), [[1, 3, 2], [4, 6, 5]])
+        faces = packed_reader.get_faces(1)
+        self.assertEqual(faces.tolist(), [[0, 1, 2]])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(Exception):
+            xray_io.records_dtype('3I2s')
+
+
+class TestPackedWriterBulk(utils.XRayTestCase):
+    def test_put_many(self):
+        values = [(1, 2, 3), (4, 5, 6)]
+        packed_writer = xray_io.PackedWriter()
+        packed_writer.putf('<B', 7)
+        packed_writer.put_many('<2Hf', values)
+
+        expected = xray_io.PackedWriter()
+        expected.putf('<B', 7)
+        for value in values:
+            expected.putf('<2Hf', *value)
+        self.assertEqual(packed_writer.data, expected.data)
+
+    def test_reserve(self):
+        packed_writer = xray_io.PackedWriter()
+        packed_writer.putf('<H', 1)
+        offset = packed_writer.reserve(4)
+        packed_writer.putf('<H', 2)
+        packed_writer.pack_into('<I', offset, 0x12345678)
+        self.assertEqual(
+            bytes(packed_writer.data),
+            b'\x01\x00\x78\x56\x34\x12\x02\x00'
+        )
+
+    def test_put_array(self):
+        packed_writer = xray_io.PackedWriter()
+        records = [(1, 2, 3, 4, 5), (6, 7, 8, 9, 10)]
+        packed_writer.put_records(records, '3I2H')
+        packed_writer.put_array(b'\xff')
+
+        packed_reader = xray_io.PackedReader(bytes(packed_writer.data))
+        self.assertEqual(packed_reader.get_records('3I2H', 2).tolist(), records)
+        self.assertEqual(packed_reader.getf('<B')[0], 0xff)
+        self.assertTrue(packed_reader.is_end())
+
+
+class TestFileChunkedWriter(utils.XRayTestCase):
+    def _write(self, chunked_writer):
+        packed_writer = xray_io.PackedWriter()
+        packed_writer.puts('payload')
+        chunked_writer.put(0x1, packed_writer)
+        with chunked_writer.chunk(0x2):
+            chunked_writer.put(0x3, packed_writer)
+            with chunked_writer.chunk(0x4):
+                chunked_writer.putp(packed_writer)
+        chunked_writer.put(0x5, packed_writer, compress=True)
+        return bytes(packed_writer.data)
+
+    def test_nested_chunks(self):
+        file = io.BytesIO()
+        payload = self._write(xray_io.FileChunkedWriter(file))
+        memory_writer = xray_io.ChunkedWriter()
+        self._write(memory_writer)
+        data = file.getvalue()
+        self.assertEqual(data, bytes(memory_writer.data))
+
+        chunks = xray_io.ChunkIndex(data)
+        self.assertEqual(list(chunks), [0x1, 0x2, 0x5])
+        self.assertEqual(bytes(chunks[0x2, 0x3]), payload)
+        self.assertEqual(bytes(chunks[0x2, 0x4]), payload)
+        self.assertEqual(bytes(chunks[0x5]), payload)